@@ -1,3 +1,5 @@
+import os
+import sys
 from numpy import *
 import networkx as nx
 import matplotlib as mp
@@ -7,6 +9,8 @@ import scipy.stats as scistat
 import scipy.special as sci
 from random import sample, randint
 import itertools as it
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+import permtest
 
 def GetData(filename = "aznorbert_corrsd_new.pkl"):
     global data #****
@@ -219,7 +223,10 @@ def convert(name, deg = 10):
     -Note, this uses a slightly modified version of table.py,
     resulting graph may not look pretty in some cases """    
 #more generalized version of compare. Can input a list of groups and ran.        
-def mycompare(lst = [],labels = ["A","B","C"],ran = '',title=''):
+#test='perm' compares the means of every pair of groups, and of every
+#group with the random graphs, by permutation tests (permtest.py, all
+#measures at once) instead of t-tests
+def mycompare(lst = [],labels = ["A","B","C"],ran = '',title='',test='t'):
     subsets = list(it.combinations(list(range(len(lst))),2)) #subsets of 2
     WIDE = len(subsets) + len(labels) + 1 #the number of cells in a row
     
@@ -235,21 +242,27 @@ def mycompare(lst = [],labels = ["A","B","C"],ran = '',title=''):
     col += ['{} vs rand'.format(l) for l in labels]
     
     color = [[(1,1,1) for c in range(WIDE)] for r in range(len(ans1[0]))]
+    if test == 'perm':
+        groups = [column_stack(l[1]) for l in lst] + [column_stack(rans1[1])]
+        perms = permtest.compare(groups, subsets + [(grp,len(lst)) for grp in range(len(lst))])
     for i in range(len(ans1[1])):
         print lst[0][0][i],lst[1][0][i],lst[2][0][i],lst[3][0][i], rans1[0][i]
-        ans = []
-        for g1,g2 in subsets:
-            try:
-                ans += [scistat.ttest_ind(lst[g1][1][i],lst[g2][1][i])]
-            except:
-                print("Encountered NAN, set to NEGATIVE")
-                ans += [(0,-1)]
-        for l in lst:
-            try:
-                ans += [scistat.ttest_ind(l[1][i],rans1[1][i])]
-            except:
-                print("Encountered NAN, set to NEGATIVE")
-                ans += [(0,-1)]
+        if test == 'perm':
+            ans = [p[i] for p in perms]
+        else:
+            ans = []
+            for g1,g2 in subsets:
+                try:
+                    ans += [scistat.ttest_ind(lst[g1][1][i],lst[g2][1][i])]
+                except:
+                    print("Encountered NAN, set to NEGATIVE")
+                    ans += [(0,-1)]
+            for l in lst:
+                try:
+                    ans += [scistat.ttest_ind(l[1][i],rans1[1][i])]
+                except:
+                    print("Encountered NAN, set to NEGATIVE")
+                    ans += [(0,-1)]
             
         color[i] = [(.8,.8,.8)] #for measure axis
         [color[i].append(numColor(a[1])) for a in ans]
@@ -8,39 +8,70 @@ Created by BNIAC on 2012-08-02.
 
 import sys
 import os
+import time
 import random as rd
 import math
-import heapq
 import json
 import cPickle as pickle
 import networkx as nx
 import numpy as np
 import matplotlib.pyplot as plt
 import scipy.stats as stats
-import operator
 import csv
 import itertools
+import multiprocessing
+import zlib
 from scipy.sparse import dok_matrix
 from itertools import izip
 from itertools import repeat
-from collections import defaultdict
+import kavosh
+import triads
+import edgeswap
+import motifcache
+import permtest
 GRAPHSIZE = 88
-
-class MotifData:
-  "Class containing motif data for a set of graphs"
+#Seed of the random weight matrices of the "rand" group, so they are the same graphs (and cache pieces) every run
+RANDSEED = 0
+
+class MotifData(object):
+  """Class containing motif data for a set of graphs. values is a patients x
+  motifs array of frequencies whose columns are the motif IDs in ids, and
+  keys the IDs (as unicode strings) that some patient has. Approximate
+  results also carry the standard error of every frequency in errors,
+  results against a null model the (means, deviations, z-scores) of every
+  motif count in the patient's random graphs in null, both as arrays
+  shaped like values. data is the list of {motif: frequency} dicts of the
+  patients, built when it is first asked for."""
 
   def __init__(self, data):
-	self.subgraphs, self.data = zip(*data)
-	allkeys = set()
-	for dic in self.data:
-	  allkeys.update(set(dic.keys()))
-	self.keys = allkeys
+	if not isinstance(data, motifcache.MotifTable):
+	  data = motifcache.fromMotifs(data)
+	self.table = data
+	self.subgraphs = np.asarray(data.subgraphs, dtype=np.int64)
+	self.ids = np.asarray(data.ids, dtype=np.int64)
+	self.values = data.frequencies()
+	self.columns = dict((int(iD), c) for c, iD in enumerate(self.ids))
+	self.found = self.values.any(axis=0)
+	self.keys = set(unicode(int(iD)) for iD in self.ids[self.found])
+	self.errors = data.dense('errors') if 'errors' in data else None
+	self.null = tuple(data.dense(name) for name in ('means', 'deviations', 'zscores')) if 'means' in data else None
+	self._data = None
+
+  @property
+  def data(self):
+	if self._data is None:
+	  self._data = tuple(dict((unicode(int(self.ids[c])), float(row[c])) for c in np.nonzero(row)[0])
+			     for row in self.values)
+	return self._data
+
+  def column(self, motif):
+	"Column of motif in values, None if no patient has it"
+	return self.columns.get(int(motif))
 	  
   def __getitem__(self, motif):
 	"Get array of number of motif for each patient"
-	motif = unicode(motif)
-	row = [d[motif] if motif in d else 0. for d in self.data]
-	return np.array(row)
+	c = self.column(motif)
+	return self.values[:,c].copy() if c is not None else np.zeros(len(self))
   
   def __contains__(self, item):
 	return self.keys.__contains__(unicode(item))
@@ -49,54 +80,233 @@ class MotifData:
 	return iter(self.data)
   
   def __len__(self):
-	return len(self.data)
+	return len(self.values)
   
+  def means(self):
+	"Mean frequency of every motif in ids over the patients"
+	return self.values.mean(axis=0)
+
+  def stds(self):
+	"Standard deviation of the frequency of every motif in ids over the patients"
+	return self.values.std(axis=0)
+
   def iterSortedValues(self):
 	"Iterate sorted motif values for each patient"
-	return (sorted(g.values()) for g in iter(self.data))
+	return (sorted(row[row != 0].tolist()) for row in self.values)
   
   def topMotifs(self, num):
 	"Return top num motifs"
-	return heapq.nlargest(num, self.keys, key = lambda x: self[x].mean())
+	means = self.means()
+	candidates = np.nonzero(self.found)[0]
+	if num < len(candidates):
+	  candidates = candidates[np.argpartition(-means[candidates], num)[:num]]
+	candidates = candidates[np.argsort(-means[candidates], kind='mergesort')]
+	return [unicode(int(self.ids[c])) for c in candidates]
   
   def iterTotals(self):
 	"Iterate through total number of motifs for each patient"
-	for d,sub in izip(self.data,self.subgraphs):
-	  t = {}
-	  for motif,value in d.iteritems():
-		t[int(i)] = int(value*sub+0.1)
-	  yield t
+	if 'counts' in self.table:
+	  counts = self.table.dense('counts')
+	else:
+	  counts = np.rint(self.values*self.subgraphs[:,np.newaxis]).astype(np.int64)
+	for row in counts:
+	  yield dict((int(self.ids[c]), int(row[c])) for c in np.nonzero(row)[0])
 
   def getPatient(self, pat):
 	return self.data[pat]
 
   def getSubgraphs(self, pat):
 	return self.subgraphs[pat]
+
+  def getErrors(self, motif):
+	"Get array of standard errors of motif for each patient (approximate results only)"
+	c = self.column(motif)
+	return self.errors[:,c].copy() if c is not None else np.zeros(len(self))
+
+  def getNullStatistics(self, motif):
+	"""Get arrays of the mean and standard deviation of the count of motif
+	in the random graphs of each patient and of its z-score (null model
+	results only, a z-score is nan when the deviation is 0)"""
+	c = self.column(motif)
+	if c is None:
+	  return np.zeros(len(self)), np.zeros(len(self)), np.repeat(np.nan, len(self))
+	return tuple(column[:,c].copy() for column in self.null)
 	
 
 
+class LazyMotifData(MotifData):
+  """MotifData that reads a motif's column from its table only when the
+  motif is asked for, e.g. straight from the memory mapped cache. means,
+  stds, keys and topMotifs come from the table's summary, so ranking
+  motifs reads no matrix at all; the per-patient methods read the table
+  a block of rows at a time. Columns that were read are kept."""
+
+  def __init__(self, data):
+	self.table = data
+	self.subgraphs = np.asarray(data.subgraphs, dtype=np.int64)
+	self.ids = np.asarray(data.ids, dtype=np.int64)
+	self.columns = dict((int(iD), c) for c, iD in enumerate(self.ids))
+	summary = data.summary()
+	self.found = summary[0] > 0
+	self.keys = set(unicode(int(iD)) for iD in self.ids[self.found])
+	self._read = {}
+	self._data = None
+
+  @property
+  def data(self):
+	if self._data is None:
+	  self._data = tuple(dict((unicode(int(self.ids[c])), float(row[c])) for c in np.nonzero(row)[0])
+			     for row in self.iterRows())
+	return self._data
+
+  def iterRows(self):
+	"Iterate the frequency rows of the patients, reading motifcache.BLOCK rows at a time"
+	for start in xrange(0, len(self), motifcache.BLOCK):
+	  for row in self.table.frequencies(slice(start, start+motifcache.BLOCK)):
+		yield row
+
+  def __getitem__(self, motif):
+	c = self.column(motif)
+	if c is None:
+	  return np.zeros(len(self))
+	if c not in self._read:
+	  self._read[c] = self.table.frequency(c)
+	return self._read[c].copy()
+
+  def __len__(self):
+	return len(self.table)
+
+  def means(self):
+	return self.table.summary()[1] / max(len(self), 1)
+
+  def stds(self):
+	summary = self.table.summary()
+	means = self.means()
+	return np.sqrt(np.maximum(summary[2] / max(len(self), 1) - means**2, 0))
+
+  def iterSortedValues(self):
+	return (sorted(row[row != 0].tolist()) for row in self.iterRows())
+
+  def iterTotals(self):
+	for start in xrange(0, len(self), motifcache.BLOCK):
+	  rows = slice(start, start+motifcache.BLOCK)
+	  if 'counts' in self.table:
+		counts = self.table.dense('counts', rows)
+	  else:
+		counts = np.rint(self.table.frequencies(rows)*self.subgraphs[rows,np.newaxis]).astype(np.int64)
+	  for row in counts:
+		yield dict((int(self.ids[c]), int(row[c])) for c in np.nonzero(row)[0])
+
+  def getPatient(self, pat):
+	row = self.table.frequencies(slice(pat, pat+1))[0]
+	return dict((unicode(int(self.ids[c])), float(row[c])) for c in np.nonzero(row)[0])
+
+  def getErrors(self, motif):
+	c = self.column(motif)
+	return self.table.get('errors', c) if c is not None else np.zeros(len(self))
+
+  def getNullStatistics(self, motif):
+	c = self.column(motif)
+	if c is None:
+	  return np.zeros(len(self)), np.zeros(len(self)), np.repeat(np.nan, len(self))
+	return tuple(self.table.get(name, c) for name in ('means', 'deviations', 'zscores'))
+
+
 #do a permutation "t-test" of significance of the two means
-def permttest(d1,d2,kmax=5000):	 #d is vector with 2 groups of data, maxk = max shuffles
-	sign = d1.mean() - d2.mean()
-	d1 = list(d1)
-	d2 = list(d2)
-	nd1,nd2 = d1,d2
-	n1,n2 = len(d1),len(d2)
-	n = n1+n2
-	dtot = d1+d2
-	mvreal = 1.0*sum(d1)/n1-1.0*sum(d2)/n2
-	mvs = []
-	#shuffle and compute
-	for k in range(kmax):
-		rd.shuffle(dtot)
-		nd1 = dtot[0:n1]
-		nd2 = dtot[n1:n]
-		mvs += [1.0*sum(nd1)/n1-1.0*sum(nd2)/n2]
-	mvs = sorted(mvs)
-	for i in range(kmax):
-		if mvreal < mvs[i]:
-			return (sign , (min(1.0*(kmax-i)/kmax,1.0*i/kmax)))
-	return (sign,(1.0/kmax))
+def permttest(d1,d2,kmax=5000,stop=None,precision=None):	 #d is vector with 2 groups of data, maxk = max shuffles
+	"""(sign, p) of the difference of the means of d1 and d2 (see
+	permtest.py), a list of them if d1 and d2 are patients x features.
+	stop or precision stop the shuffles of a feature early"""
+	return permtest.permttest(d1, d2, kmax, stop=stop, precision=precision)
+
+#Group pairs of the tables: the four groups against each other, then each against its random graphs
+COMPARISONS = [(0,1),(0,2),(0,3),(1,2),(1,3),(2,3),(0,4),(1,5),(2,6),(3,7)]
+
+def groupStats(groups, randomPairs=COMPARISONS[6:], pairs=COMPARISONS[:6], kmax=5000, seed=None):
+	"""(sign, p) lists of the pairs of the four groups in groups[:4], all
+	from the same label shuffles (permtest.multiGroup), then those of
+	randomPairs, and last (None, p) of the omnibus test of the four groups"""
+	seeds = np.random.RandomState(seed)
+	pairwise, omnibus = permtest.multiGroup(groups[:4], pairs, kmax, seeds.randint(2**31))
+	random = permtest.compare(groups, randomPairs, kmax, seeds.randint(2**31)) if randomPairs else []
+	return pairwise + random + [[(None, p) for statistic, p in omnibus]]
+
+def cellSeed(seed, label, key):
+	"Seed of the tests of one cell of a stats grid, whatever the workers and the other cells"
+	return [int(seed), zlib.crc32(str((label, str(key)))) & 0xffffffff]
+
+def statsCell(task):
+	"Tests of one cell of a stats grid and the seconds they took"
+	columns, pairs, randomPairs, kmax, seed = task
+	start = time.time()
+	tests = tuple(test[0] for test in groupStats(columns, randomPairs, pairs, kmax, seed))
+	return tests, time.time() - start
+
+def cellDigest(task):
+	"""Digest naming the tests of a stats grid cell in the cache: its
+	columns, the pairs, kmax, seed and the sequential settings of permtest"""
+	columns, pairs, randomPairs, kmax, seed = task
+	sequential = (permtest.STOP, permtest.PRECISION, permtest.FIRST) if permtest.STOP or permtest.PRECISION else None
+	return motifcache.testDigest(columns, repr(('groupStats', pairs, randomPairs, kmax, seed, sequential)))
+
+def statsGrid(jobs, pairs=COMPARISONS[:6], randomPairs=COMPARISONS[6:], kmax=5000, seed=0, workers=1, useCache=True):
+	"""Run the groupStats of a grid of cells, one per feature of every job,
+	on workers processes. jobs is a list of (label, keys, groups), groups
+	being the patients x keys arrays of the groups. Every cell has its own
+	seed (cellSeed), so the table does not depend on workers. With
+	useCache the tests of a cell are kept in cache/tests/ (cellDigest) and
+	only cells whose values or settings changed are tested again. Returns
+	a dict mapping each label to its rows, (key, (sign, p) of every test)
+	in the order of keys"""
+	cells = [(label, key) for label, keys, groups in jobs for key in keys]
+	tasks = [([group[:,k] for group in groups], pairs, randomPairs, kmax, cellSeed(seed, label, key))
+		 for label, keys, groups in jobs for k, key in enumerate(keys)]
+	results = [None]*len(tasks)
+	if useCache:
+		digests = [cellDigest(task) for task in tasks]
+		results = [motifcache.loadTest('cache', digest) for digest in digests]
+		results = [None if result is None else tuple(tuple(test) for test in result) for result in results]
+		found = sum(result is not None for result in results)
+		motifcache.record('cache', hits=found, misses=len(tasks)-found, kind='tests')
+	todo = [index for index, result in enumerate(results) if result is None]
+	sys.stdout.write("Stats: "+str(len(todo))+"/"+str(len(tasks))+" cells not in the cache\n")
+	sys.stdout.flush()
+
+	costs = {}
+	numstring = "/"+str(len(todo))+" cells"
+	pool = multiprocessing.Pool(workers) if workers > 1 and len(todo) > 1 else None
+	try:
+		computed = (pool.imap(statsCell, [tasks[index] for index in todo], max(1, len(todo)//(4*workers))) if pool
+			    else itertools.imap(statsCell, (tasks[index] for index in todo)))
+		for done, (index, (tests, seconds)) in enumerate(izip(todo, computed)):
+			results[index] = tests
+			if useCache:
+				motifcache.saveTest('cache', digests[index], tests)
+				costs[digests[index]] = seconds
+			sys.stdout.write("\rStats Progress: "+str(done+1)+numstring)
+			sys.stdout.flush()
+	finally:
+		if pool:
+			pool.close()
+			pool.join()
+		if costs:
+			motifcache.record('cache', costs=costs, kind='tests')
+			motifcache.prune('cache')
+	print '\nStats Done!'
+
+	table = dict((label, []) for label, keys, groups in jobs)
+	for (label, key), tests in izip(cells, results):
+		table[label].append((key,) + tests)
+	return table
+
+def motifMatrix(motifs, keys):
+	"""patients x keys array of motif frequencies of a MotifData or a list of
+	{motif: frequency} dicts, 0 where a patient does not have a motif"""
+	if isinstance(motifs, MotifData):
+		if not len(keys):
+			return np.zeros((len(motifs), 0))
+		return np.column_stack([motifs[key] for key in keys])
+	return np.array([[d[key] if key in d else 0. for key in keys] for d in motifs]).reshape(len(motifs), len(keys))
 
 def makeSwapData(degree=10):
   """generates edgeswapped graph pickle file"""
@@ -113,15 +323,33 @@ def makeSwapData(degree=10):
 	  sortedWeights = np.sort(G,axis=None)
 	  threshold = sortedWeights[-len(G)*degree-1]
 
-	  graph = nx.DiGraph(G>threshold)
-	  diff = randomize_graph(graph, 2500)
+	  graph = nx.DiGraph(edgeswap.randomize(G>threshold, 2500, output='matrix'))
 	  keyData.append(graph)
 	swapData[key] = keyData
   
   with open("SwapData"+str(degree)+".pkl",'wb') as f:
 	pickle.dump(swapData,f)
 	
-def buildCache(motifSize, degree):
+def makeSwapEnsemble(degree=10, replicates=100, swaps=2500, seed=0, workers=1):
+  """generates replicates edge-swapped versions of every graph, stored in
+  SwapEnsemble<degree>.npy/.json (read them with edgeswap.NullEnsemble)"""
+  with open("aznorbert_corrsd_new.pkl","rb") as f:
+	data = pickle.load(f)
+
+  groups = {}
+  for key, graphs in data.iteritems():
+	keyData = []
+	for G in graphs:
+	  sortedWeights = np.sort(G,axis=None)
+	  threshold = sortedWeights[-len(G)*degree-1]
+	  keyData.append(G>threshold)
+	groups[key] = keyData
+
+  filename = "SwapEnsemble"+str(degree)
+  edgeswap.writeEnsemble(filename, groups, replicates, swaps, seed, workers)
+  return edgeswap.NullEnsemble(filename)
+
+def buildCache(motifSize, degree, workers=1):
   """builds cache for graphs (both edge-swapped and original)"""
   with open("aznorbert_corrsd_new.pkl","rb") as f:
 	data = pickle.load(f)
@@ -132,56 +360,121 @@ def buildCache(motifSize, degree):
   for corr in ("corr","lcorr","lacorr"):
 		for ty in ("AD","MCI","NL","CONVERT"):
 			print "Building Cache for " + str((corr, ty))
-			findMotifs(data, (ty,corr), motifSize, degree, randGraphs)
-			findMotifs(data, (ty,corr), motifSize, degree)
+			findMotifs(data, (ty,corr), motifSize, degree, randGraphs, workers=workers)
+			findMotifs(data, (ty,corr), motifSize, degree, workers=workers)
   
   
 
-def findMotifs(data,key,motifSize=3,degree=10,randGraphs=None, useCache=True, printMotifs=False):
+def groupGraphs(data, key):
+  """weight matrices of a group (100 random ones drawn from RANDSEED for
+  the key 'rand')"""
+  if key == "rand":
+	"""Generate random adjacency matricies"""
+	random = np.random.RandomState(RANDSEED)
+	graphs = []
+	for i in xrange(100):
+	  x = random.rand(GRAPHSIZE,GRAPHSIZE)
+	  x -= np.diag(np.diag(x))
+	  graphs.append(x)
+	return graphs
+  return data[key]
+
+def cacheName(key, motifSize, degree, randGraphs=None):
+  """cache name of a group's motifs"""
+  filename = "" if randGraphs is None else getattr(randGraphs, 'name', "RAND")
+  return filename + str(key)+'s'+str(int(motifSize))+'d'+str(int(degree))
+
+def readCache(name, digests):
+  """cached motif table of a cache name (a motifcache directory, or an old
+  JSON file that motifcache.migrate has not converted yet) if its rows are
+  the graphs with these digests, None otherwise. Tables from before graph
+  digests are taken as they are when they have a row for every graph, and
+  their rows become the cached pieces of those graphs. An entry that
+  cannot be read, e.g. a JSON file cut short by an old run, is counted
+  again."""
+  path = 'cache/'+name
+  table = None
+  try:
+	if motifcache.exists(path):
+	  table = motifcache.load(path)
+	elif os.path.exists(path+".json"):
+	  with open(path+".json","rb") as f:
+		table = motifcache.fromMotifs(json.load(f))
+  except (IOError, OSError, ValueError, KeyError):
+	print "Cache entry " + name + " is incomplete, counting it again"
+	return None
+  if table is not None and table.digests == list(digests):
+	return table
+  if table is None:
+	return None
+  if table.digests is not None or len(table) != len(digests):
+	return None
+  with motifcache.Lock('cache', name):
+	for p, digest in enumerate(digests):
+	  if motifcache.loadPiece('cache', digest) is None:
+		motifcache.savePiece('cache', digest, table.row(p))
+	table.digests = list(digests)
+	writeCache(name, table)
+  return table
+
+def writeCache(name, table):
+  motifcache.save(table, 'cache/'+name)
+
+def readPieces(digests, useCache=True):
+  "cached census tuples of graph digests, None for those that are not cached"
+  if not useCache:
+	return [None]*len(digests)
+  pieces = [motifcache.loadPiece('cache', digest) for digest in digests]
+  found = sum(piece is not None for piece in pieces)
+  motifcache.record('cache', hits=found, misses=len(pieces)-found)
+  return pieces
+
+def writePieces(digests, results, seconds=0.):
+  """cache census tuples of graph digests that took seconds to count all
+  together. Returns their costs for motifcache.record, which callers call
+  once for all they wrote."""
+  for digest, census in izip(digests, results):
+	motifcache.savePiece('cache', digest, census)
+  return dict((digest, seconds/max(len(digests),1)) for digest in digests)
+
+def findMotifs(data,key,motifSize=3,degree=10,randGraphs=None, useCache=True, printMotifs=False, backend='auto', workers=1, threads=1,
+	       approximate=False, fraction=0.1, accuracy=0, timeBudget=0, seed=0, nullModel=None, nRandom=1000, swapAttempts=None, lazy=False):
 
   def printMotifs(motifs, filename):
 	"""writes motifs to file by descending frequency"""
-	tempmotifdict = defaultdict(float)
-	numpatients = float(len(motifs))
-	for patient, motifdict in motifs:
-	  for motif, freq in motifdict.items():
-#		 print motif, freq
-		tempmotifdict[motif] += freq/numpatients
-	
-	motiflist = sorted(tempmotifdict.iteritems(), key=operator.itemgetter(1), reverse=True)
+	means = motifs.means()
 	f = open(filename, 'wb')
 	f.write('Motifs:	 Frequencies:\n')
-	for motif, freq in motiflist:
-	  f.write(str(motif).ljust(12)+ "%.2f" % (freq*100) + '%' + '\n')
+	for motif in motifs.topMotifs(len(motifs.ids)):
+	  f.write(str(motif).ljust(12)+ "%.2f" % (means[motifs.column(motif)]*100) + '%' + '\n')
 	f.close()
 
 	  
-  """Main finding motifs routine"""
-  if key == "rand":
-	"""Generate random adjacency matricies"""
-	graphs = []
-	for i in xrange(100):
-	  x = np.random.rand(GRAPHSIZE,GRAPHSIZE)
-	  x -= np.diag(np.diag(x))
-	  graphs.append(x)
-  else:
-	graphs = data[key]
-
-
-  #Check cache
-  filename = "" if randGraphs is None else "RAND"
-  filename += str(key)+'s'+str(int(motifSize))+'d'+str(int(degree))+".json"
-  if os.path.exists('cache/'+filename) and useCache:
-	print "in cache"
-	cachedata = json.load( open('cache/'+filename,"rb"))
-	if printMotifs:
-		frequency_filename = "MotifFrequencyDegree{}/{}.txt".format(degree, filename[:-5])
-		printMotifs(cachedata, frequency_filename)
-	  
-	return MotifData(cachedata)
-
-  motifs = []
-  numstring ="/"+str(len(graphs))
+  """Main finding motifs routine
+
+  motifSize can also be a list of sizes. Every size missing from the cache
+  is then counted in one Kavosh enumeration of the largest size, and the
+  result is a dict mapping each size to its MotifData.
+
+  nullModel='swap' also counts nRandom degree preserving edge swapped
+  versions of every patient's graph in Kavosh (seeded by seed), and the
+  MotifData holds the mean, deviation and z-score of every motif count.
+  nullModel='chain' samples the same null model from one chain of swaps,
+  every swapAttempts swap attempts (kavosh.nullChain).
+
+  lazy returns LazyMotifData, which only reads the motifs asked for from
+  the cache."""
+  motifClass = LazyMotifData if lazy else MotifData
+  if nullModel is not None:
+	if nullModel not in ('swap', 'chain'):
+	  raise ValueError("Unknown null model: " + str(nullModel))
+	if approximate or randGraphs is not None or backend == 'numpy':
+	  raise ValueError("The swap null model needs an exact Kavosh census of the original graphs")
+  graphs = groupGraphs(data, key)
+
+  sizes = [motifSize] if np.isscalar(motifSize) else sorted(set(int(size) for size in motifSize))
+
+  graphList = []
   rejected = 0
   for index,G in enumerate(graphs):
 	#Cull bad graphs
@@ -192,49 +485,196 @@ def findMotifs(data,key,motifSize=3,degree=10,randGraphs=None, useCache=True, pr
 	#calculate threshold
 	sortedWeights = np.sort(G,axis=None)
 	threshold = sortedWeights[-len(G)*degree-1]
-	#Print progress
-	sys.stdout.write("\rMotif Finding Progress: "+str(index)+numstring)
-	sys.stdout.write(" Threshold: "+str(threshold) +'\n')
-	sys.stdout.flush()
-
-	#Output graph to txt file
-	graph = nx.DiGraph(G>threshold)
-	graph = nx.convert_node_labels_to_integers(graph,1)
+	graph = G>threshold
 	if randGraphs is not None:
 	  graph = randGraphs[key][index]
-	with open('result/OUTPUT.txt','wb') as f:
-	  f.write(str(len(graph)) + '\n')
-	  nx.write_edgelist(graph,f,data=False)
-
-	#Jenky way to use c++ motif finder in python
-	os.system("./Kavosh "+str(motifSize))
-	with open("result/MotifCount.txt","rb") as f:
-	  subgraphs = float(f.next())
-	  data = np.loadtxt(f, ndmin=2)
-
-	#Append data for this graph
-	personMotifs = {}
-	for iD,total in data:
-	  personMotifs[unicode(int(iD))] = total/subgraphs
-	motifs.append((int(subgraphs),personMotifs))
-
-  print '\nMotifs Done! Graphs Rejected: '+str(rejected)
-  
-  #add motifs to cache
-  
-  #if printMotifs:
-  #	print motifs
-	
-  if useCache:
-	if not os.path.isdir('cache'):
-	  os.makedirs('cache')
-	json.dump(motifs, open('cache/'+filename,'wb'), separators=(',',':'))
-	
-  if printMotifs:
-  	frequency_filename = "MotifFrequencyDegree{}/{}.txt".format(degree, filename[:-5])
-  	printMotifs(motifs, frequency_filename)
+	graphList.append(graph)
+
+  settings = ''
+  if approximate:
+	settings = 'f'+str(fraction)+'e'+str(accuracy)+'t'+str(timeBudget)+'seed'+str(seed)
+  if nullModel is not None:
+	settings = nullModel+str(nRandom)+('a'+str(swapAttempts) if nullModel == 'chain' and swapAttempts else '')+'seed'+str(seed)
+
+  filenames = {}
+  digests = {}
+  motifData = {}
+  for size in sizes:
+	filenames[size] = cacheName(key, size, degree, randGraphs) + settings
+	digests[size] = [motifcache.graphDigest(graph, size, settings) for graph in graphList]
+
+  def checkCache(sizes):
+	"""Check cache, a group table is used as it is if it holds exactly
+	these graphs. Returns the sizes that are not cached."""
+	hits = 0
+	for size in sizes:
+	  table = readCache(filenames[size], digests[size]) if useCache else None
+	  if table is not None:
+		print "in cache"
+		hits += len(table)
+		motifData[size] = motifClass(table)
+		if printMotifs:
+		  frequency_filename = "MotifFrequencyDegree{}/{}.txt".format(degree, filenames[size])
+		  printMotifs(motifData[size], frequency_filename)
+	if hits:
+	  motifcache.record('cache', hits=hits)
+	return [size for size in sizes if size not in motifData]
+
+  missing = checkCache(sizes)
+  if not missing:
+	return motifData[motifSize] if np.isscalar(motifSize) else motifData
+
+  #A process counting the same sizes of this group first waits for the one
+  #already at it, and then only counts what that one did not cache
+  with motifcache.locks('cache', [filenames[size] for size in missing] if useCache else []):
+	missing = checkCache(missing)
+	if not missing:
+	  return motifData[motifSize] if np.isscalar(motifSize) else motifData
+
+	#Only the graphs without a cached census of some missing size are counted
+	pieces = dict((size, readPieces(digests[size], useCache)) for size in missing)
+	todo = [i for i in xrange(len(graphList)) if any(pieces[size][i] is None for size in missing)]
+	countList = [graphList[i] for i in todo]
+	sys.stdout.write("Motif Finding: "+str(len(todo))+"/"+str(len(graphList))+" graphs not in the cache\n")
+	sys.stdout.flush()
 
-  return MotifData(motifs)
+	#Motif census of every graph to count in one go, all missing sizes in one enumeration
+	results = dict((size, []) for size in missing)
+	start = time.time()
+	if not countList:
+	  pass
+	elif nullModel == 'chain':
+	  for size in missing:
+		results[size] = [kavosh.nullChain(graph, size, nRandom, swapAttempts, seed, threads=threads)
+				 for graph in countList]
+	elif nullModel is not None:
+	  for size in missing:
+		results[size] = [kavosh.nullModel(graph, size, nRandom, seed, backend=backend, threads=threads)
+				 for graph in countList]
+	elif approximate:
+	  if backend == 'numpy':
+		raise ValueError("The numpy backend has no approximate mode")
+	  for size in missing:
+		results[size] = kavosh.sampleBatch(countList, size, fraction, accuracy=accuracy, timeBudget=timeBudget,
+						   seed=seed, backend=backend, threads=threads)
+	elif backend == 'numpy' or (backend == 'auto' and missing == [3]):
+	  if missing != [3]:
+		raise ValueError("The numpy backend only counts size 3 motifs")
+	  results[3] = triads.censusBatch(countList)
+	elif len(missing) == 1:
+	  results[missing[0]] = kavosh.censusBatch(countList, missing[0], backend=backend, workers=workers, threads=threads)
+	else:
+	  censuses = kavosh.censusBatch(countList, missing, backend=backend, workers=workers, threads=threads)
+	  for size in missing:
+		results[size] = [census[size] for census in censuses]
+
+	seconds = (time.time() - start)/max(len(missing), 1)
+	print '\nMotifs Done! Graphs Rejected: '+str(rejected)
+
+	costs = {}
+	for size in missing:
+	  filename = filenames[size]
+	  for i, census in izip(todo, results[size]):
+		pieces[size][i] = census
+	  table = motifcache.fromCensus(pieces[size], digests[size])
+
+	  #add motifs to cache
+	  if useCache:
+		costs.update(writePieces([digests[size][i] for i in todo], results[size], seconds))
+		writeCache(filename, table)
+
+	  motifData[size] = motifClass(table)
+	  if printMotifs:
+		frequency_filename = "MotifFrequencyDegree{}/{}.txt".format(degree, filename)
+		printMotifs(motifData[size], frequency_filename)
+	if useCache:
+	  motifcache.record('cache', costs=costs)
+	  motifcache.prune('cache')
+
+  return motifData[motifSize] if np.isscalar(motifSize) else motifData
+
+def sweepMotifs(data,key,motifSize=3,degrees=(8,10,12),useCache=True,threads=1,lazy=False):
+  """findMotifs for several average degrees from one threshold sweep
+
+  The graph of a patient at a higher degree holds all edges of the lower
+  degrees, so kavosh.thresholdSweep counts the lowest degree once and then
+  only updates the subgraphs around each added edge. A patient is left out
+  at the degrees findMotifs would reject it. Every degree is cached like
+  findMotifs caches it, and a dict mapping each degree to its MotifData is
+  returned (LazyMotifData if lazy). motifSize is at most 5."""
+  motifClass = LazyMotifData if lazy else MotifData
+  graphs = groupGraphs(data, key)
+  degrees = sorted(set(degrees))
+
+  #Digests of the thresholded graph of every patient at every degree it is not rejected at
+  digests = dict((degree, []) for degree in degrees)
+  patients = dict((degree, []) for degree in degrees)
+  for index,G in enumerate(graphs):
+	sortedWeights = np.sort(G,axis=None)
+	for degree in degrees:
+	  if np.count_nonzero(G)>=len(G)*degree:
+		threshold = sortedWeights[-len(G)*degree-1]
+		digests[degree].append(motifcache.graphDigest(G>threshold, motifSize))
+		patients[degree].append(index)
+
+  motifData = {}
+  def checkCache(degrees):
+	"Check cache, returns the degrees that are not cached"
+	hits = 0
+	for degree in degrees:
+	  table = readCache(cacheName(key, motifSize, degree), digests[degree]) if useCache else None
+	  if table is not None:
+		print "in cache"
+		hits += len(table)
+		motifData[degree] = motifClass(table)
+	if hits:
+	  motifcache.record('cache', hits=hits)
+	return [degree for degree in degrees if degree not in motifData]
+
+  missing = checkCache(degrees)
+  if not missing:
+	return motifData
+
+  #Wait for a process sweeping the same degrees of this group, see findMotifs
+  with motifcache.locks('cache', [cacheName(key, motifSize, degree) for degree in missing] if useCache else []):
+	missing = checkCache(missing)
+	if not missing:
+	  return motifData
+
+	pieces = dict((degree, readPieces(digests[degree], useCache)) for degree in missing)
+	numstring ="/"+str(len(graphs))
+	#the costs of the pieces are recorded once, also when the sweep is cut short
+	costs = {}
+	try:
+	  for index,G in enumerate(graphs):
+		#Only sweep the degrees the patient is neither rejected at nor cached for
+		rows = dict((degree, patients[degree].index(index)) for degree in missing if index in patients[degree])
+		patientDegrees = [degree for degree in missing if degree in rows and pieces[degree][rows[degree]] is None]
+		if not patientDegrees:
+		  continue
+		sys.stdout.write("\rMotif Sweep Progress: "+str(index)+numstring)
+		sys.stdout.flush()
+		start = time.time()
+		censuses = kavosh.thresholdSweep(G, motifSize, patientDegrees, threads)
+		seconds = (time.time() - start)/len(patientDegrees)
+		for degree, census in censuses.iteritems():
+		  pieces[degree][rows[degree]] = census
+		  if useCache:
+			costs.update(writePieces([digests[degree][rows[degree]]], [census], seconds))
+	finally:
+	  if costs:
+		motifcache.record('cache', costs=costs)
+	print '\nMotif Sweep Done!'
+
+	for degree in missing:
+	  table = motifcache.fromCensus(pieces[degree], digests[degree])
+	  if useCache:
+		writeCache(cacheName(key, motifSize, degree), table)
+	  motifData[degree] = motifClass(table)
+	if useCache:
+	  motifcache.prune('cache')
+
+  return motifData
 
 
 def convertIDToGraph(mid, motifSize, save=False):
@@ -308,12 +748,47 @@ def plotMotifGraphs(data,motifSize=3,degree=10,numofmotifs=10,usetotal=False):
 	plt.clf()
 
 
-def PDFstats(data, filename, edgeSwap=False, motifSize=3, degree=10):
+def PDFstats(data, filename, edgeSwap=False, motifSize=3, degree=10, workers=1, seed=0):
 	"""Output a latex pdf of motif stats"""
 	filename = "result/" + filename + ".tex"
 
 	if not edgeSwap:
-		motifsNLRAND = motifsMCIRAND = motifsADRAND = motifsCONVERTRAND = findMotifs(data,"rand",motifSize=motifSize,degree=degree)
+		motifsNLRAND = motifsMCIRAND = motifsADRAND = motifsCONVERTRAND = findMotifs(data,"rand",motifSize=motifSize,degree=degree, lazy=True)
+
+	if edgeSwap:
+		with open("SwapData"+str(degree)+".pkl","rb") as pic:
+			randGraphs = pickle.load(pic)
+
+	jobs = []
+	for corr in ('corr','lcorr'):
+		print "Starting " + corr +"..."
+		motifsNL = findMotifs(data, ('NL',corr), motifSize = motifSize, degree=degree, lazy=True)
+		motifsMCI = findMotifs(data, ('MCI',corr), motifSize = motifSize, degree=degree, lazy=True)
+		motifsAD = findMotifs(data, ('AD',corr), motifSize = motifSize, degree=degree, lazy=True)
+		motifsCONVERT = findMotifs(data, ('CONVERT',corr), motifSize = motifSize, degree=degree, lazy=True)
+		if edgeSwap:
+			motifsNLRAND = findMotifs(data, ('NL',corr), motifSize = motifSize, degree=degree, randGraphs=randGraphs, lazy=True)
+			motifsMCIRAND = findMotifs(data, ('MCI',corr), motifSize = motifSize, degree=degree, randGraphs=randGraphs, lazy=True)
+			motifsADRAND = findMotifs(data, ('AD',corr), motifSize = motifSize, degree=degree, randGraphs=randGraphs, lazy=True)
+			motifsCONVERTRAND = findMotifs(data, ('CONVERT',corr), motifSize = motifSize, degree=degree, randGraphs=randGraphs, lazy=True)
+
+		allMotifs = list( motifsNL.keys
+						& motifsAD.keys
+						& motifsMCI.keys
+						& motifsCONVERT.keys
+						& motifsNLRAND.keys
+						& motifsMCIRAND.keys
+						& motifsADRAND.keys
+						& motifsCONVERTRAND.keys )
+
+		allMotifs = motifsNL.topMotifs(30)
+
+		groups = [motifMatrix(motifs, allMotifs) for motifs in (motifsNL, motifsMCI, motifsAD, motifsCONVERT,
+				  motifsNLRAND, motifsMCIRAND, motifsADRAND, motifsCONVERTRAND)]
+		jobs.append((corr, allMotifs, groups))
+
+	#every comparison of every motif, one grid cell per motif
+	table = statsGrid(jobs, seed=seed, workers=workers)
 
 	with open(filename,'wb') as f:
 		f.write(
@@ -330,67 +805,26 @@ def PDFstats(data, filename, edgeSwap=False, motifSize=3, degree=10):
 		"\\begin{document}\n"
 		)
 
-		if edgeSwap:
-			with open("SwapData"+str(degree)+".pkl","rb") as pic:
-				randGraphs = pickle.load(pic)
-
-		statistics = {}		
-		for corr in ('corr','lcorr'):
-			print "Starting " + corr +"..."
-			motifsNL = findMotifs(data, ('NL',corr), motifSize = motifSize, degree=degree)
-			motifsMCI = findMotifs(data, ('MCI',corr), motifSize = motifSize, degree=degree)
-			motifsAD = findMotifs(data, ('AD',corr), motifSize = motifSize, degree=degree)
-			motifsCONVERT = findMotifs(data, ('CONVERT',corr), motifSize = motifSize, degree=degree)
-			if edgeSwap:
-				motifsNLRAND = findMotifs(data, ('NL',corr), motifSize = motifSize, degree=degree, randGraphs=randGraphs)
-				motifsMCIRAND = findMotifs(data, ('MCI',corr), motifSize = motifSize, degree=degree, randGraphs=randGraphs)
-				motifsADRAND = findMotifs(data, ('AD',corr), motifSize = motifSize, degree=degree, randGraphs=randGraphs)
-				motifsCONVERTRAND = findMotifs(data, ('CONVERT',corr), motifSize = motifSize, degree=degree, randGraphs=randGraphs)
-
-			allMotifs = list( motifsNL.keys
-							& motifsAD.keys
-							& motifsMCI.keys
-							& motifsCONVERT.keys
-							& motifsNLRAND.keys
-							& motifsMCIRAND.keys
-							& motifsADRAND.keys
-							& motifsCONVERTRAND.keys )
-
-			allMotifs = motifsNL.topMotifs(30)
-			
-			motifStats = []
-			for key in allMotifs:
-				norm = motifsNL[key]
-				mci = motifsMCI[key]
-				ad = motifsAD[key]
-				conv = motifsCONVERT[key]
-				c1 = permttest(norm, mci)
-				c2 = permttest(norm, ad)
-				c3 = permttest(norm, conv)
-				c4 = permttest(mci, ad)
-				c5 = permttest(mci, conv)
-				c6 = permttest(ad, conv)
-				c7 = permttest(norm, motifsNLRAND[key])
-				c8 = permttest(mci, motifsMCIRAND[key])
-				c9 = permttest(ad, motifsADRAND[key])
-				c10 = permttest(conv, motifsCONVERTRAND[key])
-				motifStats.append((key,c1,c2,c3,c4,c5,c6,c7,c8,c9,c10))
+		for corr, allMotifs, groups in jobs:
+			motifStats = table[corr]
 
 			f.write(
 			"\\begin{table}[t]\n"
 			"\\begin{adjustwidth}{-1.5in}{-1.5in} "
 			"\\caption{Motif T-test results from "+corr+" data with using edge swap}\n"
 			"\\centering\n"
-			"\\begin{tabular}{|c|c|c|c|c|c|c|c|c|c|c|}\n"
+			"\\begin{tabular}{|c|c|c|c|c|c|c|c|c|c|c|c|}\n"
 			"\\hline\n"
 			"\\rowcolor[gray]{0.85}\n"
-			"Key & NL to MCI & NL to AD & NL to Conv & MCI to AD & MCI to Conv & AD to Conv & NL to Rand & MCI to Rand & AD to Rand & Conv to Rand \\\\ \\hline\n"
+			"Key & NL to MCI & NL to AD & NL to Conv & MCI to AD & MCI to Conv & AD to Conv & NL to Rand & MCI to Rand & AD to Rand & Conv to Rand & All Groups \\\\ \\hline\n"
 			)
 			for stat in motifStats:
 				f.write( str(stat[0]) + " \\cellcolor[gray]{0.95}")
 				for sign,col in stat[1:]:
 					cell = " & {0:.3}".format(col)
-					if sign > 0:
+					if sign is None:
+						pass
+					elif sign > 0:
 						cell += '(+)'
 					else:
 						cell += '(-)'
@@ -521,11 +955,59 @@ def createfakeGroups(data, motifSize):
 	return newdata
 
 
-def PDFstatsShuf(data, filename, motifSize=3, degree=10):
+def PDFstatsShuf(data, filename, motifSize=3, degree=10, workers=1, seed=0):
   """Output a latex pdf of motif stats with the patient groups shuffled"""
   filename = "result/" + filename + ".tex"
   shufData = createfakeGroups(data, motifSize=motifSize)
 
+  jobs = []
+  for corr in ('corr','lcorr','lacorr'):
+	print "Starting " + corr +"..."
+	motifsNL = findMotifs(data, ('NL',corr), motifSize = motifSize, degree=degree)
+	motifsMCI = findMotifs(data, ('MCI',corr), motifSize = motifSize, degree=degree)
+	motifsAD = findMotifs(data, ('AD',corr), motifSize = motifSize, degree=degree)
+	motifsCONVERT = findMotifs(data, ('CONVERT',corr), motifSize = motifSize, degree=degree)
+
+	motifsNLRAND = shufData[('NL',corr)]
+	motifsMCIRAND = shufData[('MCI',corr)]
+	motifsADRAND = shufData[('AD',corr)]
+	motifsCONVERTRAND = shufData[('CONVERT',corr)]
+
+	NLRANDkeys = set()
+	for dic in motifsNLRAND:
+	  NLRANDkeys.update(set(dic.keys()))
+
+	MCIRANDkeys = set()
+	for dic in motifsMCIRAND:
+	  MCIRANDkeys.update(set(dic.keys()))
+
+	ADRANDkeys = set()
+	for dic in motifsADRAND:
+	  ADRANDkeys.update(set(dic.keys()))
+
+	CONVERTRANDkeys = set()
+	for dic in motifsCONVERTRAND:
+	  CONVERTRANDkeys.update(set(dic.keys()))
+
+	allMotifs = list( motifsNL.keys
+			& motifsAD.keys
+			& motifsMCI.keys
+			& motifsCONVERT.keys
+			& NLRANDkeys
+			& MCIRANDkeys
+			& ADRANDkeys
+			& CONVERTRANDkeys )
+
+	allMotifs = motifsNL.topMotifs(30)
+	allMotifs.sort(key=lambda key: motifsNL[key].mean(),reverse=True)
+
+	groups = [motifMatrix(motifs, allMotifs) for motifs in (motifsNL, motifsMCI, motifsAD, motifsCONVERT,
+			  motifsNLRAND, motifsMCIRAND, motifsADRAND, motifsCONVERTRAND)]
+	jobs.append((corr, allMotifs, groups))
+
+  #every comparison of every motif, one grid cell per motif
+  table = statsGrid(jobs, seed=seed, workers=workers)
+
   with open(filename,'wb') as f:
 	f.write(
 	"\\documentclass{article}\n"
@@ -541,81 +1023,26 @@ def PDFstatsShuf(data, filename, motifSize=3, degree=10):
 	"\\begin{document}\n"
 	)
 
-	statistics = {}	   
-	for corr in ('corr','lcorr','lacorr'):
-	  print "Starting " + corr +"..."
-	  motifsNL = findMotifs(data, ('NL',corr), motifSize = motifSize, degree=degree)
-	  motifsMCI = findMotifs(data, ('MCI',corr), motifSize = motifSize, degree=degree)
-	  motifsAD = findMotifs(data, ('AD',corr), motifSize = motifSize, degree=degree)
-	  motifsCONVERT = findMotifs(data, ('CONVERT',corr), motifSize = motifSize, degree=degree)
-
-	  motifsNLRAND = shufData[('NL',corr)]
-	  motifsMCIRAND = shufData[('MCI',corr)]
-	  motifsADRAND = shufData[('AD',corr)]
-	  motifsCONVERTRAND = shufData[('CONVERT',corr)]
-
-	  NLRANDkeys = set()
-	  for dic in motifsNLRAND:
-		NLRANDkeys.update(set(dic.keys()))
-
-	  MCIRANDkeys = set()
-	  for dic in motifsMCIRAND:
-		MCIRANDkeys.update(set(dic.keys()))
-
-	  ADRANDkeys = set()
-	  for dic in motifsADRAND:
-		ADRANDkeys.update(set(dic.keys()))
-
-	  CONVERTRANDkeys = set()
-	  for dic in motifsCONVERTRAND:
-		CONVERTRANDkeys.update(set(dic.keys()))
-
-	  allMotifs = list( motifsNL.keys
-			  & motifsAD.keys
-			  & motifsMCI.keys
-			  & motifsCONVERT.keys
-			  & NLRANDkeys
-			  & MCIRANDkeys
-			  & ADRANDkeys
-			  & CONVERTRANDkeys )
-
-	  allMotifs = motifsNL.topMotifs(30)
-
-	  motifStats = []
-	  for key in allMotifs:
-		norm = motifsNL[key]
-		mci = motifsMCI[key]
-		ad = motifsAD[key]
-		conv = motifsCONVERT[key]
-		c1 = permttest(norm, mci)
-		c2 = permttest(norm, ad)
-		c3 = permttest(norm, conv)
-		c4 = permttest(mci, ad)
-		c5 = permttest(mci, conv)
-		c6 = permttest(ad, conv)
-		c7 = permttest(norm, np.array([d[key] if key in d else 0. for d in motifsNLRAND]))
-		c8 = permttest(mci, np.array([d[key] if key in d else 0. for d in motifsMCIRAND]))
-		c9 = permttest(ad, np.array([d[key] if key in d else 0. for d in motifsADRAND]))
-		c10 = permttest(conv, np.array([d[key] if key in d else 0. for d in motifsCONVERTRAND]))
-		motifStats.append((key,c1,c2,c3,c4,c5,c6,c7,c8,c9,c10))
-
-	  motifStats.sort(key=lambda x: motifsNL[x[0]].mean(),reverse=True)
+	for corr, allMotifs, groups in jobs:
+	  motifStats = table[corr]
 
 	  f.write(
 	  "\\begin{table}[t]\n"
 	  "\\begin{adjustwidth}{-1.5in}{-1.5in} "
 	  "\\caption{Motif T-test results from "+corr+" data with using edge swap}\n"
 	  "\\centering\n"
-	  "\\begin{tabular}{|c|c|c|c|c|c|c|c|c|c|c|}\n"
+	  "\\begin{tabular}{|c|c|c|c|c|c|c|c|c|c|c|c|}\n"
 	  "\\hline\n"
 	  "\\rowcolor[gray]{0.85}\n"
-	  "Key & NL to MCI & NL to AD & NL to Conv & MCI to AD & MCI to Conv & AD to Conv & NL to Rand & MCI to Rand & AD to Rand & Conv to Rand \\\\ \\hline\n"
+	  "Key & NL to MCI & NL to AD & NL to Conv & MCI to AD & MCI to Conv & AD to Conv & NL to Rand & MCI to Rand & AD to Rand & Conv to Rand & All Groups \\\\ \\hline\n"
 	  )
 	  for stat in motifStats:
 		f.write( str(stat[0]) + " \\cellcolor[gray]{0.95}")
 		for sign,col in stat[1:]:
 		  cell = " & {0:.3}".format(col)
-		  if sign > 0:
+		  if sign is None:
+			pass
+		  elif sign > 0:
 			cell += '(+)'
 		  else:
 			cell += '(-)'
@@ -640,13 +1067,47 @@ def PDFstatsShuf(data, filename, motifSize=3, degree=10):
   os.system("pdflatex -output-directory result " + filename)
   os.system("rm result/*.log result/*.aux")
 
-def PDFdiststats(data, filename, edgeSwap=False, motifSize=3, degree=10):
+def PDFdiststats(data, filename, edgeSwap=False, motifSize=3, degree=10, workers=1, seed=0):
   """Output a latex pdf of motif distribution (entrophy, gini coeff, fatness) stats"""
   filename = "result/" + filename + ".tex"
 
   if not edgeSwap:
 	motifsNLRAND = motifsMCIRAND = motifsADRAND = motifsCONVERTRAND = findMotifs(data,"rand",motifSize=motifSize,degree=degree)
 
+  if edgeSwap:
+	with open("SwapData"+str(degree)+".pkl","rb") as pic:
+	  randGraphs = pickle.load(pic)
+
+  jobs = []
+  for corr in ('corr','lcorr','lacorr'):
+	print "Starting " + corr +"..."
+	motifsNL = findMotifs(data, ('NL',corr), motifSize = motifSize, degree=degree)
+	NLd = diststats(motifsNL)
+	motifsMCI = findMotifs(data, ('MCI',corr), motifSize = motifSize, degree=degree)
+	MCId = diststats(motifsMCI)
+	motifsAD = findMotifs(data, ('AD',corr), motifSize = motifSize, degree=degree)
+	ADd = diststats(motifsAD)
+	motifsCONVERT = findMotifs(data, ('CONVERT',corr), motifSize = motifSize, degree=degree)
+	CONVERTd = diststats(motifsCONVERT)
+	if edgeSwap:
+	  motifsNLRAND = findMotifs(data, ('NL',corr), motifSize = motifSize, degree=degree, randGraphs=randGraphs)
+	  motifsMCIRAND = findMotifs(data, ('MCI',corr), motifSize = motifSize, degree=degree, randGraphs=randGraphs)
+	  motifsADRAND = findMotifs(data, ('AD',corr), motifSize = motifSize, degree=degree, randGraphs=randGraphs)
+	  motifsCONVERTRAND = findMotifs(data, ('CONVERT',corr), motifSize = motifSize, degree=degree, randGraphs=randGraphs)
+
+	ADRANDd = diststats(motifsADRAND)
+	MCIRANDd = diststats(motifsMCIRAND)
+	CONVERTRANDd = diststats(motifsCONVERTRAND)
+	NLRANDd = diststats(motifsNLRAND)
+
+	measures = ('Entrophy', 'Gini Coeff', 'Fatness')
+	groups = [np.column_stack(d[:len(measures)]) for d in (NLd, MCId, ADd, CONVERTd,
+			  NLRANDd, MCIRANDd, ADRANDd, CONVERTRANDd)]
+	jobs.append((corr, measures, groups))
+
+  #the four groups against each other, one grid cell per measure (COMPARISONS[6:] against random left out)
+  table = statsGrid(jobs, randomPairs=None, seed=seed, workers=workers)
+
   with open(filename,'wb') as f:
 	f.write(
 	"\\documentclass{article}\n"
@@ -662,45 +1123,8 @@ def PDFdiststats(data, filename, edgeSwap=False, motifSize=3, degree=10):
 	"\\begin{document}\n"
 	)
 
-	if edgeSwap:
-	  with open("SwapData"+str(degree)+".pkl","rb") as pic:
-		randGraphs = pickle.load(pic)
-
-	statistics = {}	   
-	for corr in ('corr','lcorr','lacorr'):
-	  print "Starting " + corr +"..."
-	  motifsNL = findMotifs(data, ('NL',corr), motifSize = motifSize, degree=degree)
-	  NLd = diststats(motifsNL)
-	  motifsMCI = findMotifs(data, ('MCI',corr), motifSize = motifSize, degree=degree)
-	  MCId = diststats(motifsMCI)
-	  motifsAD = findMotifs(data, ('AD',corr), motifSize = motifSize, degree=degree)
-	  ADd = diststats(motifsAD)
-	  motifsCONVERT = findMotifs(data, ('CONVERT',corr), motifSize = motifSize, degree=degree)
-	  CONVERTd = diststats(motifsCONVERT)
-	  if edgeSwap:
-		motifsNLRAND = findMotifs(data, ('NL',corr), motifSize = motifSize, degree=degree, randGraphs=randGraphs)
-		motifsMCIRAND = findMotifs(data, ('MCI',corr), motifSize = motifSize, degree=degree, randGraphs=randGraphs)
-		motifsADRAND = findMotifs(data, ('AD',corr), motifSize = motifSize, degree=degree, randGraphs=randGraphs)
-		motifsCONVERTRAND = findMotifs(data, ('CONVERT',corr), motifSize = motifSize, degree=degree, randGraphs=randGraphs)
-
-	  ADRANDd = diststats(motifsADRAND)
-	  MCIRANDd = diststats(motifsMCIRAND)
-	  CONVERTRANDd = diststats(motifsCONVERTRAND)
-	  NLRANDd = diststats(motifsNLRAND)
-
-	  motifStats = []
-	  for pos,key in enumerate(('Entrophy', 'Gini Coeff', 'Fatness')):
-		c1 = permttest(NLd[pos], MCId[pos])
-		c2 = permttest(NLd[pos], ADd[pos])
-		c3 = permttest(NLd[pos], CONVERTd[pos])
-		c4 = permttest(MCId[pos], ADd[pos])
-		c5 = permttest(MCId[pos], CONVERTd[pos])
-		c6 = permttest(ADd[pos], CONVERTd[pos])
-		c7 = permttest(NLd[pos], NLRANDd[pos])
-		c8 = permttest(MCId[pos], MCIRANDd[pos])
-		c9 = permttest(ADd[pos], ADRANDd[pos])
-		c10 = permttest(CONVERTd[pos], CONVERTRANDd[pos])
-		motifStats.append((key,c1,c2,c3,c4,c5,c6))#,c7,c8,c9,c10))
+	for corr, measures, groups in jobs:
+	  motifStats = table[corr]
 
 	  f.write(
 	  "\\begin{table}[t]\n"
@@ -708,17 +1132,19 @@ def PDFdiststats(data, filename, edgeSwap=False, motifSize=3, degree=10):
 	  "\\caption{Motif Distribution T-test results from "+corr+" data with using edge swap}\n"
 	  "\\centering\n"
 	  #"\\begin{tabular}{|c|c|c|c|c|c|c|c|c|c|c|}\n"
-	  "\\begin{tabular}{|c|c|c|c|c|c|c|}\n"
+	  "\\begin{tabular}{|c|c|c|c|c|c|c|c|}\n"
 	  "\\hline\n"
 	  "\\rowcolor[gray]{0.85}\n"
 	  #"Measure & NL to MCI & NL to AD & NL to Conv & MCI to AD & MCI to Conv & AD to Conv & NL to Rand & MCI to Rand & AD to Rand & Conv to Rand \\\\ \\hline\n"
-	  "Measure & NL to MCI & NL to AD & NL to Conv & MCI to AD & MCI to Conv & AD to Conv \\\\ \\hline\n"
+	  "Measure & NL to MCI & NL to AD & NL to Conv & MCI to AD & MCI to Conv & AD to Conv & All Groups \\\\ \\hline\n"
 	  )
 	  for stat in motifStats:
 		f.write( str(stat[0]) + " \\cellcolor[gray]{0.95}")
 		for sign,col in stat[1:]:
 		  cell = " & {0:.3}".format(col)
-		  if sign > 0:
+		  if sign is None:
+			pass
+		  elif sign > 0:
 			cell += '(+)'
 		  else:
 			cell += '(-)'
@@ -745,50 +1171,36 @@ def PDFdiststats(data, filename, edgeSwap=False, motifSize=3, degree=10):
   
 """""""""""""""""HELPER FUNCTIONS"""""""""""""""""""""
 
-def randomize_graph(G, numpasses):
+def randomize_graph(G, numpasses, seed=None):
 	"Perfoms numpasses edge swaps in place on G"
-	for i in xrange(numpasses):
-		success = False
-		while not success:
-			edges = G.edges()
-			edgeSet = set(edges)
-			edge1 = rd.choice(edges)
-			a,b = edge1
-			rd.shuffle(edges)
-			for edge2 in edges:
-				c,d = edge2
-				if (a, d) not in edgeSet and (c, b) not in edgeSet:
-					success = True
-					break
-		G.add_edge(a, d)
-		G.add_edge(c, b)
-		G.remove_edge(a, b)
-		G.remove_edge(c, d)
-
-def randomize_graph_count(G, numpasses):
+	swapper = edgeswap.EdgeSwapper(G, seed=seed)
+	swapper.randomize(numpasses)
+	edgeswap.setEdges(G, swapper)
+
+def randomize_graph_count(G, numpasses, seed=None):
 	"Performs numpasses edgeswaps and returns diff from original"
-	original = nx.to_numpy_matrix(G)
+	swapper = edgeswap.EdgeSwapper(G, seed=seed)
 	diff = [0]
-	for i in xrange(numpasses):
-		success = False
-		while not success:
-			edges = G.edges()
-			edgeSet = set(edges)
-			edge1 = rd.choice(edges)
-			a,b = edge1
-			rd.shuffle(edges)
-			for edge2 in edges:
-				c,d = edge2
-				if (a, d) not in edgeSet and (c, b) not in edgeSet:
-					success = True
-					break
-		G.add_edge(a, d)
-		G.add_edge(c, b)
-		G.remove_edge(a, b)
-		G.remove_edge(c, d)
-		newGraph = nx.to_numpy_matrix(G)
-		diff.append( np.sum(abs(original-newGraph))/2 )
+	swapper.randomize(numpasses, diff)
+	edgeswap.setEdges(G, swapper)
 	return np.array(diff)
+
+def swapMixing(data, key, degrees=(8,10,12), numpasses=20000, seed=0):
+	"""Swap count at which the edge swaps of every graph in a group stop
+	moving away from the original graph (edgeswap.mixing), as a dict
+	mapping each degree to an array over patients (-1 where numpasses
+	was too few to tell). Their maximum is a numpasses backed by the data."""
+	graphs = groupGraphs(data, key)
+	result = {}
+	for degree in degrees:
+		plateaus = []
+		for index, G in enumerate(graphs):
+			sortedWeights = np.sort(G,axis=None)
+			threshold = sortedWeights[-len(G)*degree-1]
+			distance, swaps = edgeswap.mixing(G>threshold, numpasses, seed=[seed, degree, index])
+			plateaus.append(-1 if swaps is None else swaps)
+		result[degree] = np.array(plateaus)
+	return result
 	
 
 def diststats(graphdict):
@@ -832,7 +1244,7 @@ def rawMotifDataCSV(data):
 		with open("MotifRawData/"+filename,"wb") as f:
 			writer = csv.writer(f)
 			writer.writerow(["Motif ID","Mean","STD"])
-			data = findMotifs(data,(pat,corr), size)
+			data = findMotifs(data,(pat,corr), size, lazy=True)
 			for key in data.keys:
 				writer.writerow([key, data[key].mean(), data[key].std()])
 
@@ -853,10 +1265,14 @@ def rawDistDataCSV(data):
 
 
 
-def rawMotifTTestCSV(data):
+#Group pairs of the CSV files: the four groups (as in multiGroup), then NL and AD against their ER and DD random graphs
+CSV_COMPARISONS = [(0,2),(0,1),(1,3),(2,3),(0,4),(0,5),(2,6),(2,7)]
+
+def rawMotifTTestCSV(data, workers=1, seed=0):
 	corrs = ['corr','lcorr']
 	sizes = [3,4,5]
 
+	jobs = []
 	for corr,size in itertools.product(corrs,sizes):
 		filename = "NonParametricT_test{}{}.csv".format(corr,size)
 		print filename
@@ -903,32 +1319,27 @@ def rawMotifTTestCSV(data):
 			  & NLDDkeys
 			  & ADDDkeys )
 	
+		print "t-test of {} motifs".format(len(allMotifs))
+		groups = [motifMatrix(motifs, allMotifs) for motifs in (motifsNL, motifsMCI, motifsAD, motifsCONVERT,
+					motifsNLER, motifsNLDD, motifsADDD, motifsADER)]
+		jobs.append(((corr,size), allMotifs, groups))
+
+	table = statsGrid(jobs, CSV_COMPARISONS[:4], CSV_COMPARISONS[4:], seed=seed, workers=workers)
+
+	for corr,size in itertools.product(corrs,sizes):
+		filename = "NonParametricT_test{}{}.csv".format(corr,size)
 		with open("Motift_testData/"+filename,"wb") as f:
 			writer = csv.writer(f)
 			writer.writerow(["Motif","NL/AD","NL/MCI","MCI/CONV","AD/CONV","NL/ER(NL)"
-										,"NL/DD(NL)","AD/DD(AD)","AD/ER(AD)"])
-			print "t-test"
-			total = len(allMotifs)
-			for num, key in enumerate(allMotifs):
-				print "Key {} of {}".format(num+1,total)
-				norm = motifsNL[key]
-				mci = motifsMCI[key]
-				ad = motifsAD[key]
-				conv = motifsCONVERT[key]
-				sign, c1 = permttest(norm, ad)
-				sign, c2 = permttest(norm, mci)
-				sign, c3 = permttest(mci, conv)
-				sign, c4 = permttest(ad, conv)
-				sign, c5 = permttest(norm, motifsNLER[key])
-				sign, c6 = permttest(norm, motifsNLDD[key])
-				sign, c7 = permttest(ad, motifsADDD[key])
-				sign, c8 = permttest(ad, motifsADER[key])
-				writer.writerow([key,c1,c2,c3,c4,c5,c6,c7,c8])
+										,"NL/DD(NL)","AD/DD(AD)","AD/ER(AD)","Omnibus"])
+			for row in table[(corr,size)]:
+				writer.writerow([row[0]] + [p for sign, p in row[1:]])
 				
-def rawDistTTestCSV(data):
+def rawDistTTestCSV(data, workers=1, seed=0):
 	corrs = ['corr','lcorr']
 	sizes = [3,4,5]
 
+	jobs = []
 	for corr,size in itertools.product(corrs,sizes):
 		filename = "NonParametricT_test{}{}.csv".format(corr,size)
 		print filename
@@ -956,21 +1367,22 @@ def rawDistTTestCSV(data):
 
 
 
+		measures = ('Entrophy', 'Gini Coeff')
+		groups = [np.column_stack(d[:len(measures)]) for d in (NLd, MCId, ADd, CONVERTd,
+					NLERd, NLDDd, ADERd, ADDDd)]
+		jobs.append(((corr,size), measures, groups))
+
+	print "t-test"
+	table = statsGrid(jobs, CSV_COMPARISONS[:4], CSV_COMPARISONS[4:], seed=seed, workers=workers)
+
+	for corr,size in itertools.product(corrs,sizes):
+		filename = "NonParametricT_test{}{}.csv".format(corr,size)
 		with open("RawDistT_Test/"+filename,"wb") as f:
 			writer = csv.writer(f)
 			writer.writerow(["Measure","NL/AD","NL/MCI","MCI/CONV","AD/CONV","NL/ER(NL)"
-										,"NL/DD(NL)","AD/ER(AD)","AD/DD(AD)"])
-			print "t-test"
-			for pos,key in enumerate(('Entrophy', 'Gini Coeff')):
-				sign, c1 = permttest(NLd[pos], ADd[pos])
-				sign, c2 = permttest(NLd[pos], MCId[pos])
-				sign, c3 = permttest(MCId[pos], CONVERTd[pos])
-				sign, c4 = permttest(ADd[pos], CONVERTd[pos])
-				sign, c5 = permttest(NLd[pos], NLERd[pos])
-				sign, c6 = permttest(NLd[pos], NLDDd[pos])
-				sign, c7 = permttest(ADd[pos], ADERd[pos])
-				sign, c8 = permttest(ADd[pos], ADDDd[pos])
-				writer.writerow([key,c1,c2,c3,c4,c5,c6,c7,c8])
+										,"NL/DD(NL)","AD/ER(AD)","AD/DD(AD)","Omnibus"])
+			for row in table[(corr,size)]:
+				writer.writerow([row[0]] + [p for sign, p in row[1:]])
 
 
 def main():
@@ -8,8 +8,7 @@ def main():
     data = pickle.load(f)
 #  print data.keys()
   for key in data.keys():
-    for size in (3,4,5):
-      findMotifs(data,key,motifSize=size,degree=10,randGraphs=None, useCache=True, printMotifs=True)
+    findMotifs(data,key,motifSize=(3,4,5),degree=10,randGraphs=None, useCache=True, printMotifs=True)
   
 if __name__ == '__main__':
   main()
\ No newline at end of file
@@ -0,0 +1,299 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+edgeswap.py
+
+Degree preserving randomization of directed graphs by edge swaps. The
+graph is held as an edge array with a hash index of its edges, so every
+swap attempt takes constant time instead of rebuilding the edge list of a
+networkx graph. A swap turns the edges a->b, c->d into a->d, c->b when
+neither exists yet and it makes no self loop, so every node keeps its in
+and out degree. This is the same rule the Kavosh null model uses.
+
+writeEnsemble keeps many swapped replicates of every graph of a data set
+in one packed edge file, and NullEnsemble reads them back lazily.
+"""
+
+import os
+import json
+import itertools
+import multiprocessing
+from itertools import izip
+import numpy as np
+import kavosh
+
+class EdgeSwapper(object):
+  """Edge swapping state of one graph.
+
+  graph is anything kavosh.edgeArray takes (networkx DiGraph, adjacency
+  matrix, or an edge array with numNodes). Nodes are numbered 0..n-1 as in
+  kavosh.edgeArray; duplicate edges and self loops are dropped. seed seeds
+  the swaps (None draws a fresh one)."""
+
+  def __init__(self, graph, numNodes=None, seed=None):
+    self.numNodes, edges = kavosh.edgeArray(graph, numNodes)
+    n = self.numNodes
+    keys = np.unique(edges[:,0].astype(np.int64)*n + edges[:,1])
+    self.source = (keys // n).tolist()
+    self.target = (keys % n).tolist()
+    self.index = set(keys.tolist())
+    self.original = frozenset(self.index)
+    self.random = np.random.RandomState(seed)
+    #successful swaps so far and edges that are not in the original graph
+    self.swaps = 0
+    self.changed = 0
+
+  def __len__(self):
+    return len(self.source)
+
+  def swap(self, attempts, swaps=None, trace=None):
+    """Make attempts swap attempts, stopping early once swaps of them have
+    succeeded. Returns the number of successful swaps. If trace is a list,
+    changed is appended to it after every successful swap."""
+    m = len(self.source)
+    if m < 2:
+      return 0
+    n = self.numNodes
+    source, target, index, original = self.source, self.target, self.index, self.original
+    done = 0
+    while attempts > 0 and (swaps is None or done < swaps):
+      batch = attempts if swaps is None else min(attempts, max(2*(swaps-done), 64))
+      attempts -= batch
+      pairs = self.random.randint(m, size=(batch,2)).tolist()
+      for i, k in pairs:
+	a, b = source[i], target[i]
+	c, d = source[k], target[k]
+	if a == c or b == d or a == d or c == b:
+	  continue
+	ad, cb = a*n + d, c*n + b
+	if ad in index or cb in index:
+	  continue
+	ab, cd = a*n + b, c*n + d
+	index.remove(ab)
+	index.remove(cd)
+	index.add(ad)
+	index.add(cb)
+	target[i], target[k] = d, b
+	self.changed += (ad not in original) + (cb not in original) - (ab not in original) - (cd not in original)
+	if trace is not None:
+	  trace.append(self.changed)
+	done += 1
+	if done == swaps:
+	  break
+    self.swaps += done
+    return done
+
+  def randomize(self, swaps, trace=None):
+    """Make swaps successful swaps, in batches of attempts. Stops early if
+    a whole batch fails, i.e. hardly any swap is possible. Returns the
+    number of successful swaps."""
+    done = 0
+    while done < swaps:
+      made = self.swap(max(2*(swaps-done), len(self.source)), swaps-done, trace)
+      if made == 0:
+	break
+      done += made
+    return done
+
+  def edges(self):
+    "(m,2) int32 array of the current edges"
+    return np.array([self.source, self.target], dtype=np.int32).T.reshape(-1,2)
+
+  def matrix(self):
+    "Boolean adjacency matrix of the current edges"
+    A = np.zeros((self.numNodes, self.numNodes), dtype=bool)
+    A[self.source, self.target] = True
+    return A
+
+def randomize(graph, swaps, numNodes=None, seed=None, output='edges'):
+  """Degree preserving random version of graph after swaps successful edge
+  swaps. output is 'edges' for an (m,2) edge array or 'matrix' for a
+  boolean adjacency matrix."""
+  if output not in ('edges', 'matrix'):
+    raise ValueError("Unknown output: " + str(output))
+  swapper = EdgeSwapper(graph, numNodes, seed)
+  swapper.randomize(swaps)
+  return swapper.edges() if output == 'edges' else swapper.matrix()
+
+def mixing(graph, swaps, numNodes=None, seed=None, window=None, tolerance=0.02):
+  """Mixing diagnostics of swaps edge swaps on graph.
+
+  Returns (distance, plateau). distance[s] is the number of edges that are
+  not in the original graph after s swaps (half the Hamming distance of
+  the adjacency matrices), kept up to date in constant time per swap.
+  plateau is the swap count after which it stays level, see plateau()."""
+  swapper = EdgeSwapper(graph, numNodes, seed)
+  trace = [0]
+  swapper.randomize(swaps, trace)
+  distance = np.array(trace)
+  return distance, plateau(distance, window, tolerance)
+
+def plateau(distance, window=None, tolerance=0.02):
+  """Swap count at which a distance trace reaches its plateau: the end of
+  the first window of swaps whose mean distance is within tolerance of
+  the mean over the last half of the trace, which is taken as the level
+  of a mixed graph. window defaults to 1/50th of the trace. Returns None
+  if the trace is too short to tell, i.e. it is still rising in its last
+  half, so more swaps are needed."""
+  distance = np.asarray(distance, dtype=np.float64)
+  if len(distance) < 4:
+    return None
+  level = distance[len(distance)//2:].mean()
+  window = window or max(1, len(distance)//50)
+  blocks = len(distance)//window
+  means = distance[:blocks*window].reshape(blocks, window).mean(1)
+  reached = np.nonzero(means >= (1-tolerance)*level)[0]
+  if len(reached) == 0 or (reached[0]+1)*window > len(distance)//2:
+    return None
+  return int((reached[0]+1)*window)
+
+def setEdges(G, swapper):
+  """Replace the edges of the networkx graph G (the one swapper was made
+  from) by the swapper's current edges"""
+  nodes = sorted(G.nodes())
+  G.remove_edges_from(list(G.edges()))
+  G.add_edges_from((nodes[a], nodes[b]) for a, b in zip(swapper.source, swapper.target))
+
+def _ensembleSeed(seed, group, graph, replicate):
+  "RandomState seed of one replicate, an independent stream for every (group, graph, replicate)"
+  return [int(seed), group, graph, replicate]
+
+def _ensembleTask(task):
+  edges, numNodes, replicates, swaps, seed, group, index = task
+  result = np.empty((replicates*len(edges), 2), dtype=np.int32)
+  for r in xrange(replicates):
+    swapper = EdgeSwapper(edges, numNodes, _ensembleSeed(seed, group, index, r))
+    swapper.randomize(swaps)
+    result[r*len(edges):(r+1)*len(edges)] = swapper.edges()
+  return result
+
+def _edgeType(numNodes):
+  "Smallest unsigned type that holds the node numbers"
+  for dtype in (np.uint8, np.uint16, np.uint32):
+    if numNodes <= np.iinfo(dtype).max + 1:
+      return dtype
+  return np.int64
+
+def writeEnsemble(filename, groups, replicates, swaps, seed=0, workers=1):
+  """Write replicates swapped versions of every graph to filename.npy and
+  its index to filename.json.
+
+  groups maps each group key (a string or a tuple of strings) to a list of
+  graphs of the same number of nodes, in anything EdgeSwapper takes.
+  Every replicate starts from the original graph and makes swaps
+  successful swaps with its own RandomState stream, seeded by seed, the
+  group's place among the sorted keys, the graph index and the replicate,
+  so the file does not depend on workers. The edges are stored as one
+  packed array of the smallest integer type that holds the node numbers,
+  the replicates of a graph one after another."""
+  keys = sorted(groups)
+  numNodes = None
+  tasks = []
+  offsets = []
+  total = 0
+  for g, key in enumerate(keys):
+    groupOffsets = [total]
+    for i, graph in enumerate(groups[key]):
+      swapper = EdgeSwapper(graph)
+      if numNodes is not None and swapper.numNodes != numNodes:
+	raise ValueError("All graphs of an ensemble must have the same number of nodes")
+      numNodes = swapper.numNodes
+      tasks.append((swapper.edges(), numNodes, replicates, swaps, seed, g, i))
+      total += replicates*len(swapper)
+      groupOffsets.append(total)
+    offsets.append(groupOffsets)
+
+  edges = np.lib.format.open_memmap(filename + ".npy", mode='w+', dtype=_edgeType(numNodes or 1), shape=(total, 2))
+  pool = multiprocessing.Pool(workers) if workers > 1 else None
+  try:
+    results = pool.imap(_ensembleTask, tasks, chunksize=1) if pool else itertools.imap(_ensembleTask, tasks)
+    position = 0
+    for result in results:
+      edges[position:position+len(result)] = result
+      position += len(result)
+  finally:
+    if pool:
+      pool.close()
+      pool.join()
+  edges.flush()
+  del edges
+
+  index = {'numNodes': numNodes, 'replicates': replicates, 'swaps': swaps, 'seed': seed,
+	   'groups': [[key, groupOffsets] for key, groupOffsets in izip(keys, offsets)]}
+  with open(filename + ".json", 'wb') as f:
+    json.dump(index, f)
+
+class NullEnsemble(object):
+  """Swap replicates written by writeEnsemble, read through a memory map.
+
+  replicate(r) can be passed to FinalMotif.findMotifs as randGraphs:
+  replicate(r)[key][i] is the boolean adjacency matrix of the r-th
+  replicate of graph i of the group, read from the file when asked for."""
+
+  def __init__(self, filename):
+    with open(filename + ".json", 'rb') as f:
+      index = json.load(f)
+    self.numNodes = index['numNodes']
+    self.replicates = index['replicates']
+    self.swaps = index['swaps']
+    self.seed = index['seed']
+    self.name = os.path.basename(filename)
+    self.offsets = dict((_groupKey(key), np.array(groupOffsets, dtype=np.int64))
+			for key, groupOffsets in index['groups'])
+    self.edges = np.load(filename + ".npy", mmap_mode='r')
+
+  def __len__(self):
+    return self.replicates
+
+  def keys(self):
+    return self.offsets.keys()
+
+  def edgeArray(self, key, index, replicate):
+    "(m,2) int32 edge array of a replicate of graph index of the group key"
+    offsets = self.offsets[key]
+    m = (offsets[index+1] - offsets[index]) // self.replicates
+    start = offsets[index] + replicate*m
+    return np.array(self.edges[start:start+m], dtype=np.int32)
+
+  def matrix(self, key, index, replicate):
+    "Boolean adjacency matrix of a replicate of graph index of the group key"
+    edges = self.edgeArray(key, index, replicate)
+    A = np.zeros((self.numNodes, self.numNodes), dtype=bool)
+    A[edges[:,0], edges[:,1]] = True
+    return A
+
+  def replicate(self, r):
+    if not 0 <= r < self.replicates:
+      raise IndexError("Replicate out of range: " + str(r))
+    return EnsembleReplicate(self, r)
+
+class EnsembleReplicate(object):
+  """One replicate of a NullEnsemble, indexed like the randGraphs dict of
+  makeSwapData: replicate[key][i]. name keeps the cache files of
+  different ensembles and replicates apart."""
+
+  def __init__(self, ensemble, r):
+    self.ensemble = ensemble
+    self.r = r
+    self.name = "RAND" + ensemble.name + "r" + str(r)
+
+  def __getitem__(self, key):
+    return _GroupReplicate(self.ensemble, key, self.r)
+
+class _GroupReplicate(object):
+  def __init__(self, ensemble, key, r):
+    self.ensemble, self.key, self.r = ensemble, key, r
+
+  def __len__(self):
+    return len(self.ensemble.offsets[self.key]) - 1
+
+  def __getitem__(self, index):
+    if not 0 <= index < len(self):
+      raise IndexError("Graph index out of range: " + str(index))
+    return self.ensemble.matrix(self.key, index, self.r)
+
+def _groupKey(key):
+  "Group key as it was before the JSON round trip (lists back to tuples)"
+  if isinstance(key, list):
+    return tuple(_groupKey(k) for k in key)
+  return key.encode('utf-8') if isinstance(key, unicode) else key
@@ -2,6 +2,7 @@
 #define ZEROONETREE_H
 
 #include <string>
+#include <vector>
 
 using namespace std;
 
@@ -32,6 +33,8 @@ class tree {
 		Node * node;
 		Node * cur_node;
 		Leaf * leaf;
+		vector<Node *> node_blocks;
+		vector<Leaf *> leaf_blocks;
 		int node_ptr;
 		int leaf_ptr;
 		int leaf_num;
@@ -8,6 +8,7 @@
 #include <string>
 #include <nauty.h>
 #include "ZeroOneTree.h"
+#include "lookupTable.h"
 
 
 using namespace std;
@@ -17,7 +18,7 @@ typedef long long Entry;
 
 class Graph {
 public:
-    Graph(const int n, const int k);
+    Graph(const int n);
     ~Graph();
     void setPath(char *path);
 	void addEdgeAdjMat(vertex u, vertex v);
@@ -28,23 +29,15 @@ public:
 	bool isConnected(vertex u, vertex v);
 	void Print();
 	void Finalize();
+	void Rebuild();
 	int Size() { return nV; }
 	int MaxDegree() { return maxDegree; }
-	void Classify(vertex ** subgraph, int level);
-	void AllocateCounter();
-	void DFS(Node * cur);
-	void DFSmain(Node * cur, char * str, int lev);
-	void Extract();
-	void outputMotifResults(unsigned long long subgraphCounter,char* path);
 	void calculateZSCORE(int RAND, int subgraphCounter, char *path);
-	void print_adjMatrix(char * str);
 	int get_vertex();
 	
 private:
     FILE *am;
 	vector< vector<vertex> > E_temp;
-	int subgraphSize;
-	int M;
 	int *degree;
 	int **E;
 	int h;
@@ -54,6 +47,35 @@ private:
 	int nE;
 	int nEd;
 	int maxDegree;
+};
+
+// Sorts the subgraphs of a graph into non-isomorphic classes with nauty and
+// counts them in a ZeroOneTree. The graph is only read, so every enumeration
+// thread can classify with its own Classifier. Given a LookupTable, the
+// class of a subgraph is looked up from its adjacency pattern instead.
+class Classifier {
+public:
+	Classifier(Graph *input, const int k, const LookupTable *lookup = NULL);
+	~Classifier();
+	void Classify(vertex ** subgraph, int level);
+	void getMotifResults(vector<unsigned long> &ids, vector<unsigned long long> &counts);
+
+private:
+	void DFSmain(Node * cur, char * str, int lev, vector<unsigned long> &ids, vector<unsigned long long> &counts);
+	unsigned long adjMatrixID(char * str);
+	Graph *g;
+	int subgraphSize;
+	int M;
 	tree *T;
+	const LookupTable *table;
+	vector<unsigned long long> classCounts;
+	graph *nauty_g;
+	graph *canon;
+	int *lab;
+	int *ptn;
+	int *orbits;
+	optionblk options;
+	statsblk stats;
+	setword workspace[160*MAXM];
 };
 #endif //GRAPH_H
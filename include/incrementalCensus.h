@@ -0,0 +1,49 @@
+#ifndef INCREMENTALCENSUS_H
+#define INCREMENTALCENSUS_H
+
+#include <vector>
+#include "kavosh.h"
+
+using namespace std;
+
+// Motif census of a graph that gains and loses edges, e.g. a weight matrix
+// thresholded at a growing average degree or a chain of edge swaps.
+// Start() counts the first graph with Kavosh; after that AddEdge(u, v) and
+// RemoveEdge(u, v) only visit the connected subgraphs holding both u and v,
+// moving each from its old class to its new one.
+// Needs a LookupTable, so the motif size is at most MAX_TABLE_SIZE.
+class IncrementalCensus {
+public:
+	IncrementalCensus(int n, int size);
+	void Start(const int *edges, int m, int threads = 1);
+	void AddEdge(vertex u, vertex v);
+	void RemoveEdge(vertex u, vertex v);
+	bool isConnected(vertex u, vertex v) { return adj[u*nV + v]; }
+	void Snapshot(Census *census);
+
+private:
+	void Change(vertex u, vertex v, int sign);
+	void Extend(int found);
+	void Update();
+	bool ConnectedWithout(int a, int b);
+
+	int nV;
+	int subgraphSize;
+	const LookupTable *table;
+	//adjacency bits (u*nV+v) and undirected neighbour lists, 0-based
+	vector<unsigned char> adj;
+	vector< vector<vertex> > neighbours;
+	vector<long long> classCounts;
+	unsigned long long subgraphs;
+	//the subgraph being built around the changed edge. extensions[k] are the candidates
+	//for its (k+1)-th vertex and added[k] the vertices marked while adding its k-th.
+	vector<vertex> subgraph;
+	vector< vector<vertex> > extensions;
+	vector< vector<vertex> > added;
+	vector<bool> marked;
+	bool reverseEdge;
+	//+1 while adding the edge, -1 while removing it
+	int change;
+};
+
+#endif //INCREMENTALCENSUS_H
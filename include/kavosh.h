@@ -0,0 +1,113 @@
+#ifndef KAVOSH_H
+#define KAVOSH_H
+
+#include <vector>
+#include <random>
+#include "graph.h"
+
+using namespace std;
+
+// Result of one motif census: the total number of enumerated subgraphs and
+// the number of subgraphs found in each non-isomorphic class (sorted by ID).
+// A sampled census (Sample) estimates the total number of subgraphs, sums
+// the sampled counts over its replicates and also gives the estimated
+// relative frequency of each class with its standard error.
+// A census against a null model (NullModel) also gives the mean and
+// standard deviation of each class count over the random graphs and the
+// z-score of the real count; its classes are those of the real graph and
+// of every random graph.
+struct Census {
+	unsigned long long subgraphs;
+	vector<unsigned long> ids;
+	vector<unsigned long long> counts;
+	int replicates;
+	vector<double> frequencies;
+	vector<double> errors;
+	int randomGraphs;
+	vector<double> means;
+	vector<double> deviations;
+	vector<double> zscores;
+};
+
+// Enumeration state of one thread: the subgraph being built, the valid
+// children of every level and a Classifier counting what was found.
+// Given sampling probabilities prob[d-1] for the d-th vertex of a subgraph,
+// it only follows part of the enumeration tree (RAND-ESU): every subgraph
+// is then counted with probability prob[0]*...*prob[size-1].
+// Every connected subgraph of k < size nodes is met exactly once on the way
+// down the tree, so CountSize(k) also classifies those in the same pass.
+class Enumerator {
+public:
+	Enumerator(Graph *graph, int size, const double *prob = NULL, unsigned long seed = 0);
+	~Enumerator();
+	void CountSize(int k);
+	void ExploreRoot(vertex root);
+	void ExploreRoot(vertex root, int k);
+	unsigned long long Subgraphs() { return subgraphCounter; }
+	Classifier *Classes() { return classifier; }
+	unsigned long long Subgraphs(int k) { return k == subgraphSize ? subgraphCounter : levelCounters[k]; }
+	Classifier *Classes(int k) { return k == subgraphSize ? classifier : levelClassifiers[k]; }
+
+private:
+	void initChildSet(int root, int level);
+	void Explore(vertex root, int level, int reminder);
+	void swap(int i, int j, int root, int level, int reminder, int m);
+	void GEN(int n, int k, int root, int level, int reminder, int m);
+	void NEG(int n, int k, int root, int level, int reminder, int m);
+
+	//1st dimension is the layer, while the 2nd is the list of selected nodes in each layer. subgraph[k][0] is the number of nodes in layer k.
+	vertex **subgraph;
+	int subgraphSize;
+	bool *Visited;
+	// This array collects the valid children at each layer.
+	unsigned int **childSet;
+	// This array maps the childSet to the subgraph[level]
+	unsigned int **Index;
+	//total number of enumerated subgraphs.
+	unsigned long long subgraphCounter;
+	Graph *g;
+	Classifier *classifier;
+	//levelClassifiers[k] counts the subgraphs of k nodes (NULL unless CountSize(k) was called).
+	Classifier **levelClassifiers;
+	unsigned long long *levelCounters;
+	//stepProb[s][k] is the probability of following a selection of k nodes added to s nodes.
+	double **stepProb;
+	unsigned long sampleSeed;
+	mt19937_64 rng;
+	uniform_real_distribution<double> uniform;
+};
+
+void Enumerate(Graph *graph, int size, Census *census, int threads = 1, const double *prob = NULL, unsigned long seed = 0);
+void EnumerateSizes(Graph *graph, int nsizes, const int *sizes, Census *censuses, int threads = 1);
+void NullModel(Graph *graph, int size, Census *census, int threads, int randomGraphs, unsigned long seed);
+int NullChain(int n, const int *edges, int m, int size, Census *census, int threads, int randomGraphs,
+			  int attempts, unsigned long seed);
+void Sample(Graph *graph, int size, const double *prob, Census *census, int threads, unsigned long seed,
+			double accuracy, double seconds, int replicates);
+
+// C interface used by the Python wrapper (kavosh.py) through ctypes.
+// Vertices in the edge array are 0-based, edges[2*i] -> edges[2*i+1].
+extern "C" {
+	Census *kavosh_census(int n, const int *edges, int m, int size, int threads);
+	void kavosh_census_sizes(int n, const int *edges, int m, int nsizes, const int *sizes, int threads,
+							 Census **censuses);
+	int kavosh_sweep(int n, const int *edges, int m, int size, int threads, int nsnapshots, const int *snapshots,
+					 Census **censuses);
+	void kavosh_table_directory(const char *path);
+	Census *kavosh_sample(int n, const int *edges, int m, int size, int threads, const double *prob,
+						  unsigned long seed, double accuracy, double seconds, int replicates);
+	Census *kavosh_null_model(int n, const int *edges, int m, int size, int threads, int randomGraphs,
+							  unsigned long seed);
+	Census *kavosh_null_chain(int n, const int *edges, int m, int size, int threads, int randomGraphs, int attempts,
+							  unsigned long seed);
+	unsigned long long kavosh_subgraphs(const Census *census);
+	int kavosh_classes(const Census *census);
+	void kavosh_results(const Census *census, unsigned long *ids, unsigned long long *counts);
+	int kavosh_replicates(const Census *census);
+	void kavosh_estimates(const Census *census, double *frequencies, double *errors);
+	int kavosh_random_graphs(const Census *census);
+	void kavosh_null_statistics(const Census *census, double *means, double *deviations, double *zscores);
+	void kavosh_free(Census *census);
+}
+
+#endif //KAVOSH_H
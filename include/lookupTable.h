@@ -0,0 +1,38 @@
+#ifndef LOOKUPTABLE_H
+#define LOOKUPTABLE_H
+
+#include <vector>
+
+using namespace std;
+
+// Largest motif size with a lookup table, it has 2^(k(k-1)) entries.
+#define MAX_TABLE_SIZE 5
+
+// Canonical class of every adjacency pattern of a k node subgraph. A pattern
+// holds the off-diagonal adjacency bits row by row, first bit highest, which
+// is also how motif IDs are read from the canonical adjacency matrix.
+// Class(pattern) indexes the class IDs, which are sorted.
+class LookupTable {
+public:
+	LookupTable(int k);
+	void Build();
+	bool Load(const char *path);
+	bool Save(const char *path);
+	int Classes() const { return ids.size(); }
+	unsigned long ID(int c) const { return ids[c]; }
+	unsigned short Class(unsigned long pattern) const { return classOf[pattern]; }
+	int IndexOf(unsigned long id) const;
+
+private:
+	int size;
+	int bits;
+	vector<unsigned long> ids;
+	vector<unsigned short> classOf;
+};
+
+// Tables are built once per process and kept in path as kavosh_table<k>.dat
+// (Kavosh uses its own directory, kavosh.py the directory of libkavosh.so).
+void SetTableDirectory(const char *path);
+const LookupTable *GetLookupTable(int k);
+
+#endif //LOOKUPTABLE_H
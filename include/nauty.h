@@ -856,8 +856,17 @@ extern void free(void*);
    CONDYNFREE does the same, but only if name_sz exceeds some limit.
 */
 
+/* TLS_ATTR makes the static variables of nauty thread local, so that
+   several threads can call nauty at once (Kavosh classifies subgraphs in
+   parallel).  It is empty unless USE_TLS is defined at compile time. */
+#ifdef USE_TLS
+#define TLS_ATTR __thread
+#else
+#define TLS_ATTR
+#endif
+
 #define DYNALLSTAT(type,name,name_sz) \
-	static type *name; static size_t name_sz=0
+	static TLS_ATTR type *name; static TLS_ATTR size_t name_sz=0
 #define DYNALLOC1(type,name,name_sz,sz,msg) \
  if ((size_t)(sz) > name_sz) \
  { if (name_sz) FREES(name); name_sz = (sz); \
@@ -5,16 +5,23 @@
 
 #include "graph.h"
 #include <string>
+#include <random>
 
 using namespace std;
 
+// Degree preserving randomization: genRandGraph_Edge makes numOFexchange
+// swap attempts per edge, each turning two edges a->c, b->d into a->d, b->c
+// when neither exists yet, so every vertex keeps its in and out degree.
+// The swaps are drawn from the generator's own seeded stream; Pick(m, i, k)
+// draws the two edges of one attempt for callers that keep their own edges.
 class generator {
 	protected:
+		mt19937_64 rng;
 	
 	public:
-		generator();
-		int binarySearch(int *E, int v, int w, int l, int h);
+		generator(unsigned long seed = 0);
 		void genRandGraph_Edge(Graph *g);
+		void Pick(int m, int &i, int &k);
 };
 	
 #endif //RANDOMGENERATOR_H
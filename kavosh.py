@@ -0,0 +1,457 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+kavosh.py
+
+Python interface to the Kavosh motif finder. A census runs in-process
+through libkavosh.so when it has been built (see the Makefile), and falls
+back to the ./Kavosh binary and temporary scratch files otherwise.
+"""
+
+import os
+import math
+import shutil
+import tempfile
+import ctypes
+import itertools
+import multiprocessing
+import numpy as np
+import networkx as nx
+
+LIBRARY = "libkavosh.so"
+BINARY = "Kavosh"
+#Raised whenever a change to Kavosh changes what a census returns, it is
+#part of the name of every cached census (motifcache.graphDigest)
+ENGINE_VERSION = 1
+
+_lib = None
+
+def _loadLibrary():
+  """Load libkavosh.so from this directory or the working directory.
+
+  The lookup tables of canonical labels are kept next to the library."""
+  global _lib
+  if _lib is not None:
+    return _lib
+  for path in (os.path.dirname(os.path.abspath(__file__)), os.getcwd()):
+    libpath = os.path.join(path, LIBRARY)
+    if os.path.exists(libpath):
+      lib = ctypes.CDLL(libpath)
+      lib.kavosh_census.restype = ctypes.c_void_p
+      lib.kavosh_census.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_int]
+      lib.kavosh_census_sizes.restype = None
+      lib.kavosh_census_sizes.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_void_p,
+					  ctypes.c_int, ctypes.c_void_p]
+      lib.kavosh_sweep.restype = ctypes.c_int
+      lib.kavosh_sweep.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+				   ctypes.c_int, ctypes.c_void_p, ctypes.c_void_p]
+      lib.kavosh_subgraphs.restype = ctypes.c_ulonglong
+      lib.kavosh_subgraphs.argtypes = [ctypes.c_void_p]
+      lib.kavosh_classes.restype = ctypes.c_int
+      lib.kavosh_classes.argtypes = [ctypes.c_void_p]
+      lib.kavosh_results.restype = None
+      lib.kavosh_results.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_void_p]
+      lib.kavosh_sample.restype = ctypes.c_void_p
+      lib.kavosh_sample.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+				    ctypes.c_void_p, ctypes.c_ulong, ctypes.c_double, ctypes.c_double, ctypes.c_int]
+      lib.kavosh_replicates.restype = ctypes.c_int
+      lib.kavosh_replicates.argtypes = [ctypes.c_void_p]
+      lib.kavosh_estimates.restype = None
+      lib.kavosh_estimates.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_void_p]
+      lib.kavosh_null_model.restype = ctypes.c_void_p
+      lib.kavosh_null_model.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+					ctypes.c_int, ctypes.c_ulong]
+      lib.kavosh_null_chain.restype = ctypes.c_void_p
+      lib.kavosh_null_chain.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+					ctypes.c_int, ctypes.c_int, ctypes.c_ulong]
+      lib.kavosh_random_graphs.restype = ctypes.c_int
+      lib.kavosh_random_graphs.argtypes = [ctypes.c_void_p]
+      lib.kavosh_null_statistics.restype = None
+      lib.kavosh_null_statistics.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_void_p, ctypes.c_void_p]
+      lib.kavosh_free.restype = None
+      lib.kavosh_free.argtypes = [ctypes.c_void_p]
+      lib.kavosh_table_directory.restype = None
+      lib.kavosh_table_directory.argtypes = [ctypes.c_char_p]
+      lib.kavosh_table_directory(path)
+      _lib = lib
+      return _lib
+  return None
+
+def available():
+  "True if the in-process Kavosh library can be used"
+  return _loadLibrary() is not None
+
+def edgeArray(graph, numNodes=None):
+  """Convert a graph to (number of nodes, 0-based int32 edge array).
+
+  graph can be a networkx DiGraph, a square adjacency matrix (any nonzero
+  entry is an edge) or, when numNodes is given, an (m,2) edge array."""
+  if isinstance(graph, nx.Graph):
+    nodes = sorted(graph.nodes())
+    graph = nx.to_numpy_matrix(graph, nodelist=nodes) != 0
+  graph = np.asarray(graph)
+  if numNodes is None:
+    numNodes = len(graph)
+    edges = np.transpose(np.nonzero(graph))
+  else:
+    edges = graph.reshape(-1,2)
+  edges = edges[edges[:,0] != edges[:,1]]
+  return numNodes, np.ascontiguousarray(edges, dtype=np.int32)
+
+def _backend(backend):
+  if backend == 'auto':
+    return 'lib' if available() else 'cli'
+  if backend not in ('lib', 'cli'):
+    raise ValueError("Unknown Kavosh backend: " + str(backend))
+  return backend
+
+def _sizes(motifSize):
+  "The list of motif sizes if motifSize is a sequence, None for a single size"
+  if np.isscalar(motifSize):
+    return None
+  sizes = [int(size) for size in motifSize]
+  if not sizes or min(sizes) < 2:
+    raise ValueError("Motif sizes must be 2 or more")
+  return sizes
+
+def _sizeArgument(motifSize):
+  sizes = _sizes(motifSize)
+  return str(motifSize) if sizes is None else ",".join(str(size) for size in sizes)
+
+def census(graph, motifSize, numNodes=None, backend='auto', threads=1):
+  """Motif census of one graph.
+
+  Returns (number of subgraphs, array of motif IDs, array of counts).
+  backend is 'lib' for the in-process library, 'cli' for the Kavosh
+  binary or 'auto' to use the library when it has been built.
+  threads > 1 splits the enumeration of the graph over that many threads.
+  motifSize can also be a list of sizes, which are all counted in one
+  enumeration of the largest size; the result is then a dict mapping each
+  size to its census tuple."""
+  numNodes, edges = edgeArray(graph, numNodes)
+  if _backend(backend) == 'lib':
+    return _censusLibrary(numNodes, edges, motifSize, threads)
+  return _censusBinary(numNodes, edges, motifSize, threads=threads)
+
+def censusBatch(graphs, motifSize, numNodes=None, backend='auto', path=None, workers=1, threads=1):
+  """Motif census of a list of graphs, returned as a list of census tuples.
+
+  With the 'cli' backend every graph goes to Kavosh in one multi-graph
+  file, so the whole list costs a single launch of the binary. path is
+  its scratch directory (a fresh temporary one by default). With a list
+  of motif sizes every element is a dict of census tuples, see census().
+  workers > 1 spreads the graphs over a process pool. Every worker uses
+  its own scratch directory and the results come back in input order.
+  threads is the number of enumeration threads used for every graph."""
+  graphs = [edgeArray(graph, numNodes) for graph in graphs]
+  backend = _backend(backend)
+  if workers <= 1 or len(graphs) < 2:
+    return _censusEdges(graphs, motifSize, backend, path, threads)
+
+  #One task per graph in-process, one Kavosh launch per worker otherwise
+  numTasks = len(graphs) if backend == 'lib' else min(workers, len(graphs))
+  tasks = [([graphs[i] for i in chunk], motifSize, backend, None, threads)
+	   for chunk in np.array_split(np.arange(len(graphs)), numTasks)]
+  pool = multiprocessing.Pool(workers)
+  try:
+    results = pool.map(_censusChunk, tasks, chunksize=1)
+  finally:
+    pool.close()
+    pool.join()
+  return list(itertools.chain.from_iterable(results))
+
+def _censusChunk(task):
+  return _censusEdges(*task)
+
+def _censusEdges(graphs, motifSize, backend, path=None, threads=1):
+  if backend == 'lib':
+    return [_censusLibrary(n, edges, motifSize, threads) for n,edges in graphs]
+  scratch = tempfile.mkdtemp(prefix="kavosh") if path is None else path
+  try:
+    batchfile = os.path.join(scratch, "BATCH.txt")
+    with open(batchfile,'wb') as f:
+      for n,edges in graphs:
+	f.write(str(n) + ' ' + str(len(edges)) + '\n')
+	np.savetxt(f, edges+1, fmt="%d")
+    os.system("./"+BINARY+" -b -s "+_sizeArgument(motifSize)+" -t "+str(threads)+" -i "+batchfile+" -o "+scratch)
+    return _readBatchSizes(scratch, motifSize, len(graphs))
+  finally:
+    if path is None:
+      shutil.rmtree(scratch, ignore_errors=True)
+
+def censusFiles(filenames, motifSize, path=None, threads=1):
+  """Census of Kavosh edge list files (like the input/ corpus) in one launch"""
+  scratch = tempfile.mkdtemp(prefix="kavosh") if path is None else path
+  try:
+    listfile = os.path.join(scratch, "BATCH.txt")
+    with open(listfile,'wb') as f:
+      for filename in filenames:
+	f.write(filename + '\n')
+    os.system("./"+BINARY+" -l -s "+_sizeArgument(motifSize)+" -t "+str(threads)+" -i "+listfile+" -o "+scratch)
+    return _readBatchSizes(scratch, motifSize, len(filenames))
+  finally:
+    if path is None:
+      shutil.rmtree(scratch, ignore_errors=True)
+
+def readBatch(filename, numGraphs):
+  """Parse BatchCount.txt into a list of census tuples ordered by graph index"""
+  results = [None]*numGraphs
+  with open(filename,"rb") as f:
+    for line in f:
+      index, subgraphs, classes = [int(x) for x in line.split()]
+      data = np.array([l.split() for l in itertools.islice(f, classes)], dtype=np.int64)
+      data.shape = (classes, 2)
+      results[index] = (subgraphs, data[:,0], data[:,1])
+  if None in results:
+    raise IOError("Kavosh did not finish graph " + str(results.index(None)) + " of " + filename)
+  return results
+
+def nullModel(graph, motifSize, randomGraphs=1000, seed=0, numNodes=None, backend='auto', threads=1):
+  """Motif census of one graph against its degree preserving null model.
+
+  Kavosh randomizes the graph randomGraphs times by edge swaps (each
+  random graph swaps the previous one further, seeded by seed) and counts
+  every random graph. Returns (number of subgraphs, array of motif IDs,
+  array of counts, array of mean counts in the random graphs, array of
+  their standard deviations, array of z-scores). The IDs are those found
+  in the graph or any random graph; a z-score is NaN when the deviation
+  is 0."""
+  numNodes, edges = edgeArray(graph, numNodes)
+  if _backend(backend) == 'lib':
+    return _nullModelLibrary(numNodes, edges, motifSize, randomGraphs, seed, threads)
+  scratch = tempfile.mkdtemp(prefix="kavosh")
+  try:
+    with open(os.path.join(scratch, "OUTPUT.txt"),'wb') as f:
+      f.write(str(numNodes) + '\n')
+      np.savetxt(f, edges+1, fmt="%d")
+    os.system("./"+BINARY+" -s "+str(motifSize)+" -t "+str(threads)+" -z "+str(randomGraphs)+" -S "+str(seed)+
+	      " -i "+os.path.join(scratch, "OUTPUT.txt")+" -o "+scratch)
+    with open(os.path.join(scratch, "NullModel.txt"),"rb") as f:
+      subgraphs = int(f.next().split()[0])
+      data = np.loadtxt(f, ndmin=2, dtype=np.float64)
+    return subgraphs, data[:,0].astype(np.int64), data[:,1].astype(np.int64), data[:,2], data[:,3], data[:,4]
+  finally:
+    shutil.rmtree(scratch, ignore_errors=True)
+
+def nullChain(graph, motifSize, randomGraphs=1000, attempts=None, seed=0, numNodes=None, threads=1):
+  """nullModel() from a single chain of edge swaps without a census of
+  every random graph: after the census of the graph, every swap only
+  recounts the subgraphs that hold one of its four edges.
+
+  The chain is sampled randomGraphs times, every attempts swap attempts.
+  By default that is 3 attempts per edge, the same draws as nullModel(),
+  which then gives the same result. Fewer attempts give more samples for
+  the same time, but neighbouring samples are then more alike. Needs
+  libkavosh.so and a motif size of at most 5. Returns the same tuple as
+  nullModel()."""
+  lib = _loadLibrary()
+  if lib is None:
+    raise IOError(LIBRARY + " not found, run make first")
+  numNodes, edges = edgeArray(graph, numNodes)
+  handle = lib.kavosh_null_chain(numNodes, edges.ctypes.data, len(edges), motifSize, threads, randomGraphs,
+				 attempts or 0, seed)
+  if not handle:
+    raise ValueError("Swap chains need a motif size of at most 5")
+  return _nullResults(lib, handle)
+
+def sweep(edges, motifSize, snapshots, numNodes, threads=1):
+  """Motif censuses of a graph that grows one edge at a time.
+
+  edges is an (m,2) array of 0-based edges in the order they are added
+  (e.g. by descending weight) and snapshots the increasing numbers of
+  leading edges to report the census at. The first snapshot is a full
+  census; after that every new edge only updates the subgraphs that hold
+  it, so the whole sweep costs about one census. Needs libkavosh.so and a
+  motif size with a lookup table (at most 5).
+  Returns a list of census tuples, one per snapshot."""
+  lib = _loadLibrary()
+  if lib is None:
+    raise IOError(LIBRARY + " not found, run make first")
+  edges = np.ascontiguousarray(np.asarray(edges).reshape(-1,2), dtype=np.int32)
+  snapshots = np.ascontiguousarray(snapshots, dtype=np.int32)
+  handles = (ctypes.c_void_p * len(snapshots))()
+  if lib.kavosh_sweep(numNodes, edges.ctypes.data, len(edges), motifSize, threads, len(snapshots),
+		      snapshots.ctypes.data, handles) != 0:
+    raise ValueError("Sweeps need a motif size of at most 5 and increasing snapshots of at most "+str(len(edges))+" edges")
+  return [_censusResults(lib, handle) for handle in handles]
+
+def thresholdSweep(weights, motifSize, degrees, threads=1):
+  """Census of a weight matrix thresholded at every average degree in degrees.
+
+  The graph at a degree keeps the len(weights)*degree largest weights
+  (weights > threshold, like findMotifs), so the graphs of higher degrees
+  hold those of lower ones and one sweep() counts them all. Returns a
+  dict mapping each degree to its census tuple."""
+  weights = np.asarray(weights)
+  numNodes = len(weights)
+  order = np.argsort(-weights, axis=None, kind='mergesort')
+  edges = np.transpose(np.unravel_index(order, weights.shape))
+  sortedWeights = np.sort(weights, axis=None)
+  degrees = sorted(set(degrees))
+  snapshots = [np.count_nonzero(weights > sortedWeights[-numNodes*degree-1]) for degree in degrees]
+  return dict(itertools.izip(degrees, sweep(edges, motifSize, snapshots, numNodes, threads)))
+
+def _readBatchSizes(path, motifSize, numGraphs):
+  "Read BatchCount.txt, or with several sizes BatchCount<size>.txt into a dict per graph"
+  sizes = _sizes(motifSize)
+  if sizes is None:
+    return readBatch(os.path.join(path, "BatchCount.txt"), numGraphs)
+  results = dict((size, readBatch(os.path.join(path, "BatchCount"+str(size)+".txt"), numGraphs)) for size in set(sizes))
+  return [dict((size, results[size][i]) for size in results) for i in xrange(numGraphs)]
+
+def levelProbabilities(motifSize, fraction):
+  """Sampling probabilities that keep about fraction of all subgraphs.
+
+  The first levels of the enumeration tree are always followed and the
+  last two levels share the sampling, which gives the lowest variance for
+  a given amount of work (the usual RAND-ESU setting)."""
+  if not 0 < fraction <= 1:
+    raise ValueError("fraction must be in (0,1]")
+  if motifSize < 3:
+    return [1.0]*(motifSize-1) + [fraction]
+  return [1.0]*(motifSize-2) + [math.sqrt(fraction)]*2
+
+def sample(graph, motifSize, fraction=0.1, probabilities=None, accuracy=0, timeBudget=0, replicates=None,
+	   seed=0, numNodes=None, backend='auto', threads=1):
+  """Approximate motif census of one graph by sampling the enumeration tree.
+
+  The d-th node of a subgraph is followed with probabilities[d-1] (by
+  default levelProbabilities(motifSize, fraction)), so every subgraph is
+  counted with the same probability. Independent replicates are run until
+  the largest standard error of a frequency is at most accuracy, until
+  timeBudget seconds have passed or until replicates have been run (10
+  when no stopping rule is given).
+  Returns (estimated number of subgraphs, array of motif IDs, array of
+  relative frequencies, array of their standard errors)."""
+  return sampleBatch([graph], motifSize, fraction, probabilities, accuracy, timeBudget, replicates,
+		     seed, numNodes, backend, threads=threads)[0]
+
+def sampleBatch(graphs, motifSize, fraction=0.1, probabilities=None, accuracy=0, timeBudget=0, replicates=None,
+		seed=0, numNodes=None, backend='auto', path=None, threads=1):
+  """Approximate census of a list of graphs, see sample(). Every graph is
+  sampled with the same seed, and the 'cli' backend runs a single Kavosh."""
+  if probabilities is None:
+    probabilities = levelProbabilities(motifSize, fraction)
+  probabilities = np.ascontiguousarray(probabilities, dtype=np.float64)
+  if len(probabilities) != motifSize or not ((probabilities > 0) & (probabilities <= 1)).all():
+    raise ValueError("Need "+str(motifSize)+" sampling probabilities in (0,1]")
+  graphs = [edgeArray(graph, numNodes) for graph in graphs]
+  if _backend(backend) == 'lib':
+    return [_sampleLibrary(n, edges, motifSize, probabilities, seed, accuracy, timeBudget, replicates or 0, threads)
+	    for n,edges in graphs]
+
+  scratch = tempfile.mkdtemp(prefix="kavosh") if path is None else path
+  try:
+    batchfile = os.path.join(scratch, "BATCH.txt")
+    with open(batchfile,'wb') as f:
+      for n,edges in graphs:
+	f.write(str(n) + ' ' + str(len(edges)) + '\n')
+	np.savetxt(f, edges+1, fmt="%d")
+    os.system("./"+BINARY+" -b -s "+str(motifSize)+" -t "+str(threads)+" -p "+",".join(repr(p) for p in probabilities)+
+	      " -e "+repr(accuracy)+" -m "+repr(timeBudget)+" -r "+str(replicates or 0)+" -S "+str(seed)+
+	      " -i "+batchfile+" -o "+scratch)
+    return readSampleBatch(os.path.join(scratch, "BatchSample.txt"), len(graphs))
+  finally:
+    if path is None:
+      shutil.rmtree(scratch, ignore_errors=True)
+
+def readSampleBatch(filename, numGraphs):
+  """Parse BatchSample.txt into a list of sample tuples ordered by graph index"""
+  results = [None]*numGraphs
+  with open(filename,"rb") as f:
+    for line in f:
+      index, subgraphs, classes, replicates = [int(x) for x in line.split()]
+      data = np.array([l.split() for l in itertools.islice(f, classes)], dtype=np.float64)
+      data.shape = (classes, 4)
+      results[index] = (subgraphs, data[:,0].astype(np.int64), data[:,2], data[:,3])
+  if None in results:
+    raise IOError("Kavosh did not finish graph " + str(results.index(None)) + " of " + filename)
+  return results
+
+def _censusLibrary(numNodes, edges, motifSize, threads=1):
+  lib = _loadLibrary()
+  if lib is None:
+    raise IOError(LIBRARY + " not found, run make first")
+  sizes = _sizes(motifSize)
+  if sizes is not None:
+    sizes = np.ascontiguousarray(sorted(set(sizes)), dtype=np.int32)
+    handles = (ctypes.c_void_p * len(sizes))()
+    lib.kavosh_census_sizes(numNodes, edges.ctypes.data, len(edges), len(sizes), sizes.ctypes.data, threads, handles)
+    return dict((int(size), _censusResults(lib, handle)) for size,handle in itertools.izip(sizes, handles))
+  return _censusResults(lib, lib.kavosh_census(numNodes, edges.ctypes.data, len(edges), motifSize, threads))
+
+def _censusResults(lib, handle):
+  "Read and free the census behind a library handle"
+  try:
+    subgraphs = lib.kavosh_subgraphs(handle)
+    classes = lib.kavosh_classes(handle)
+    ids = np.zeros(classes, dtype=np.uint64)
+    counts = np.zeros(classes, dtype=np.uint64)
+    lib.kavosh_results(handle, ids.ctypes.data, counts.ctypes.data)
+  finally:
+    lib.kavosh_free(handle)
+  return int(subgraphs), ids.astype(np.int64), counts.astype(np.int64)
+
+def _sampleLibrary(numNodes, edges, motifSize, probabilities, seed, accuracy, timeBudget, replicates, threads):
+  lib = _loadLibrary()
+  if lib is None:
+    raise IOError(LIBRARY + " not found, run make first")
+  handle = lib.kavosh_sample(numNodes, edges.ctypes.data, len(edges), motifSize, threads,
+			     probabilities.ctypes.data, seed, accuracy, timeBudget, replicates)
+  try:
+    subgraphs = lib.kavosh_subgraphs(handle)
+    classes = lib.kavosh_classes(handle)
+    ids = np.zeros(classes, dtype=np.uint64)
+    counts = np.zeros(classes, dtype=np.uint64)
+    frequencies = np.zeros(classes, dtype=np.float64)
+    errors = np.zeros(classes, dtype=np.float64)
+    lib.kavosh_results(handle, ids.ctypes.data, counts.ctypes.data)
+    lib.kavosh_estimates(handle, frequencies.ctypes.data, errors.ctypes.data)
+  finally:
+    lib.kavosh_free(handle)
+  return int(subgraphs), ids.astype(np.int64), frequencies, errors
+
+def _nullModelLibrary(numNodes, edges, motifSize, randomGraphs, seed, threads):
+  lib = _loadLibrary()
+  if lib is None:
+    raise IOError(LIBRARY + " not found, run make first")
+  handle = lib.kavosh_null_model(numNodes, edges.ctypes.data, len(edges), motifSize, threads, randomGraphs, seed)
+  return _nullResults(lib, handle)
+
+def _nullResults(lib, handle):
+  try:
+    subgraphs = lib.kavosh_subgraphs(handle)
+    classes = lib.kavosh_classes(handle)
+    ids = np.zeros(classes, dtype=np.uint64)
+    counts = np.zeros(classes, dtype=np.uint64)
+    means = np.zeros(classes, dtype=np.float64)
+    deviations = np.zeros(classes, dtype=np.float64)
+    zscores = np.zeros(classes, dtype=np.float64)
+    lib.kavosh_results(handle, ids.ctypes.data, counts.ctypes.data)
+    lib.kavosh_null_statistics(handle, means.ctypes.data, deviations.ctypes.data, zscores.ctypes.data)
+  finally:
+    lib.kavosh_free(handle)
+  return int(subgraphs), ids.astype(np.int64), counts.astype(np.int64), means, deviations, zscores
+
+def _censusBinary(numNodes, edges, motifSize, path=None, threads=1):
+  "Jenky way to use c++ motif finder in python"
+  scratch = tempfile.mkdtemp(prefix="kavosh") if path is None else path
+  try:
+    with open(os.path.join(scratch, "OUTPUT.txt"),'wb') as f:
+      f.write(str(numNodes) + '\n')
+      np.savetxt(f, edges+1, fmt="%d")
+    os.system("./"+BINARY+" -s "+_sizeArgument(motifSize)+" -t "+str(threads)+" -i "+os.path.join(scratch, "OUTPUT.txt")+" -o "+scratch)
+    sizes = _sizes(motifSize)
+    if sizes is None:
+      return readCount(os.path.join(scratch, "MotifCount.txt"))
+    return dict((size, readCount(os.path.join(scratch, "MotifCount"+str(size)+".txt"))) for size in set(sizes))
+  finally:
+    if path is None:
+      shutil.rmtree(scratch, ignore_errors=True)
+
+def readCount(filename):
+  """Parse MotifCount.txt into a census tuple"""
+  with open(filename,"rb") as f:
+    subgraphs = int(f.next())
+    data = np.loadtxt(f, ndmin=2, dtype=np.int64).reshape(-1,2)
+  return subgraphs, data[:,0], data[:,1]
@@ -0,0 +1,665 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+motifcache.py
+
+Columnar motif cache. The motif census of a group is kept as a directory
+of .npy files that np.load memory maps: the sorted motif IDs, the number
+of subgraphs of every patient and a patients x IDs matrix per column
+(counts for exact censuses, frequencies and errors for approximate ones,
+plus the null model means, deviations and z-scores). Sparse matrices,
+e.g. size 5 and larger censuses, are stored as CSR. meta.json says which
+columns a table has and how each one is stored. summary.npy holds the
+number of patients having every motif and the sum and sum of squares of
+its frequencies, so motifs can be ranked without reading the matrices.
+
+migrate() converts the JSON cache files findMotifs used to write.
+
+The census of every single graph is also kept as a piece, named by a
+digest of the graph's edges, the motif size, the census settings and
+kavosh.ENGINE_VERSION. A group table lists the digests of its rows, so a
+group is only recounted where its graphs changed, and a graph that shows
+up in several groups is only counted once.
+
+The results of permutation tests are kept the same way in tests/, named
+by a digest of the samples tested and the test settings (pairs, kmax,
+seed, ...), so reports only rerun the tests whose inputs changed.
+
+Pieces are compressed. prune() keeps a cache directory within a disk
+budget, evicting the entries that are cheapest to get back first, and
+stats() reports its size and hit rate; run
+
+    python motifcache.py stats [directory]
+    python motifcache.py prune BYTES [directory]
+
+from the shell for the same.
+
+Every file is written to a hidden temporary name, synced and renamed into
+place (a table as a whole directory), so a reader never sees half of an
+entry, and an entry that cannot be read is treated as missing. Lock
+serializes processes working on the same entry (POSIX only).
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import zipfile
+from contextlib import contextmanager
+import numpy as np
+import scipy.sparse as sp
+import kavosh
+try:
+  import fcntl
+except ImportError:
+  fcntl = None
+
+VERSION = 1
+#Columns in the order they are saved, and the value of a motif a patient does not have
+COLUMNS = ('counts', 'frequencies', 'errors', 'means', 'deviations', 'zscores')
+FILL = {'zscores': np.nan}
+#Matrices that are filled less than this are saved as CSR
+SPARSE = 0.25
+#Disk budget in bytes findMotifs prunes the cache to, None for no limit
+BUDGET = None
+#Usage counters and the seconds every piece took to count, relative to the cache directory
+#(not a .json file, migrate() takes those for old motif tables)
+USAGE = "usage.stats"
+#Attempts of save() to rename a table into place while other processes replace it too
+RETRIES = 10
+#An entry loses half its worth for eviction in this many seconds without use
+HALFLIFE = 7*24*3600.
+#Rows read at a time when a summary is computed from a saved table
+BLOCK = 1024
+#Temporary files of writes that died are removed by prune after this many seconds
+STALE = 24*3600.
+#Columns of the census tuples of each kind, by tuple length
+KINDS = {3: ('counts',), 4: ('frequencies', 'errors'), 6: ('counts', 'means', 'deviations', 'zscores')}
+
+class MotifTable(object):
+  """Motif census of a group of patients, one row per patient.
+
+  ids are the sorted motif IDs of the columns and subgraphs the number of
+  (estimated) subgraphs of every patient. columns maps a column name of
+  COLUMNS to a dense array or a scipy CSR matrix. An exact census has
+  counts, an approximate one frequencies and errors, a census against a
+  null model counts, means, deviations and zscores. digests are those of
+  the graphs of the rows (see graphDigest), None for old tables."""
+
+  def __init__(self, subgraphs, ids, columns, digests=None, summary=None):
+    self.subgraphs = np.asarray(subgraphs)
+    self.ids = np.asarray(ids)
+    self.columns = columns
+    self.digests = digests
+    self._summary = summary
+
+  def __len__(self):
+    return len(self.subgraphs)
+
+  def __contains__(self, name):
+    return name in self.columns
+
+  def index(self, motif):
+    "Column of a motif ID, None if no patient has it"
+    motif = int(motif)
+    i = np.searchsorted(self.ids, motif)
+    return i if i < len(self.ids) and self.ids[i] == motif else None
+
+  def dense(self, name, rows=slice(None)):
+    "Dense patients x IDs array of a column, of only some rows if given"
+    column = self.columns[name][rows]
+    return column.toarray() if sp.issparse(column) else np.asarray(column)
+
+  def frequencies(self, rows=slice(None)):
+    "Dense patients x IDs array of relative frequencies, of only some rows if given"
+    if 'frequencies' in self.columns:
+      return np.asarray(self.dense('frequencies', rows), dtype=np.float64)
+    return self.dense('counts', rows) / self.subgraphs[rows].astype(np.float64)[:,np.newaxis]
+
+  def get(self, name, c):
+    "Array of the values of every patient in column c of a column, reading only that column"
+    column = self.columns[name]
+    if sp.issparse(column):
+      return column[:,c].toarray().ravel()
+    return np.array(column[:,c])
+
+  def frequency(self, c):
+    "Array of the relative frequency of the motif in column c for every patient"
+    if 'frequencies' in self.columns:
+      return self.get('frequencies', c).astype(np.float64)
+    return self.get('counts', c) / self.subgraphs.astype(np.float64)
+
+  def summary(self):
+    """(patients, sum, sum of squares) of the relative frequencies of every
+    motif, a 3 x IDs array. Saved with the table, otherwise computed BLOCK
+    rows at a time."""
+    if self._summary is None:
+      summary = np.zeros((3, len(self.ids)))
+      for start in xrange(0, len(self), BLOCK):
+	frequencies = self.frequencies(slice(start, start+BLOCK))
+	summary[0] += np.count_nonzero(frequencies, axis=0)
+	summary[1] += frequencies.sum(axis=0)
+	summary[2] += (frequencies**2).sum(axis=0)
+      self._summary = summary
+    return self._summary
+
+  def row(self, p):
+    "Census tuple of patient p, in the format fromCensus takes"
+    names = [names for names in KINDS.itervalues() if set(names) == set(self.columns)][0]
+    values = [self.dense(name, slice(p, p+1))[0] for name in names]
+    found = values[0] != 0
+    if 'means' in self.columns:
+      found |= (values[1] != 0) | (values[2] != 0)
+    return (int(self.subgraphs[p]), self.ids[found].copy()) + tuple(value[found] for value in values)
+
+  def toMotifs(self):
+    """The table as the list findMotifs used to cache: for every patient
+    (subgraphs, {motif ID string: frequency}) and, for approximate censuses,
+    {ID: error} or, against a null model, None and {ID: [mean, deviation,
+    z-score]}. Only motifs a patient has are listed."""
+    keys = [unicode(int(iD)) for iD in self.ids]
+    frequencies = self.frequencies()
+    found = frequencies != 0
+    errors = self.dense('errors') if 'errors' in self.columns else None
+    null = [self.dense(name) for name in ('means', 'deviations', 'zscores')] if 'means' in self.columns else None
+    motifs = []
+    for p in xrange(len(self)):
+      columns = np.nonzero(found[p])[0]
+      entry = [int(self.subgraphs[p]), dict((keys[c], float(frequencies[p,c])) for c in columns)]
+      if errors is not None:
+	entry.append(dict((keys[c], float(errors[p,c])) for c in columns))
+      elif null is not None:
+	entry.append(None)
+	entry.append(dict((keys[c], [float(column[p,c]) for column in null]) for c in xrange(len(keys))))
+      motifs.append(tuple(entry))
+    return motifs
+
+def fromCensus(results, digests=None):
+  """Table of the census tuples of a group (one per patient, as returned by
+  kavosh.censusBatch, kavosh.sampleBatch or kavosh.nullModel)"""
+  results = list(results)
+  if not results:
+    return MotifTable(np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), {'counts': np.zeros((0,0))}, digests)
+  names = KINDS[len(results[0])]
+  ids = np.unique(np.concatenate([np.asarray(result[1], dtype=np.int64) for result in results]))
+  columns = {}
+  for c, name in enumerate(names):
+    dtype = np.int64 if name == 'counts' else np.float64
+    matrix = np.zeros((len(results), len(ids)), dtype=dtype)
+    matrix[:] = FILL.get(name, 0)
+    for p, result in enumerate(results):
+      matrix[p, np.searchsorted(ids, np.asarray(result[1], dtype=np.int64))] = result[2+c]
+    columns[name] = matrix
+  subgraphs = np.array([int(result[0]) for result in results], dtype=np.int64)
+  return MotifTable(subgraphs, ids, columns, digests)
+
+def fromMotifs(motifs):
+  "Table of a list in the format of the old JSON cache (see MotifTable.toMotifs)"
+  subgraphs = np.array([int(entry[0]) for entry in motifs], dtype=np.int64)
+  keys = set()
+  for entry in motifs:
+    keys.update(entry[1].keys())
+    if len(entry) > 3:
+      keys.update(entry[3].keys())
+  ids = np.array(sorted(int(key) for key in keys), dtype=np.int64)
+  position = dict((unicode(int(iD)), c) for c, iD in enumerate(ids))
+
+  def matrix(which, fill=0.):
+    result = np.empty((len(motifs), len(ids)))
+    result[:] = fill
+    for p, entry in enumerate(motifs):
+      for key, value in entry[which[0]].iteritems():
+	result[p, position[key]] = value if len(which) == 1 else value[which[1]]
+    return result
+
+  frequencies = matrix((1,))
+  if len(motifs) and len(motifs[0]) > 2 and motifs[0][2] is not None:
+    columns = {'frequencies': frequencies, 'errors': matrix((2,))}
+  else:
+    columns = {'counts': np.rint(frequencies*subgraphs[:,np.newaxis]).astype(np.int64)}
+    if len(motifs) and len(motifs[0]) > 3:
+      columns['means'] = matrix((3,0))
+      columns['deviations'] = matrix((3,1))
+      columns['zscores'] = matrix((3,2), np.nan)
+  return MotifTable(subgraphs, ids, columns)
+
+def exists(path):
+  return os.path.exists(os.path.join(path, "meta.json"))
+
+def save(table, path):
+  """Write a table to the directory path. It is written to a temporary
+  directory next to path that is then renamed to path, replacing an older
+  table. meta.json is written last, so a table without it is incomplete.
+  An older table is moved aside first, so path is missing for a moment;
+  readers that find it missing take the entry's Lock (held by writers)
+  and look again. A table another process puts in place meanwhile is
+  moved aside as well, up to RETRIES times."""
+  final, path = path, temporary(path)
+  shutil.rmtree(path, True)
+  os.makedirs(path)
+  try:
+    _saveFiles(table, path)
+  except:
+    shutil.rmtree(path, True)
+    raise
+  old = temporary(final + ".old")
+  try:
+    for attempt in xrange(RETRIES):
+      if os.path.isdir(final):
+	shutil.rmtree(old, True)
+	try:
+	  os.rename(final, old)
+	except OSError:
+	  #another writer moved it away meanwhile
+	  pass
+      try:
+	os.rename(path, final)
+	break
+      except OSError:
+	if attempt == RETRIES - 1:
+	  raise
+  finally:
+    shutil.rmtree(path, True)
+    shutil.rmtree(old, True)
+  sync(os.path.dirname(final) or '.')
+
+def _saveFiles(table, path):
+  meta = {'version': VERSION, 'patients': len(table), 'columns': {}}
+  if table.digests is not None:
+    meta['digests'] = list(table.digests)
+  np.save(os.path.join(path, "ids.npy"), np.asarray(table.ids, dtype=np.int64))
+  np.save(os.path.join(path, "subgraphs.npy"), np.asarray(table.subgraphs, dtype=np.int64))
+  np.save(os.path.join(path, "summary.npy"), table.summary())
+  for name in COLUMNS:
+    if name not in table.columns:
+      continue
+    column = table.columns[name]
+    sparse = sp.issparse(column) or (column.size and np.count_nonzero(column) < SPARSE*column.size)
+    if sparse and name not in FILL:
+      column = sp.csr_matrix(column)
+      for part in ('data', 'indices', 'indptr'):
+	np.save(os.path.join(path, name+"."+part+".npy"), getattr(column, part))
+      meta['columns'][name] = 'csr'
+    else:
+      np.save(os.path.join(path, name+".npy"), np.asarray(column.toarray() if sp.issparse(column) else column))
+      meta['columns'][name] = 'dense'
+  with open(os.path.join(path, "meta.json"), 'wb') as f:
+    json.dump(meta, f)
+  for name in os.listdir(path):
+    sync(os.path.join(path, name))
+  sync(path)
+
+def load(path, mmap_mode='r'):
+  "Read a table saved by save(), memory mapping its arrays"
+  with open(os.path.join(path, "meta.json"), 'rb') as f:
+    meta = json.load(f)
+  touch(os.path.join(path, "meta.json"))
+  if meta['version'] != VERSION:
+    raise ValueError("Unknown motif cache version " + str(meta['version']) + " in " + path)
+  ids = np.load(os.path.join(path, "ids.npy"), mmap_mode=mmap_mode)
+  subgraphs = np.load(os.path.join(path, "subgraphs.npy"), mmap_mode=mmap_mode)
+  columns = {}
+  for name, layout in meta['columns'].iteritems():
+    name = str(name)
+    if layout == 'csr':
+      data, indices, indptr = [np.load(os.path.join(path, name+"."+part+".npy"), mmap_mode=mmap_mode)
+			       for part in ('data', 'indices', 'indptr')]
+      columns[name] = sp.csr_matrix((data, indices, indptr), shape=(len(subgraphs), len(ids)), copy=False)
+    else:
+      columns[name] = np.load(os.path.join(path, name+".npy"), mmap_mode=mmap_mode)
+  digests = [str(digest) for digest in meta['digests']] if 'digests' in meta else None
+  summary = np.load(os.path.join(path, "summary.npy")) if os.path.exists(os.path.join(path, "summary.npy")) else None
+  return MotifTable(subgraphs, ids, columns, digests, summary)
+
+def graphDigest(graph, motifSize, settings=''):
+  """Hex digest naming the census of a graph (anything kavosh.edgeArray
+  takes) at motifSize. settings tells apart censuses of different kinds,
+  e.g. the sampling settings of an approximate census."""
+  numNodes, edges = kavosh.edgeArray(graph)
+  edges = edges[np.lexsort((edges[:,1], edges[:,0]))]
+  digest = hashlib.sha1(repr((kavosh.ENGINE_VERSION, numNodes, int(motifSize), settings)))
+  digest.update(np.ascontiguousarray(edges, dtype=np.int32).tostring())
+  return digest.hexdigest()
+
+def piecePath(directory, digest):
+  return os.path.join(directory, "graphs", digest[:2], digest + ".npz")
+
+def testDigest(samples, settings=''):
+  """Hex digest naming the result of a test of samples (a list of arrays)
+  under settings, e.g. the repr of the test, its pairs, kmax and seed"""
+  digest = hashlib.sha1(repr((VERSION, settings)))
+  for sample in samples:
+    sample = np.ascontiguousarray(sample, dtype=np.float64)
+    digest.update(repr(sample.shape))
+    digest.update(sample.tostring())
+  return digest.hexdigest()
+
+def testPath(directory, digest):
+  return os.path.join(directory, "tests", digest[:2], digest + ".json")
+
+#where the entries of every kind of digest are kept
+PATHS = {'graphs': piecePath, 'tests': testPath}
+
+def loadPiece(directory, digest):
+  """Census tuple of a graph digest, None if it is not cached. A piece that
+  cannot be read (cut short by an old writer, or pruned meanwhile) is
+  removed and also gives None."""
+  path = piecePath(directory, digest)
+  if not os.path.exists(path):
+    return None
+  try:
+    if not zipfile.is_zipfile(path):
+      raise ValueError("Not a piece: " + path)
+    with np.load(path) as piece:
+      values = [piece['arr_'+str(i)] for i in xrange(len(piece.files))]
+  except (IOError, OSError, ValueError, KeyError, zipfile.BadZipfile):
+    if os.path.exists(path):
+      os.remove(path)
+    return None
+  touch(path)
+  return (int(values[0]),) + tuple(values[1:])
+
+def _makedirs(path):
+  "Make the directory of path, also when another process just made it"
+  if not os.path.isdir(os.path.dirname(path)):
+    try:
+      os.makedirs(os.path.dirname(path))
+    except OSError:
+      if not os.path.isdir(os.path.dirname(path)):
+	raise
+
+def savePiece(directory, digest, census):
+  path = piecePath(directory, digest)
+  _makedirs(path)
+  atomicWrite(path, lambda f: np.savez_compressed(f, *[np.asarray(value) for value in census]))
+
+def loadTest(directory, digest):
+  """Saved result of a test digest, None if it is not cached or cannot be
+  read (then it is removed)"""
+  path = testPath(directory, digest)
+  if not os.path.exists(path):
+    return None
+  try:
+    with open(path, 'rb') as f:
+      result = json.load(f)
+  except (IOError, OSError, ValueError):
+    if os.path.exists(path):
+      os.remove(path)
+    return None
+  touch(path)
+  return result
+
+def saveTest(directory, digest, result):
+  "Save the result of a test digest, anything JSON takes"
+  path = testPath(directory, digest)
+  _makedirs(path)
+  atomicWrite(path, lambda f: json.dump(result, f))
+
+def temporary(path):
+  "Hidden temporary name next to path, unique to this process"
+  return os.path.join(os.path.dirname(path), "." + os.path.basename(path) + "." + str(os.getpid()) + ".tmp")
+
+def sync(path):
+  "Flush a file or directory to disk"
+  try:
+    fd = os.open(path, os.O_RDONLY)
+  except OSError:
+    return
+  try:
+    os.fsync(fd)
+  except OSError:
+    pass
+  finally:
+    os.close(fd)
+
+def atomicWrite(path, write):
+  """Call write with a file object of a temporary file, sync it and rename
+  it to path, so path is either the old file or the whole new one"""
+  temp = temporary(path)
+  try:
+    with open(temp, 'wb') as f:
+      write(f)
+      f.flush()
+      os.fsync(f.fileno())
+    os.rename(temp, path)
+  finally:
+    if os.path.exists(temp):
+      os.remove(temp)
+
+class Lock(object):
+  """Advisory lock on a name of a cache directory, for a with statement.
+  Other processes entering a Lock of the same name wait until it is left.
+  A process may enter a Lock it already holds. Does nothing where fcntl
+  is missing."""
+
+  #lock files this process holds and how many times it entered each
+  held = {}
+
+  def __init__(self, directory, name):
+    self.path = os.path.join(directory, "locks", name + ".lock")
+    self.file = None
+
+  def __enter__(self):
+    if self.path in Lock.held:
+      Lock.held[self.path] += 1
+    elif fcntl is not None:
+      if not os.path.isdir(os.path.dirname(self.path)):
+	try:
+	  os.makedirs(os.path.dirname(self.path))
+	except OSError:
+	  pass
+      self.file = open(self.path, 'ab')
+      fcntl.flock(self.file.fileno(), fcntl.LOCK_EX)
+      Lock.held[self.path] = 1
+    return self
+
+  def __exit__(self, *exc):
+    if self.file is None:
+      if self.path in Lock.held:
+	Lock.held[self.path] -= 1
+      return
+    del Lock.held[self.path]
+    fcntl.flock(self.file.fileno(), fcntl.LOCK_UN)
+    self.file.close()
+    self.file = None
+
+@contextmanager
+def locks(directory, names):
+  "Lock several names of a cache directory, in sorted order so two processes cannot deadlock"
+  held = []
+  try:
+    for name in sorted(set(names)):
+      held.append(Lock(directory, name).__enter__())
+    yield held
+  finally:
+    for lock in reversed(held):
+      lock.__exit__(None, None, None)
+
+def touch(path):
+  "Mark a cache file as used now, eviction goes by the last use"
+  try:
+    os.utime(path, None)
+  except OSError:
+    pass
+
+def readUsage(directory):
+  path = os.path.join(directory, USAGE)
+  usage = {'hits': 0, 'misses': 0, 'testHits': 0, 'testMisses': 0, 'written': 0, 'evicted': 0, 'costs': {}}
+  if os.path.exists(path):
+    try:
+      with open(path, 'rb') as f:
+	usage.update(json.load(f))
+    except ValueError:
+      pass
+  return usage
+
+def writeUsage(directory, usage):
+  atomicWrite(os.path.join(directory, USAGE), lambda f: json.dump(usage, f))
+
+def record(directory, hits=0, misses=0, costs=None, kind='graphs'):
+  """Add to the hit and miss counters of a cache directory. costs maps
+  digests of newly saved pieces (test results if kind is 'tests') to the
+  seconds they took to count."""
+  path = PATHS[kind]
+  with Lock(directory, "usage"):
+    usage = readUsage(directory)
+    usage['hits' if kind == 'graphs' else 'testHits'] += hits
+    usage['misses' if kind == 'graphs' else 'testMisses'] += misses
+    for digest, seconds in (costs or {}).iteritems():
+      usage['costs'][os.path.relpath(path(directory, digest), directory)] = seconds
+      usage['written'] += os.path.getsize(path(directory, digest))
+    writeUsage(directory, usage)
+
+def _size(path):
+  if not os.path.isdir(path):
+    return os.path.getsize(path)
+  return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+def entries(directory='cache'):
+  """Every table, piece and test result of a cache directory as (path
+  relative to the directory, bytes, seconds since last use, seconds it
+  took to count).
+  Tables cost nothing, they are put together again from their pieces;
+  pieces without a recorded time (adopted from old tables) neither."""
+  usage = readUsage(directory)
+  now = time.time()
+  found = []
+  for name in sorted(os.listdir(directory)):
+    if not name.startswith(".") and exists(os.path.join(directory, name)):
+      try:
+	found.append((name, _size(os.path.join(directory, name)),
+		      now - os.path.getmtime(os.path.join(directory, name, "meta.json")), 0.))
+      except OSError:
+	pass
+  for place in _places(directory)[1:]:
+    for name in sorted(os.listdir(place)):
+      path = os.path.join(place, name)
+      key = os.path.relpath(path, directory)
+      if name.startswith("."):
+	continue
+      try:
+	found.append((key, os.path.getsize(path), now - os.path.getmtime(path), usage['costs'].get(key, 0.)))
+      except OSError:
+	pass
+  return found
+
+def _places(directory):
+  "The cache directory and the subdirectories holding its pieces and test results"
+  places = [directory]
+  for kind in sorted(PATHS):
+    pieces = os.path.join(directory, kind)
+    if os.path.isdir(pieces):
+      places += [os.path.join(pieces, sub) for sub in sorted(os.listdir(pieces))]
+  return places
+
+def _stale(directory):
+  "Temporary files and directories of writes that died, older than STALE"
+  now = time.time()
+  stale = []
+  for place in _places(directory):
+    for name in os.listdir(place):
+      path = os.path.join(place, name)
+      try:
+	if name.startswith(".") and name.endswith(".tmp") and now - os.path.getmtime(path) > STALE:
+	  stale.append(path)
+      except OSError:
+	pass
+  return stale
+
+def _remove(path):
+  if os.path.isdir(path):
+    shutil.rmtree(path, True)
+  elif os.path.exists(path):
+    try:
+      os.remove(path)
+    except OSError:
+      pass
+
+def prune(directory='cache', budget=None, policy='cost'):
+  """Evict entries of a cache directory until it holds at most budget
+  bytes (BUDGET if None, nothing happens if both are None). policy 'lru'
+  evicts the least recently used entries first. 'cost' evicts the ones
+  with the least counting time per byte first, halving that worth every
+  HALFLIFE seconds an entry is not used, so expensive size 5 and 6
+  censuses outlast cheap size 3 ones unless they go unused for long.
+  Temporary files of writes that died more than STALE seconds ago are
+  removed too. Returns the evicted entries."""
+  budget = BUDGET if budget is None else budget
+  if budget is None or not os.path.isdir(directory):
+    return []
+  if policy not in ('lru', 'cost'):
+    raise ValueError("Unknown eviction policy: " + str(policy))
+  with Lock(directory, "usage"):
+    for path in _stale(directory):
+      _remove(path)
+    found = entries(directory)
+    total = sum(entry[1] for entry in found)
+    if total <= budget:
+      return []
+    if policy == 'lru':
+      order = sorted(found, key=lambda entry: -entry[2])
+    else:
+      order = sorted(found, key=lambda entry: (entry[3] / max(entry[1], 1) * 0.5**(entry[2]/HALFLIFE), -entry[2]))
+    usage = readUsage(directory)
+    evicted = []
+    for name, size, age, cost in order:
+      if total <= budget:
+	break
+      _remove(os.path.join(directory, name))
+      usage['costs'].pop(name, None)
+      usage['evicted'] += size
+      total -= size
+      evicted.append(name)
+    writeUsage(directory, usage)
+  return evicted
+
+def stats(directory='cache'):
+  """Size and usage of a cache directory: the number and bytes of tables,
+  pieces and test results, the piece hits and misses and the hit rate,
+  the test result hits and misses, and the bytes written and evicted so
+  far"""
+  usage = readUsage(directory)
+  found = entries(directory) if os.path.isdir(directory) else []
+  pieces = [entry for entry in found if entry[0].startswith("graphs")]
+  tests = [entry for entry in found if entry[0].startswith("tests")]
+  tables = [entry for entry in found if not entry[0].startswith(("graphs", "tests"))]
+  lookups = usage['hits'] + usage['misses']
+  return {'tables': len(tables), 'tableBytes': sum(entry[1] for entry in tables),
+	  'pieces': len(pieces), 'pieceBytes': sum(entry[1] for entry in pieces),
+	  'tests': len(tests), 'testBytes': sum(entry[1] for entry in tests),
+	  'bytes': sum(entry[1] for entry in found), 'hits': usage['hits'], 'misses': usage['misses'],
+	  'hitRate': float(usage['hits'])/lookups if lookups else None,
+	  'testHits': usage['testHits'], 'testMisses': usage['testMisses'],
+	  'written': usage['written'], 'evicted': usage['evicted']}
+
+def migrate(directory='cache', remove=False):
+  """Convert every JSON cache file in directory to a table directory of
+  the same name (without .json), keeping the JSON files unless remove.
+  Files that already have a table are skipped. Returns the converted names."""
+  converted = []
+  for filename in sorted(os.listdir(directory)):
+    if not filename.endswith(".json"):
+      continue
+    path = os.path.join(directory, filename[:-5])
+    if not exists(path):
+      with open(os.path.join(directory, filename), 'rb') as f:
+	save(fromMotifs(json.load(f)), path)
+      converted.append(filename[:-5])
+    if remove:
+      os.remove(os.path.join(directory, filename))
+  return converted
+
+def main():
+  if len(sys.argv) > 1 and sys.argv[1] == 'stats':
+    for name, value in sorted(stats(*sys.argv[2:3]).iteritems()):
+      print name.ljust(12) + str(value)
+  elif len(sys.argv) > 2 and sys.argv[1] == 'prune':
+    evicted = prune(*sys.argv[3:4], budget=int(sys.argv[2]))
+    print "Evicted " + str(len(evicted)) + " entries"
+  else:
+    print "usage: python motifcache.py stats [directory] | prune BYTES [directory]"
+
+if __name__ == '__main__':
+  main()
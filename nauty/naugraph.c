@@ -43,9 +43,9 @@ DYNALLSTAT(set,workset,workset_sz);
 DYNALLSTAT(permutation,workperm,workperm_sz);
 DYNALLSTAT(int,bucket,bucket_sz);
 #else
-static set workset[MAXM];   /* used for scratch work */
-static permutation workperm[MAXN];
-static int bucket[MAXN+2];
+static TLS_ATTR set workset[MAXM];   /* used for scratch work */
+static TLS_ATTR permutation workperm[MAXN];
+static TLS_ATTR int bucket[MAXN+2];
 #endif
 
 /*****************************************************************************
@@ -75,7 +75,7 @@
 #if !MAXN
 DYNALLSTAT(permutation,workperm,workperm_sz);
 #else
-static permutation workperm[MAXN];
+static TLS_ATTR permutation workperm[MAXN];
 #endif
 
 int labelorg = 0;
@@ -96,31 +96,31 @@ static void writemarker(int, int, int, int, int, int);
 #define OPTCALL(proc) if (proc != NULL) (*proc)
 
     /* copies of some of the options: */
-static boolean getcanon,digraph,writeautoms,domarkers,cartesian;
-static int linelength,tc_level,mininvarlevel,maxinvarlevel,invararg;
-static void (*usernodeproc)(graph*,int*,int*,int,int,int,int,int,int);
-static void (*userautomproc)(int,permutation*,int*,int,int,int);
-static void (*userlevelproc)
+static TLS_ATTR boolean getcanon,digraph,writeautoms,domarkers,cartesian;
+static TLS_ATTR int linelength,tc_level,mininvarlevel,maxinvarlevel,invararg;
+static TLS_ATTR void (*usernodeproc)(graph*,int*,int*,int,int,int,int,int,int);
+static TLS_ATTR void (*userautomproc)(int,permutation*,int*,int,int,int);
+static TLS_ATTR void (*userlevelproc)
               (int*,int*,int,int*,statsblk*,int,int,int,int,int,int);
-static void (*tcellproc)(graph*,int*,int*,int,int,set*,int*,int*,int,int,
+static TLS_ATTR void (*tcellproc)(graph*,int*,int*,int,int,set*,int*,int*,int,int,
                         int(*)(graph*,int*,int*,int,int,int,int),int,int);
-static void (*invarproc)
+static TLS_ATTR void (*invarproc)
 	      (graph*,int*,int*,int,int,int,permutation*,int,boolean,int,int);
-static FILE *outfile;
-static dispatchvec dispatch;
+static TLS_ATTR FILE *outfile;
+static TLS_ATTR dispatchvec dispatch;
 
     /* local versions of some of the arguments: */
-static int m,n;
-static graph *g,*canong;
-static int *orbits;
-static statsblk *stats;
+static TLS_ATTR int m,n;
+static TLS_ATTR graph *g,*canong;
+static TLS_ATTR int *orbits;
+static TLS_ATTR statsblk *stats;
     /* temporary versions of some stats: */
-static long invapplics,invsuccesses;
-static int invarsuclevel;
+static TLS_ATTR long invapplics,invsuccesses;
+static TLS_ATTR int invarsuclevel;
 
     /* working variables: <the "bsf leaf" is the leaf which is best guess so
                                 far at the canonical leaf>  */
-static int gca_first,     /* level of greatest common ancestor of current
+static TLS_ATTR int gca_first,     /* level of greatest common ancestor of current
                                 node and first leaf */
            gca_canon,     /* ditto for current node and bsf leaf */
            noncheaplevel, /* level of greatest ancestor for which cheapautom
@@ -142,7 +142,7 @@ static int gca_first,     /* level of greatest common ancestor of current
                                 gca_canon */
            cosetindex;    /* the point being fixed at level gca_first */
 
-static boolean needshortprune;       /* used to flag calls to shortprune */
+static TLS_ATTR boolean needshortprune;       /* used to flag calls to shortprune */
 
 #if !MAXN
 DYNALLSTAT(set,defltwork,defltwork_sz);
@@ -164,26 +164,26 @@ DYNALLSTAT(set,active,active_sz);
    tcnodes and tcells are kept between calls to nauty, except that
    they are freed and reallocated if m gets bigger than alloc_m.  */
 
-static tcnode tcnode0 = {NULL,NULL};
-static int alloc_m = 0;
+static TLS_ATTR tcnode tcnode0 = {NULL,NULL};
+static TLS_ATTR int alloc_m = 0;
 
 #else
-static set defltwork[2*MAXM];        /* workspace in case none provided */
-static permutation workperm[MAXN];   /* various scratch uses */
-static set fixedpts[MAXM];           /* points which were explicitly
+static TLS_ATTR set defltwork[2*MAXM];        /* workspace in case none provided */
+static TLS_ATTR permutation workperm[MAXN];   /* various scratch uses */
+static TLS_ATTR set fixedpts[MAXM];           /* points which were explicitly
                                         fixed to get current node */
-static permutation firstlab[MAXN],   /* label from first leaf */
+static TLS_ATTR permutation firstlab[MAXN],   /* label from first leaf */
                    canonlab[MAXN];   /* label from bsf leaf */
-static short firstcode[MAXN+2],      /* codes for first leaf */
+static TLS_ATTR short firstcode[MAXN+2],      /* codes for first leaf */
              canoncode[MAXN+2];      /* codes for bsf leaf */
-static shortish firsttc[MAXN+2];     /* index of target cell for left path */
-static set active[MAXM];             /* used to contain index to cells now
+static TLS_ATTR shortish firsttc[MAXN+2];     /* index of target cell for left path */
+static TLS_ATTR set active[MAXM];             /* used to contain index to cells now
                                         active for refinement purposes */
 #endif
 
-static set *workspace,*worktop;      /* first and just-after-last addresses of
+static TLS_ATTR set *workspace,*worktop;      /* first and just-after-last addresses of
                                         work area to hold automorphism data */
-static set *fmptr;                   /* pointer into workspace */
+static TLS_ATTR set *fmptr;                   /* pointer into workspace */
 
 
 /*****************************************************************************
@@ -2,50 +2,24 @@ import networkx as nx
 import random
 import numpy as np
 from itertools import repeat
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+import edgeswap
 
-def randomize_graph(G, numpasses):
-	"Perfoms numpasses edge swaps in place on G"
-	for i in xrange(numpasses):
-		success = False
-		while not success:
-			edges = G.edges()
-			edgeSet = set(edges)
-			edge1 = random.choice(edges)
-			a,b = edge1
-			random.shuffle(edges)
-			for edge2 in edges:
-				c,d = edge2
-				if (a, d) not in edgeSet and (c, b) not in edgeSet:
-					success = True
-					break
-		G.add_edge(a, d)
-		G.add_edge(c, b)
-		G.remove_edge(a, b)
-		G.remove_edge(c, d)
+def randomize_graph(G, numpasses, seed=None):
+	"Perfoms numpasses edge swaps in place on G and returns it"
+	swapper = edgeswap.EdgeSwapper(G, seed=seed)
+	swapper.randomize(numpasses)
+	edgeswap.setEdges(G, swapper)
+	return G
 
-def randomize_graph_count(G, numpasses):
+def randomize_graph_count(G, numpasses, seed=None):
 	"Performs numpasses edgeswaps and returns diff from original"
-	original = nx.to_numpy_matrix(G)
+	swapper = edgeswap.EdgeSwapper(G, seed=seed)
 	diff = [0]
-	for i in xrange(numpasses):
-		success = False
-		while not success:
-			edges = G.edges()
-			edgeSet = set(edges)
-			edge1 = random.choice(edges)
-			a,b = edge1
-			random.shuffle(edges)
-			for edge2 in edges:
-				c,d = edge2
-				if (a, d) not in edgeSet and (c, b) not in edgeSet:
-					success = True
-					break
-		G.add_edge(a, d)
-		G.add_edge(c, b)
-		G.remove_edge(a, b)
-		G.remove_edge(c, d)
-		newGraph = nx.to_numpy_matrix(G)
-		diff.append( np.sum(abs(original-newGraph))/2 )
+	swapper.randomize(numpasses, diff)
+	edgeswap.setEdges(G, swapper)
 	return np.array(diff)
 	
 """	
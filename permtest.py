@@ -0,0 +1,210 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+permtest.py
+
+Permutation tests of the difference of two group means, for every feature
+(motif, distribution measure, network measure) at once. The shuffles of
+the pooled patients are drawn as a kmax x n index matrix; each one is
+turned into a 0/1 row marking the patients it puts in the first group, so
+the first group's sums under all shuffles are a single matrix product with
+the patients x features values.
+
+The p-value is that of FinalMotif.permttest: with i the number of shuffled
+mean differences at most the real one, min(kmax-i, i)/kmax, or 1/kmax when
+none is larger.
+
+multiGroup() shuffles the pooled labels of several groups at once and
+takes every pairwise difference and an omnibus statistic from the same
+shuffles.
+
+With stop or precision the tests are sequential (Besag and Clifford): a
+feature gets no more shuffles once the smaller tail of its null holds stop
+shuffles, or once its p-value is known to a relative standard error of
+precision, and its p-value is then that of the shuffles it got. Plainly
+null features are done after FIRST shuffles, and only borderline and very
+significant ones run on to kmax.
+"""
+
+from itertools import combinations
+import numpy as np
+
+#Shuffles multiplied with the values at a time, bounds the memory of the null
+BLOCK = 1024
+#Sequential stopping defaults of every test (None runs all kmax shuffles)
+STOP = None
+PRECISION = None
+#Shuffles before the first sequential check, doubling after every check up to BLOCK
+FIRST = 100
+
+class Shuffles(object):
+  """Random permutations of range(n), one per row, drawn from seed when
+  they are first asked for, so tests that stop early draw fewer"""
+
+  def __init__(self, n, seed=None):
+    self.n = n
+    self.random = np.random.RandomState(seed)
+    self.order = np.zeros((0, n), dtype=np.int64)
+
+  def rows(self, start, stop):
+    if stop > len(self.order):
+      more = max(stop - len(self.order), len(self.order))
+      self.order = np.concatenate((self.order, self.random.rand(more, self.n).argsort(axis=1)))
+    return self.order[start:stop]
+
+def shuffles(n, kmax, seed=None):
+  "(kmax, n) matrix whose rows are random permutations of range(n)"
+  return Shuffles(n, seed).rows(0, kmax)
+
+def _pValues(below, used):
+  used = np.asarray(used, dtype=np.float64)
+  p = np.minimum(used - below, below) / used
+  return np.where(below == used, 1.0/used, p)
+
+def _upperPValues(above, used):
+  return np.maximum(above, 1) / np.asarray(used, dtype=np.float64)
+
+def _done(tails, used, stop, precision):
+  "Which features are decided, given the shuffles in the smaller tail of each"
+  done = np.zeros(len(tails), dtype=bool)
+  if stop:
+    done |= tails >= stop
+  if precision:
+    p = (tails + 1.) / (used + 1.)
+    done |= np.sqrt((1 - p) / (p * (used + 1.))) <= precision
+  return done
+
+def _permute(shuffles, kmax, features, nullStatistics, reals, upper, stop, precision):
+  """Count, for every statistic and feature, the shuffles whose statistic
+  is at most the real one (at least, for the upper-tailed statistics).
+  nullStatistics(block, columns) returns the statistics of a block of
+  shuffles for some features. Returns the counts and the number of
+  shuffles every feature got."""
+  stop = STOP if stop is None else stop
+  precision = PRECISION if precision is None else precision
+  sequential = bool(stop or precision)
+  counts = np.zeros((len(reals), features), dtype=np.int64)
+  used = np.zeros(features, dtype=np.int64)
+  active = np.arange(features)
+  start, step = 0, FIRST if sequential else BLOCK
+  while start < kmax and len(active):
+    end = min(kmax, start + step)
+    nulls = nullStatistics(shuffles.rows(start, end), active)
+    for s, null in enumerate(nulls):
+      if upper[s]:
+	counts[s, active] += np.count_nonzero(null >= reals[s][active], axis=0)
+      else:
+	counts[s, active] += np.count_nonzero(null <= reals[s][active], axis=0)
+    used[active] = end
+    start = end
+    if sequential:
+      done = np.ones(len(active), dtype=bool)
+      for s in xrange(len(reals)):
+	count = counts[s, active]
+	done &= _done(count if upper[s] else np.minimum(count, end - count), end, stop, precision)
+      active = active[~done]
+      step = min(2*step, BLOCK)
+  return counts, used
+
+def _columns(values, columns):
+  return values if len(columns) == values.shape[1] else values[:,columns]
+
+def _test(first, second, shuffles, kmax, stop=None, precision=None):
+  """(signs, p-values) of the features of two patients x features arrays
+  under shuffles (a Shuffles of their pooled patients)"""
+  n1, n2 = len(first), len(second)
+  values = np.concatenate((first, second)).astype(np.float64)
+  total = values.sum(axis=0)
+  real = first.mean(axis=0) - second.mean(axis=0)
+
+  def null(block, columns):
+    chosen = np.zeros(block.shape)
+    chosen[np.arange(len(block))[:,np.newaxis], block[:,:n1]] = 1
+    sums = chosen.dot(_columns(values, columns))
+    return [sums/n1 - (total[columns] - sums)/n2]
+
+  counts, used = _permute(shuffles, kmax, values.shape[1], null, [real], [False], stop, precision)
+  return real, _pValues(counts[0], used)
+
+def _asMatrix(values):
+  values = np.asarray(values, dtype=np.float64)
+  return values[:,np.newaxis] if values.ndim == 1 else values
+
+def compare(groups, pairs=None, kmax=5000, seed=None, stop=None, precision=None):
+  """Permutation tests between groups, a list of patients x features
+  arrays (or 1-d arrays for a single feature) with the same features.
+  pairs are the (i, j) group indices to test, all of them by default.
+  Returns a list with, for every pair, the list of (sign, p) of every
+  feature, sign being the mean of group i minus that of group j. Pairs of
+  the same group sizes share their shuffles. stop and precision make the
+  tests sequential (None uses STOP and PRECISION, 0 turns them off)."""
+  groups = [_asMatrix(group) for group in groups]
+  pairs = list(combinations(range(len(groups)), 2)) if pairs is None else list(pairs)
+  random = np.random.RandomState(seed)
+  orders = {}
+  results = []
+  for i, j in pairs:
+    sizes = (len(groups[i]), len(groups[j]))
+    if sizes not in orders:
+      orders[sizes] = Shuffles(sum(sizes), random.randint(2**31))
+    signs, p = _test(groups[i], groups[j], orders[sizes], kmax, stop, precision)
+    results.append(zip(signs.tolist(), p.tolist()))
+  return results
+
+def groupTests(values, labels, pairs=None, kmax=5000, seed=None, stop=None, precision=None):
+  """compare() of the rows of a patients x features array by their group
+  labels. pairs are (label, label) tuples, all of them (in sorted label
+  order) by default. Returns a dict mapping each pair to its (sign, p)
+  list."""
+  values = _asMatrix(values)
+  labels = np.asarray(labels)
+  names = sorted(set(labels.tolist()))
+  pairs = list(combinations(names, 2)) if pairs is None else list(pairs)
+  index = dict((name, k) for k, name in enumerate(names))
+  results = compare([values[labels == name] for name in names],
+		    [(index[a], index[b]) for a, b in pairs], kmax, seed, stop, precision)
+  return dict(zip(pairs, results))
+
+def multiGroup(groups, pairs=None, kmax=5000, seed=None, stop=None, precision=None):
+  """Permutation tests of several groups (as in compare()) from one set of
+  shuffles of the pooled group labels. Every shuffle gives the mean of
+  every group, and from those the difference of every pair and the
+  omnibus statistic, the between-group sum of squares sum n_g (mean_g -
+  mean)^2, so all pairs are tested against the same null and one pass
+  replaces one per pair. Returns (pairwise, omnibus): pairwise like
+  compare(), omnibus the (statistic, p) of every feature, p being the
+  fraction of shuffles with a statistic at least as large (at least
+  1/kmax). Sequential tests stop a feature once all its tests are done."""
+  groups = [_asMatrix(group) for group in groups]
+  pairs = list(combinations(range(len(groups)), 2)) if pairs is None else list(pairs)
+  sizes = [len(group) for group in groups]
+  offsets = np.cumsum([0] + sizes)
+  values = np.concatenate(groups).astype(np.float64)
+  grand = values.mean(axis=0)
+
+  def statistics(means, grand):
+    differences = [means[i] - means[j] for i, j in pairs]
+    return differences + [sum(size*(mean - grand)**2 for size, mean in zip(sizes, means))]
+
+  def null(block, columns):
+    rows = np.arange(len(block))[:,np.newaxis]
+    active = _columns(values, columns)
+    means = []
+    for g, size in enumerate(sizes):
+      chosen = np.zeros(block.shape)
+      chosen[rows, block[:,offsets[g]:offsets[g+1]]] = 1
+      means.append(chosen.dot(active)/size)
+    return statistics(means, grand[columns])
+
+  reals = statistics([group.mean(axis=0) for group in groups], grand)
+  counts, used = _permute(Shuffles(len(values), seed), kmax, values.shape[1], null, reals,
+			  [False]*len(pairs) + [True], stop, precision)
+  pairwise = [zip(real.tolist(), _pValues(count, used).tolist()) for real, count in zip(reals[:-1], counts)]
+  omnibus = zip(np.asarray(reals[-1]).tolist(), _upperPValues(counts[-1], used).tolist())
+  return pairwise, omnibus
+
+def permttest(d1, d2, kmax=5000, seed=None, stop=None, precision=None):
+  """(sign, p) of a permutation test of the means of the 1-d arrays d1 and
+  d2, or a list of them for patients x features arrays"""
+  result = compare([d1, d2], [(0, 1)], kmax, seed, stop, precision)[0]
+  return result[0] if np.ndim(d1) == 1 else result
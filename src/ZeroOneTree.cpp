@@ -11,11 +11,11 @@ tree::tree(int subgraphSize) {
 }
 
 tree::~tree() {
-	/*
-    delete [] node;
-    delete [] leaf;
-    delete root;
-*/
+	for(unsigned int i = 0; i < node_blocks.size(); i++)
+		delete [] node_blocks[i];
+	for(unsigned int i = 0; i < leaf_blocks.size(); i++)
+		delete [] leaf_blocks[i];
+	delete root;
 }
 
 Node * tree::add_node() {
@@ -47,11 +47,13 @@ Leaf * tree::update_leaf(Leaf * l, int val) {
 
 void tree::allocate_node() {
 	node = new Node [MAX];
+	node_blocks.push_back(node);
 	node_ptr = 0;
 }
 
 void tree::allocate_leaf() {
 	leaf = new Leaf [MAX];
+	leaf_blocks.push_back(leaf);
 	leaf_ptr = 0;
 }
 
@@ -1,22 +1,7 @@
 #include "graph.h"
 #include <iostream>
 
-graph canon[MAXN * MAXM];
-graph * nauty_g;
-int* lab;
-int* ptn;
-int* orbits;
-
-
-static DEFAULTOPTIONS(options);
-statsblk(stats);
-setword workspace[160*MAXM];
-
-unsigned int * C_main;
-unsigned long * ID;
-int idxID;
-int head;
-double enumerated_class;
+static DEFAULTOPTIONS(default_options);
 
 FILE * o; 
 
@@ -30,29 +15,14 @@ bool sortCmp(int i, int j) {
 /****************************************************************
 ****************************************************************/
 
-Graph::Graph(const int n, const int k) {
+Graph::Graph(const int n) {
 	register int i, j;
-	subgraphSize = k;
-	T = new tree(k);
-	M = ((subgraphSize + WORDSIZE - 1) / WORDSIZE);
-	nauty_g = new graph[subgraphSize * MAXM];
-	lab = new int[subgraphSize];
-	ptn = new int[subgraphSize];
-	orbits = new int[subgraphSize];
-
-	head = 1;
+	am = NULL;
     nV = n;
 	nE = 0;
 	nEd = 0;
 	E_temp.resize(nV+1);
 	h = sizeof(Entry) << 3;
-
-	options.writeautoms = FALSE;
-	options.getcanon = TRUE;
-	options.defaultptn = TRUE;
-	options.digraph = TRUE;
-
-	nauty_check(WORDSIZE, M, subgraphSize, NAUTYVERSIONID);
 	
 	rowSize = (int)ceil((float)nV/8);
 	adjMat = new char[rowSize*(nV+1)+1];
@@ -74,15 +44,9 @@ Graph::~Graph() {
         delete [] E[i];    
     }
     delete [] E;
-    delete [] lab;
-    delete [] ptn	;
-    delete [] orbits;
-	delete [] nauty_g;
-    delete [] ID;
-    delete [] C_main;
     delete [] degree;
-	delete T;
-    fclose(am);
+    if(am)
+    	fclose(am);
 }
 
 
@@ -280,13 +244,78 @@ void Graph::Finalize() {
 	*/
 }
 
+/****************************************************************
+ * Rebuilds the neighbour lists from the adjacency matrix after *
+ * its edges were moved (see genRandGraph_Edge).                *
+****************************************************************/
+
+void Graph::Rebuild() {
+	register int i, j;
+	vector<int> N;
+
+	maxDegree = 0;
+	for(i = 1; i <= nV; i++) {
+		N.clear();
+		for(j = nV; j >= 1; j--) {
+			if(i != j && (isConnected(i, j) || isConnected(j, i)))
+				N.push_back(j);
+		}
+		delete [] E[i];
+		E[i] = new int[N.size() + 1];
+		E[i][0] = N.size();
+		for(j = 0; j < (int)N.size(); j++)
+			E[i][j+1] = N[j];
+		if(maxDegree < (int)N.size())
+			maxDegree = N.size();
+	}
+}
+
 /****************************************************************
 ****************************************************************/
 
-void Graph::Classify(vertex **subgraph, int level) {
+Classifier::Classifier(Graph *input, const int k, const LookupTable *lookup) {
+	g = input;
+	subgraphSize = k;
+	table = lookup;
+	if (table != NULL)
+		classCounts.resize(table->Classes());
+	T = new tree(k);
+	M = ((subgraphSize + WORDSIZE - 1) / WORDSIZE);
+	nauty_g = new graph[subgraphSize * MAXM];
+	canon = new graph[subgraphSize * MAXM];
+	lab = new int[subgraphSize];
+	ptn = new int[subgraphSize];
+	orbits = new int[subgraphSize];
+
+	options = default_options;
+	options.writeautoms = FALSE;
+	options.getcanon = TRUE;
+	options.defaultptn = TRUE;
+	options.digraph = TRUE;
+
+	nauty_check(WORDSIZE, M, subgraphSize, NAUTYVERSIONID);
+}
+
+/****************************************************************
+****************************************************************/
+
+Classifier::~Classifier() {
+	delete [] lab;
+	delete [] ptn;
+	delete [] orbits;
+	delete [] nauty_g;
+	delete [] canon;
+	delete T;
+}
+
+/****************************************************************
+****************************************************************/
+
+void Classifier::Classify(vertex **subgraph, int level) {
 	register int i = 0, j, l, k;
     set *gv;
 	int tempSubgraph[subgraphSize];
+	unsigned long pattern;
 	
 	for (l = 0; l < level; l++) {
 		for(k = 1; k <= subgraph[l][0]; k++) {
@@ -294,13 +323,26 @@ void Graph::Classify(vertex **subgraph, int level) {
 		}
 	}
 	
+	if (table != NULL) {
+		pattern = 0;
+		for (i = 0; i < subgraphSize; i++) {
+			for(j = 0; j < subgraphSize; j++) {
+				if(i == j)
+					continue;
+				pattern = (pattern << 1) | g->isConnected(tempSubgraph[i], tempSubgraph[j]);
+			}
+		}
+		classCounts[table->Class(pattern)]++;
+		return;
+	}
+	
 	for (i = 0; i < subgraphSize; i++) {
 		gv = GRAPHROW(nauty_g, i, M);
 		EMPTYSET(gv, M);		
 		for(j = 0; j < subgraphSize; j++) {
 			if(i == j)
 				continue;
-			if (isConnected(tempSubgraph[i], tempSubgraph[j])) 
+			if (g->isConnected(tempSubgraph[i], tempSubgraph[j])) 
 			{
 				ADDELEMENT(gv, j);
 			}
@@ -316,7 +358,7 @@ void Graph::Classify(vertex **subgraph, int level) {
 		for(j = 0; j < subgraphSize; j++) {
 			if(i == j)
 				continue;
-			if(isConnected(tempSubgraph[lab[i]], tempSubgraph[lab[j]])) 
+			if(g->isConnected(tempSubgraph[lab[i]], tempSubgraph[lab[j]])) 
 				T->insert_one_main();
 			else
 				T->insert_zero_main();
@@ -324,132 +366,91 @@ void Graph::Classify(vertex **subgraph, int level) {
 	}
 	
 	for(j = 0; j < subgraphSize-2; j++) {
-		if(isConnected(tempSubgraph[lab[i]], tempSubgraph[lab[j]])) 
+		if(g->isConnected(tempSubgraph[lab[i]], tempSubgraph[lab[j]])) 
 			T->insert_one_main();
 		else
 			T->insert_zero_main();				
 	}
 	
-	if(isConnected(tempSubgraph[lab[i]], tempSubgraph[lab[j]])) 
+	if(g->isConnected(tempSubgraph[lab[i]], tempSubgraph[lab[j]])) 
 		T->update_one_main(1);
 	else 
 		T->update_zero_main(1);
 }
 
 /****************************************************************
+ * Motif ID of the class at the end of the tree path str: the   *
+ * off-diagonal entries of its canonical adjacency matrix, read *
+ * row by row as a binary number.                               *
 ****************************************************************/
 
-void Graph::AllocateCounter() {
-	int class_num = T->get_leafnum();
-	C_main = new unsigned int[class_num + 1];
-	C_main[0] = 0;
-	
-	idxID = 0;
-	ID = new unsigned long[class_num];
-}
-
-/****************************************************************
-****************************************************************/
-
-void Graph::DFS(Node * cur) {
-	if(!cur->left && !cur->right) {
-		Leaf * leaf = (Leaf *)cur;
-		if(leaf->count > 0) {
-			head++;
-			leaf->count = 0;
-		}
-		return;
-	}
-	if(cur->left)
-		DFS(cur->left);
-	if(cur->right)
-		DFS(cur->right);
-} 
-
-/****************************************************************
-****************************************************************/
-
-void Graph::print_adjMatrix(char * str) {
+unsigned long Classifier::adjMatrixID(char * str) {
 	register int i, j;
 	int l = 0;
 	int index = 0;
-	ID[idxID] = 0;
+	unsigned long ID = 0;
 	int maxpow = subgraphSize * (subgraphSize-1) - 1 ;
 
 	for(i = 0; i < subgraphSize; i++) {
 		for(j = 0; j < subgraphSize; j++) {
 			if(i == j) {
 				l++;
-				//fprintf(am,"0");
 			}
 			else
 			{
 				index = i*(subgraphSize)+(j-l);
-				//fprintf(am, "%d", str[index]);
 				if (str[index] == 1){
-					ID[idxID] |= 1<<(maxpow - index);
+					ID |= 1UL<<(maxpow - index);
 				}
 			}
 		}
-		//fprintf(am,"\n");
 	}
-	//fprintf(am,"ID: %d", ID[idxID]);
-	//fprintf(am,"\n\n");
-	idxID++;
+	return ID;
 }
 
 /****************************************************************
 ****************************************************************/
 
-void Graph::DFSmain(Node * cur, char * str, int lev) {
+void Classifier::DFSmain(Node * cur, char * str, int lev, vector<unsigned long> &ids, vector<unsigned long long> &counts) {
 	if(!cur->left && !cur->right) {
-		print_adjMatrix(str);
 		Leaf * leaf = (Leaf *)cur;
-		head++;
-		C_main[head] = leaf->count;
-		leaf->count = 0;
-		C_main[0]++;
+		ids.push_back(adjMatrixID(str));
+		counts.push_back(leaf->count);
 		return;
 	}
 	if(cur->left) {
 		str[lev] = 0;
-		DFSmain(cur->left, str, lev+1);
+		DFSmain(cur->left, str, lev+1, ids, counts);
 	}
 	if(cur->right) {
 		str[lev] = 1;
-		DFSmain(cur->right, str, lev+1);
+		DFSmain(cur->right, str, lev+1, ids, counts);
 	}
 }
 
 /****************************************************************
+ * Reads the counted classes out of the tree, sorted by ID.     *
 ****************************************************************/
 
-void Graph::Extract() {
-	
-	register int i, j;
-	int class_num = T->get_leafnum();
+void Classifier::getMotifResults(vector<unsigned long> &ids, vector<unsigned long long> &counts) {
 	char * adj_str = new char[subgraphSize*(subgraphSize-1)];
-	Node * current = T->return_root();
 	
-	head = 0;
-	DFSmain(current, adj_str, 0);
-	enumerated_class = C_main[0];	
-	//printf("Number of Non-isomorphic Classes: %.0f\n", enumerated_class);
-}
-
-/****************************************************************
-****************************************************************/
-void Graph::outputMotifResults(unsigned long long subgraphCounter, char* path){
-	FILE * cm;
-	char file[256];
-	sprintf(file, "%s/MotifCount.txt", path);
-	//sprintf(file, "%s/%s", path,filename);
-	cm = fopen(file, "w+");
-	fprintf(cm, "%llu\n", subgraphCounter);
-	for(int i=0; i<T->get_leafnum(); i++){
-		fprintf(cm, "%lu %u\n", ID[i], C_main[i+1]);
+	ids.clear();
+	counts.clear();
+	if (table != NULL) {
+		for(int c = 0; c < (int)classCounts.size(); c++) {
+			if (classCounts[c] > 0) {
+				ids.push_back(table->ID(c));
+				counts.push_back(classCounts[c]);
+			}
+		}
+		delete [] adj_str;
+		return;
 	}
-	fclose(cm);
+	//an empty tree (no subgraph found) has no leaves to read
+	if(T->get_leafnum() > 0)
+		DFSmain(T->return_root(), adj_str, 0, ids, counts);
+	delete [] adj_str;
 }
 
 /*
@@ -0,0 +1,238 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include "incrementalCensus.h"
+
+/****************************************************************
+****************************************************************/
+
+IncrementalCensus::IncrementalCensus(int n, int size) {
+	nV = n;
+	subgraphSize = size;
+	table = GetLookupTable(size);
+	adj.assign(nV * nV, 0);
+	neighbours.resize(nV);
+	if (table != NULL)
+		classCounts.assign(table->Classes(), 0);
+	subgraphs = 0;
+	extensions.resize(subgraphSize + 1);
+	added.resize(subgraphSize + 1);
+	marked.assign(nV, false);
+	reverseEdge = false;
+	change = 0;
+}
+
+/****************************************************************
+ * Counts the graph made of the first m edges (0-based pairs)   *
+ * with a full Kavosh census.                                   *
+****************************************************************/
+
+void IncrementalCensus::Start(const int *edges, int m, int threads) {
+	register int i, u, v;
+	Graph *graph = new Graph(nV);
+	Census census;
+
+	for(i = 0; i < m; i++) {
+		u = edges[2*i];
+		v = edges[2*i+1];
+		if(u == v || adj[u*nV + v]) continue;
+		if(!adj[v*nV + u]) {
+			neighbours[u].push_back(v);
+			neighbours[v].push_back(u);
+		}
+		adj[u*nV + v] = 1;
+		graph->addEdge(u + 1, v + 1);
+	}
+	graph->Finalize();
+
+	Enumerate(graph, subgraphSize, &census, threads);
+	subgraphs = census.subgraphs;
+	for(i = 0; i < (int)census.ids.size(); i++)
+		classCounts[table->IndexOf(census.ids[i])] += census.counts[i];
+	delete graph;
+}
+
+/****************************************************************
+ * Adds the edge u -> v (0-based) and updates the census with   *
+ * every connected subgraph that holds both u and v.            *
+****************************************************************/
+
+void IncrementalCensus::AddEdge(vertex u, vertex v) {
+	if(u == v || adj[u*nV + v])
+		return;
+	reverseEdge = adj[v*nV + u];
+	adj[u*nV + v] = 1;
+	if(!reverseEdge) {
+		neighbours[u].push_back(v);
+		neighbours[v].push_back(u);
+	}
+	Change(u, v, 1);
+}
+
+/****************************************************************
+ * Removes the edge u -> v (0-based). The subgraphs holding     *
+ * both u and v are visited while the edge is still there.      *
+****************************************************************/
+
+void IncrementalCensus::RemoveEdge(vertex u, vertex v) {
+	register unsigned int i;
+
+	if(!adj[u*nV + v])
+		return;
+	reverseEdge = adj[v*nV + u];
+	Change(u, v, -1);
+	adj[u*nV + v] = 0;
+	if(!reverseEdge) {
+		for(i = 0; neighbours[u][i] != v; i++);
+		neighbours[u][i] = neighbours[u].back();
+		neighbours[u].pop_back();
+		for(i = 0; neighbours[v][i] != u; i++);
+		neighbours[v][i] = neighbours[v].back();
+		neighbours[v].pop_back();
+	}
+}
+
+/****************************************************************
+ * Enumerates the connected subgraphs around the edge u -> v,   *
+ * which is in the graph, and moves them by sign.               *
+****************************************************************/
+
+void IncrementalCensus::Change(vertex u, vertex v, int sign) {
+	register unsigned int i, j;
+	vertex w;
+
+	change = sign;
+	subgraph.clear();
+	subgraph.push_back(u);
+	subgraph.push_back(v);
+	marked[u] = marked[v] = true;
+	extensions[2].clear();
+	for(i = 0; i < 2; i++) {
+		for(j = 0; j < neighbours[subgraph[i]].size(); j++) {
+			w = neighbours[subgraph[i]][j];
+			if(!marked[w]) {
+				marked[w] = true;
+				extensions[2].push_back(w);
+			}
+		}
+	}
+	added[2] = extensions[2];
+
+	Extend(2);
+
+	for(i = 0; i < added[2].size(); i++)
+		marked[added[2][i]] = false;
+	marked[u] = marked[v] = false;
+}
+
+/****************************************************************
+ * ESU from the two ends of the edge: every vertex taken        *
+ * from the extension only brings in the neighbours that no     *
+ * vertex of the subgraph has, so each subgraph is met once.    *
+****************************************************************/
+
+void IncrementalCensus::Extend(int found) {
+	register unsigned int j;
+	vector<vertex> &extension = extensions[found];
+	vertex w, x;
+
+	if(found == subgraphSize) {
+		Update();
+		return;
+	}
+
+	while(!extension.empty()) {
+		w = extension.back();
+		extension.pop_back();
+		subgraph.push_back(w);
+		if(found + 1 < subgraphSize) {
+			vector<vertex> &next = extensions[found + 1];
+			next = extension;
+			added[found + 1].clear();
+			for(j = 0; j < neighbours[w].size(); j++) {
+				x = neighbours[w][j];
+				if(!marked[x]) {
+					marked[x] = true;
+					next.push_back(x);
+					added[found + 1].push_back(x);
+				}
+			}
+			Extend(found + 1);
+			for(j = 0; j < added[found + 1].size(); j++)
+				marked[added[found + 1][j]] = false;
+		}
+		else
+			Update();
+		subgraph.pop_back();
+	}
+}
+
+/****************************************************************
+ * Moves the current subgraph between its class without the     *
+ * edge (if it is connected then) and its class with it.        *
+****************************************************************/
+
+void IncrementalCensus::Update() {
+	register int i, j;
+	unsigned long pattern = 0;
+	const int bits = subgraphSize * (subgraphSize - 1);
+
+	for(i = 0; i < subgraphSize; i++) {
+		for(j = 0; j < subgraphSize; j++) {
+			if(i == j)
+				continue;
+			pattern = (pattern << 1) | adj[subgraph[i]*nV + subgraph[j]];
+		}
+	}
+	classCounts[table->Class(pattern)] += change;
+
+	//the edge is subgraph[0] -> subgraph[1], the highest bit of the pattern
+	if(reverseEdge || ConnectedWithout(0, 1))
+		classCounts[table->Class(pattern & ~(1UL << (bits - 1)))] -= change;
+	else
+		subgraphs += change;
+}
+
+/****************************************************************
+ * True if the subgraph stays connected without any edge        *
+ * between its a-th and b-th vertices.                          *
+****************************************************************/
+
+bool IncrementalCensus::ConnectedWithout(int a, int b) {
+	register int i, j, head = 0, tail = 1;
+	int queue[MAX_TABLE_SIZE];
+	bool seen[MAX_TABLE_SIZE] = {false};
+
+	queue[0] = 0;
+	seen[0] = true;
+	while(head < tail) {
+		i = queue[head++];
+		for(j = 0; j < subgraphSize; j++) {
+			if(seen[j] || (i == a && j == b) || (i == b && j == a))
+				continue;
+			if(adj[subgraph[i]*nV + subgraph[j]] || adj[subgraph[j]*nV + subgraph[i]]) {
+				seen[j] = true;
+				queue[tail++] = j;
+			}
+		}
+	}
+	return tail == subgraphSize;
+}
+
+/****************************************************************
+****************************************************************/
+
+void IncrementalCensus::Snapshot(Census *census) {
+	census->subgraphs = subgraphs;
+	census->replicates = 1;
+	census->randomGraphs = 0;
+	census->ids.clear();
+	census->counts.clear();
+	census->frequencies.clear();
+	census->errors.clear();
+	for(int c = 0; c < (int)classCounts.size(); c++) {
+		if(classCounts[c] > 0) {
+			census->ids.push_back(table->ID(c));
+			census->counts.push_back(classCounts[c]);
+		}
+	}
+}
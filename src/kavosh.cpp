@@ -0,0 +1,932 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <math.h>
+#include <time.h>
+#include <pthread.h>
+#include <deque>
+#include <algorithm>
+#include <map>
+#include <kavosh.h>
+#include <incrementalCensus.h>
+#include <randomGenerator.h>
+
+//#define Debug
+
+// Sample() runs at least MIN_REPLICATES replicates before it stops on the
+// target accuracy (2 before it stops on time), DEFAULT_REPLICATES if no
+// stopping rule is given and never more than MAX_REPLICATES.
+#define MIN_REPLICATES 5
+#define DEFAULT_REPLICATES 10
+#define MAX_REPLICATES 1000
+
+using namespace std;
+
+/****************************************************************
+ * splitmix64 finalizer, spreads seeds over the whole state.    *
+****************************************************************/
+
+static unsigned long mixSeed(unsigned long x) {
+	x += 0x9e3779b97f4a7c15UL;
+	x = (x ^ (x >> 30)) * 0xbf58476d1ce4e5b9UL;
+	x = (x ^ (x >> 27)) * 0x94d049bb133111ebUL;
+	return x ^ (x >> 31);
+}
+
+/****************************************************************
+****************************************************************/
+
+Enumerator::Enumerator(Graph *graph, int size, const double *prob, unsigned long seed) {
+	register int i, k, d;
+
+	g = graph;
+	subgraphSize = size;
+	classifier = new Classifier(g, subgraphSize, GetLookupTable(subgraphSize));
+
+	subgraph = new int*[subgraphSize];
+	for (i = 0; i < subgraphSize; i++)
+		subgraph[i] = new int[subgraphSize+1];
+
+	Visited = new bool[g->Size()+1];
+	for(i = 1; i <= g->Size(); i++)
+		Visited[i] = false;
+
+	childSet = new unsigned int*[subgraphSize];
+	Index    = new unsigned int*[subgraphSize];
+	for(i = 0; i < subgraphSize; i++) {
+		childSet[i] = new unsigned int[g->MaxDegree() * subgraphSize + 1];
+		Index[i] = new unsigned int[g->MaxDegree() * subgraphSize + 1];
+	}
+
+	subgraphCounter = 0;
+
+	levelClassifiers = new Classifier*[subgraphSize];
+	levelCounters = new unsigned long long[subgraphSize];
+	for(i = 0; i < subgraphSize; i++) {
+		levelClassifiers[i] = NULL;
+		levelCounters[i] = 0;
+	}
+
+	stepProb = NULL;
+	sampleSeed = seed;
+	if (prob != NULL) {
+		stepProb = new double*[subgraphSize];
+		for(i = 0; i < subgraphSize; i++) {
+			stepProb[i] = new double[subgraphSize - i + 1];
+			stepProb[i][0] = 1;
+			for(k = 1; k <= subgraphSize - i; k++) {
+				stepProb[i][k] = 1;
+				for(d = i; d < i + k; d++)
+					stepProb[i][k] *= prob[d];
+			}
+		}
+	}
+}
+
+/****************************************************************
+****************************************************************/
+
+Enumerator::~Enumerator() {
+	for(int i = 0; i < subgraphSize; i++) {
+		delete [] Index[i];
+		delete [] childSet[i];
+		delete [] subgraph[i];
+	}
+    delete [] subgraph;
+	delete [] Index;
+	delete [] childSet;
+    delete [] Visited;
+	delete classifier;
+	for(int i = 0; i < subgraphSize; i++)
+		delete levelClassifiers[i];
+	delete [] levelClassifiers;
+	delete [] levelCounters;
+	if (stepProb != NULL) {
+		for(int i = 0; i < subgraphSize; i++)
+			delete [] stepProb[i];
+		delete [] stepProb;
+	}
+}
+
+
+/****************************************************************
+ * Also counts the subgraphs of k nodes, 2 <= k < size.          *
+****************************************************************/
+
+void Enumerator::CountSize(int k) {
+	if (k >= 2 && k < subgraphSize && levelClassifiers[k] == NULL)
+		levelClassifiers[k] = new Classifier(g, k, GetLookupTable(k));
+}
+
+/***************************************************************
+ * This function finds the valid children in each given level. *
+***************************************************************/
+
+void Enumerator::initChildSet(int root, int level) {
+	register int *N;
+	register int i, j;
+	const int *parents = subgraph[level-1];
+		
+	childSet[level][0] = 0;
+	for(i = 1; i <= parents[0]; i++) {
+		N = g->getNeighbours(parents[i]);
+		for(j = 1; j <= N[0] && root <= N[j]; j++) {
+			if(!Visited[N[j]]) {
+				Visited[N[j]] = true;
+				childSet[level][0]++;
+				childSet[level][childSet[level][0]] = N[j];				
+			}
+		}		
+	}
+}
+
+/****************************************************************************************
+ * This function Explores the root vertex and generates subgraphs containing that node. *
+****************************************************************************************/
+
+void Enumerator::Explore(vertex root, int level, int reminder) {
+	register int i, j, k; // k is the number of selected nodes in the current level.
+
+	//Sampling: follow the selection of the previous level with its probability
+	if (stepProb != NULL) {
+		k = subgraph[level-1][0];
+		if (uniform(rng) >= stepProb[subgraphSize - reminder - k][k])
+			return;
+	}
+
+#ifdef Debug
+	printf("************************************\n");
+	printf("*****   Exploring level %3d  *******\n", level);
+	printf("************************************\n");
+#endif
+
+	//The selected levels form a smaller subgraph of subgraphSize - reminder nodes
+	if (reminder > 0 && levelClassifiers[subgraphSize - reminder] != NULL) {
+		levelCounters[subgraphSize - reminder]++;
+		levelClassifiers[subgraphSize - reminder]->Classify(subgraph, level);
+	}
+
+	if (reminder == 0) { //reminder == 0 assures level <= subgraphSize
+		subgraphCounter++;
+		
+#ifdef Debug
+		printf("--> Subgraph Number %d: \n", subgraphCounter);
+		for(i = 0; i < level; i++) {
+			printf("Level %d: ", i);
+			for(k = 1; k <= subgraph[i][0]; k++) {
+				printf("%d ", subgraph[i][k]);
+			}
+			printf("\n");
+		}
+		printf("\n");
+		printf("------------------------------------\n");
+#endif
+
+		classifier->Classify(subgraph, level);
+		
+		return;
+	}
+	
+	
+	initChildSet(root, level); 
+	
+#ifdef Debug
+	printf("Valid Children in level %d:\nN = { ", level);
+	for(k = 1; k <= childSet[level][0]; k++) {
+		printf("%d ", childSet[level][k]);
+	}		
+	printf("}\n");
+#endif
+
+	for(k = 1; k <= reminder; k++) {
+		if( childSet[level][0] < k ) { //There is not enough child to choose m from.
+			for(i = 1; i <= childSet[level][0]; i++) {
+				Visited[childSet[level][i]] = false;
+			}
+			return;
+		}
+
+#ifdef Debug
+		printf("Selecting %d node(s) from level %d\n", k, level);
+		printf("Initial Selection = { ");
+		for(i = 1; i <= k; i++) {
+			printf("%d ", childSet[level][i]);
+		}
+		printf("}\n");
+#endif
+		subgraph[level][0] = k;
+		for(i = 1; i <= k; i++) {
+			subgraph[level][i] = childSet[level][i];
+			Index[level][i] = i;
+		}	
+		
+		Explore(root, level + 1, reminder - k);
+	    GEN( childSet[level][0], k, root, level, reminder, k);
+
+#ifdef Debug
+		printf("************************************\n");
+		printf("*****    Back to level %3d   *******\n", level);
+		printf("************************************\n");
+#endif
+	}
+	
+	for(i = 1; i <= childSet[level][0]; i++) {
+		Visited[childSet[level][i]] = false;
+	}
+	subgraph[level][0] = 0;
+	return;
+}
+
+/***************************************************************************************************
+ * The following three functions generate all C(n, k) in Gray Code order, Adopted from Rusky code. *
+***************************************************************************************************/
+
+void Enumerator::swap( int i, int j, int root, int level, int reminder, int m) {
+#ifdef Debug
+	printf("Switch %d with %d in level %d\n", childSet[level][j], childSet[level][i], level);
+#endif
+
+	Index[level][i] = Index[level][j];
+	subgraph[level][Index[level][i]] = childSet[level][i];	
+	Explore(root, level + 1, reminder - m);
+}
+
+/****************************************************************
+****************************************************************/
+
+void Enumerator::GEN( int n, int k, int root, int level, int reminder, int m) {	
+	if (k > 0 && k < n) {
+    	GEN( n-1, k, root, level, reminder, m);
+		if (k == 1) 
+			swap( n, n-1, root, level, reminder, m);  
+		else 
+			swap( n, k-1, root, level, reminder, m);
+    
+		NEG( n-1, k-1, root, level, reminder, m);
+    }
+}
+
+/****************************************************************
+****************************************************************/
+
+void Enumerator::NEG( int n, int k, int root, int level, int reminder, int m) {	
+	if (k > 0 && k < n) {
+    	GEN( n-1, k-1, root, level, reminder, m);
+    	
+		if (k == 1) 
+			swap( n-1, n, root, level, reminder, m);  
+		else 
+			swap( k-1, n, root, level, reminder, m);
+    
+		NEG( n-1, k, root, level, reminder, m);
+	}
+	
+}
+
+/***********************************************************************************
+ * This function enumerates the subgraphs related to each vertex of inpur network. *
+***********************************************************************************/
+
+void Enumerator::ExploreRoot(vertex root) {
+#ifdef Debug
+	printf("+ Exploring Node %d ...\n", root);
+#endif
+	subgraph[0][0] = 1;
+	subgraph[0][1] = root;
+	
+	Visited[root] = true;
+	Explore(root, 1, subgraphSize - 1);
+	Visited[root] = false;
+}
+
+/****************************************************************
+ * Same as ExploreRoot(root) restricted to the subgraphs with k *
+ * nodes in the first level, so one root can be split in tasks. *
+****************************************************************/
+
+void Enumerator::ExploreRoot(vertex root, int k) {
+	register int i;
+
+	//Every task draws from its own stream, so a sample does not depend on the threads
+	if (stepProb != NULL) {
+		rng.seed(mixSeed(mixSeed(sampleSeed) ^ (unsigned long)(root * subgraphSize + k)));
+		uniform.reset();
+		if (uniform(rng) >= stepProb[0][1])
+			return;
+	}
+
+	subgraph[0][0] = 1;
+	subgraph[0][1] = root;
+	Visited[root] = true;
+
+	initChildSet(root, 1);
+	if (k <= childSet[1][0]) {
+		subgraph[1][0] = k;
+		for(i = 1; i <= k; i++) {
+			subgraph[1][i] = childSet[1][i];
+			Index[1][i] = i;
+		}
+		Explore(root, 2, subgraphSize - 1 - k);
+		GEN( childSet[1][0], k, root, 1, subgraphSize - 1, k);
+	}
+
+	for(i = 1; i <= childSet[1][0]; i++) {
+		Visited[childSet[1][i]] = false;
+	}
+	subgraph[1][0] = 0;
+	Visited[root] = false;
+}
+
+/****************************************************************
+ * Work queue of the threaded enumeration. Each thread owns a    *
+ * deque of (root, first level size) tasks, largest first, and   *
+ * steals from the back of the others' deques once its own is    *
+ * empty, since a few high-degree roots dominate the runtime.    *
+****************************************************************/
+
+struct Task {
+	vertex root;
+	int k;
+	double cost;
+};
+
+static bool costCmp(const Task &a, const Task &b) {
+	return b.cost < a.cost;
+}
+
+class TaskQueue {
+public:
+	TaskQueue(int threads) : tasks(threads), locks(threads) {
+		for(int i = 0; i < threads; i++)
+			pthread_mutex_init(&locks[i], NULL);
+	}
+	~TaskQueue() {
+		for(unsigned int i = 0; i < locks.size(); i++)
+			pthread_mutex_destroy(&locks[i]);
+	}
+	void push(int thread, const Task &task) {
+		tasks[thread].push_back(task);
+	}
+	bool next(int thread, Task &task) {
+		int n = tasks.size();
+		for(int i = 0; i < n; i++) {
+			int victim = (thread + i) % n;
+			pthread_mutex_lock(&locks[victim]);
+			if(!tasks[victim].empty()) {
+				if(i == 0) {
+					task = tasks[victim].front();
+					tasks[victim].pop_front();
+				}
+				else {
+					task = tasks[victim].back();
+					tasks[victim].pop_back();
+				}
+				pthread_mutex_unlock(&locks[victim]);
+				return true;
+			}
+			pthread_mutex_unlock(&locks[victim]);
+		}
+		return false;
+	}
+private:
+	vector< deque<Task> > tasks;
+	vector<pthread_mutex_t> locks;
+};
+
+struct Worker {
+	int id;
+	TaskQueue *queue;
+	Enumerator *enumerator;
+};
+
+static void *EnumerateTasks(void *arg) {
+	Worker *worker = (Worker *)arg;
+	Task task;
+
+	while(worker->queue->next(worker->id, task))
+		worker->enumerator->ExploreRoot(task.root, task.k);
+
+	//nauty keeps its work arrays per thread
+	nauty_freedyn();
+	nautil_freedyn();
+	naugraph_freedyn();
+	return NULL;
+}
+
+/****************************************************************
+ * Rough cost of a task: the first level choices times the      *
+ * branching of the levels below it.                            *
+****************************************************************/
+
+static double taskCost(Graph *graph, vertex root, int k, int size) {
+	register int j;
+	int *N = graph->getNeighbours(root);
+	int children = 0;
+	double cost = 1;
+
+	for(j = 1; j <= N[0] && root <= N[j]; j++)
+		children++;
+	if(children < k)
+		return 0;
+	for(j = 0; j < k; j++)
+		cost = cost * (children - j) / (j + 1);
+	for(j = k + 1; j < size; j++)
+		cost *= children;
+	return cost;
+}
+
+/****************************************************************
+ * Collects the classes of size k counted by all enumerators,    *
+ * merged by ID.                                                 *
+****************************************************************/
+
+static void mergeCensus(vector<Enumerator *> &enumerators, int k, Census *census) {
+	register int i, c;
+	vector<unsigned long> ids;
+	vector<unsigned long long> counts;
+	map<unsigned long, unsigned long long> classes;
+	map<unsigned long, unsigned long long>::iterator it;
+
+	census->subgraphs = 0;
+	census->replicates = 1;
+	census->randomGraphs = 0;
+	census->frequencies.clear();
+	census->errors.clear();
+	for(i = 0; i < (int)enumerators.size(); i++) {
+		census->subgraphs += enumerators[i]->Subgraphs(k);
+		enumerators[i]->Classes(k)->getMotifResults(ids, counts);
+		for(c = 0; c < (int)ids.size(); c++)
+			classes[ids[c]] += counts[c];
+	}
+
+	census->ids.clear();
+	census->counts.clear();
+	for(it = classes.begin(); it != classes.end(); it++) {
+		census->ids.push_back(it->first);
+		census->counts.push_back(it->second);
+	}
+}
+
+/****************************************************************
+ * Runs the census over all roots. With threads > 1 the roots    *
+ * are spread over that many threads, each with its own          *
+ * Enumerator, and the class counts are merged by ID at the end. *
+ * Given prob, only a sample of the subgraphs is counted.        *
+ * censuses[i] gets the census of sizes[i]: the smaller sizes    *
+ * are counted while enumerating the largest one.                *
+****************************************************************/
+
+static void EnumerateAll(Graph *graph, int nsizes, const int *sizes, Census *censuses, int threads,
+						 const double *prob, unsigned long seed) {
+	register int i, v, k;
+	int size = 0;
+	vector<Enumerator *> enumerators;
+
+	if(threads < 1)
+		threads = 1;
+	for(i = 0; i < nsizes; i++)
+		size = max(size, sizes[i]);
+
+	if(threads == 1) {
+		Enumerator *enumerator = new Enumerator(graph, size, prob, seed);
+		for(i = 0; i < nsizes; i++)
+			enumerator->CountSize(sizes[i]);
+		for (v = 1; v <= graph->Size(); v++) {
+			if (prob == NULL)
+				enumerator->ExploreRoot(v);
+			else
+				for (k = 1; k < size; k++)
+					enumerator->ExploreRoot(v, k);
+		}
+		enumerators.push_back(enumerator);
+	}
+	else {
+		vector<Task> tasks;
+		vector<Worker> workers(threads);
+		vector<pthread_t> handles(threads);
+		TaskQueue queue(threads);
+
+		for (v = 1; v <= graph->Size(); v++) {
+			for (k = 1; k < size; k++) {
+				Task task = {v, k, taskCost(graph, v, k, size)};
+				if(task.cost > 0)
+					tasks.push_back(task);
+			}
+		}
+		stable_sort(tasks.begin(), tasks.end(), costCmp);
+		for(i = 0; i < (int)tasks.size(); i++)
+			queue.push(i % threads, tasks[i]);
+
+		for(i = 0; i < threads; i++) {
+			enumerators.push_back(new Enumerator(graph, size, prob, seed));
+			for(k = 0; k < nsizes; k++)
+				enumerators[i]->CountSize(sizes[k]);
+			workers[i].id = i;
+			workers[i].queue = &queue;
+			workers[i].enumerator = enumerators[i];
+			pthread_create(&handles[i], NULL, EnumerateTasks, &workers[i]);
+		}
+		for(i = 0; i < threads; i++)
+			pthread_join(handles[i], NULL);
+	}
+
+	for(i = 0; i < nsizes; i++)
+		mergeCensus(enumerators, sizes[i], &censuses[i]);
+	for(i = 0; i < (int)enumerators.size(); i++)
+		delete enumerators[i];
+}
+
+void Enumerate(Graph *graph, int size, Census *census, int threads, const double *prob, unsigned long seed) {
+	EnumerateAll(graph, 1, &size, census, threads, prob, seed);
+}
+
+void EnumerateSizes(Graph *graph, int nsizes, const int *sizes, Census *censuses, int threads) {
+	EnumerateAll(graph, nsizes, sizes, censuses, threads, NULL, 0);
+}
+
+/****************************************************************
+ * Standard error of the mean of values, where the replicates   *
+ * missing from values (a class not sampled) count as 0.        *
+****************************************************************/
+
+static double standardError(const vector<double> &values, int replicates) {
+	double sum = 0, squares, mean;
+	unsigned int i;
+
+	if (replicates < 2)
+		return 0;
+	for (i = 0; i < values.size(); i++)
+		sum += values[i];
+	mean = sum / replicates;
+	squares = (replicates - values.size()) * mean * mean;
+	for (i = 0; i < values.size(); i++)
+		squares += (values[i] - mean) * (values[i] - mean);
+	return sqrt(squares / (replicates - 1) / replicates);
+}
+
+static double elapsed(const struct timespec &start) {
+	struct timespec now;
+	clock_gettime(CLOCK_MONOTONIC, &now);
+	return (now.tv_sec - start.tv_sec) + (now.tv_nsec - start.tv_nsec) * 1e-9;
+}
+
+/****************************************************************
+ * Approximate census from independent sampled replicates.      *
+ * Replicates run until the largest standard error of a class   *
+ * frequency is at most accuracy, until seconds have passed, or *
+ * until replicates is reached (0 or less for the default).     *
+ * The frequencies are pooled over all sampled subgraphs and    *
+ * subgraphs is the mean estimate of the total number.          *
+****************************************************************/
+
+void Sample(Graph *graph, int size, const double *prob, Census *census, int threads, unsigned long seed,
+			double accuracy, double seconds, int replicates) {
+	register int i, r;
+	double inclusion = 1, total = 0, worst;
+	unsigned long long sampled = 0;
+	Census run;
+	map<unsigned long, vector<double> > frequencies;
+	map<unsigned long, unsigned long long> counts;
+	map<unsigned long, vector<double> >::iterator it;
+	struct timespec start;
+
+	clock_gettime(CLOCK_MONOTONIC, &start);
+	if (replicates <= 0)
+		replicates = (accuracy > 0 || seconds > 0) ? MAX_REPLICATES : DEFAULT_REPLICATES;
+	for (i = 0; i < size; i++)
+		inclusion *= prob[i];
+
+	for (r = 1; r <= replicates; r++) {
+		Enumerate(graph, size, &run, threads, prob, seed + r - 1);
+		sampled += run.subgraphs;
+		total += run.subgraphs / inclusion;
+		for (i = 0; i < (int)run.ids.size(); i++) {
+			frequencies[run.ids[i]].push_back((double)run.counts[i] / run.subgraphs);
+			counts[run.ids[i]] += run.counts[i];
+		}
+
+		if (r < 2)
+			continue;
+		if (seconds > 0 && elapsed(start) >= seconds)
+			break;
+		if (accuracy > 0 && r >= MIN_REPLICATES) {
+			worst = 0;
+			for (it = frequencies.begin(); it != frequencies.end(); it++)
+				worst = fmax(worst, standardError(it->second, r));
+			if (worst <= accuracy)
+				break;
+		}
+	}
+	if (r > replicates)
+		r = replicates;
+
+	census->subgraphs = (unsigned long long)(total / r + 0.5);
+	census->replicates = r;
+	census->randomGraphs = 0;
+	census->ids.clear();
+	census->counts.clear();
+	census->frequencies.clear();
+	census->errors.clear();
+	for (it = frequencies.begin(); it != frequencies.end(); it++) {
+		census->ids.push_back(it->first);
+		census->counts.push_back(counts[it->first]);
+		census->frequencies.push_back((double)counts[it->first] / sampled);
+		census->errors.push_back(standardError(it->second, r));
+	}
+}
+
+/****************************************************************
+ * Fills census with the real counts and, for every class of    *
+ * the real graph or of a random graph, the mean and deviation  *
+ * of its count over the random graphs and its z-score. A class *
+ * missing from a random graph counts 0 there. The deviation is *
+ * divided by the number of random graphs and the z-score is    *
+ * NaN when it is 0.                                            *
+****************************************************************/
+
+static void nullStatistics(const Census &real, map<unsigned long, vector<double> > &samples, int randomGraphs,
+						   Census *census) {
+	register int i;
+	double mean, squares;
+	map<unsigned long, unsigned long long> counts;
+	map<unsigned long, vector<double> >::iterator it;
+
+	for (i = 0; i < (int)real.ids.size(); i++) {
+		counts[real.ids[i]] = real.counts[i];
+		samples[real.ids[i]];
+	}
+
+	census->subgraphs = real.subgraphs;
+	census->replicates = 1;
+	census->randomGraphs = randomGraphs;
+	census->ids.clear();
+	census->counts.clear();
+	census->frequencies.clear();
+	census->errors.clear();
+	census->means.clear();
+	census->deviations.clear();
+	census->zscores.clear();
+	for (it = samples.begin(); it != samples.end(); it++) {
+		const vector<double> &values = it->second;
+		mean = squares = 0;
+		if (randomGraphs > 0) {
+			for (i = 0; i < (int)values.size(); i++)
+				mean += values[i];
+			mean /= randomGraphs;
+			squares = (randomGraphs - values.size()) * mean * mean;
+			for (i = 0; i < (int)values.size(); i++)
+				squares += (values[i] - mean) * (values[i] - mean);
+			squares /= randomGraphs;
+		}
+		census->ids.push_back(it->first);
+		census->counts.push_back(counts[it->first]);
+		census->means.push_back(mean);
+		census->deviations.push_back(sqrt(squares));
+		census->zscores.push_back(squares > 0 ? (counts[it->first] - mean) / sqrt(squares) : NAN);
+	}
+}
+
+/****************************************************************
+ * Census of the graph against its own degree preserving null   *
+ * model: the graph is randomized by edge swaps (a chain, each  *
+ * random graph swaps the previous one further) and counted     *
+ * randomGraphs times. The graph is left randomized.            *
+****************************************************************/
+
+void NullModel(Graph *graph, int size, Census *census, int threads, int randomGraphs, unsigned long seed) {
+	register int i, r;
+	Census real, run;
+	generator gen(mixSeed(seed));
+	map<unsigned long, vector<double> > samples;
+
+	Enumerate(graph, size, &real, threads);
+	for (r = 0; r < randomGraphs; r++) {
+		gen.genRandGraph_Edge(graph);
+		Enumerate(graph, size, &run, threads);
+		for (i = 0; i < (int)run.ids.size(); i++)
+			samples[run.ids[i]].push_back(run.counts[i]);
+	}
+	nullStatistics(real, samples, randomGraphs, census);
+}
+
+/****************************************************************
+ * The same null model from one chain of swaps, without a full  *
+ * census per random graph: only the subgraphs around the four  *
+ * edges of every swap are recounted (IncrementalCensus). The   *
+ * chain runs in rounds of numOFexchange attempts per edge with *
+ * the draws of genRandGraph_Edge. It is sampled at the end of  *
+ * the first round and then after every `attempts` attempts, so *
+ * by default (a round) it gives the same result as NullModel.  *
+ * Vertices are 0-based, sizes up to MAX_TABLE_SIZE.            *
+****************************************************************/
+
+int NullChain(int n, const int *edges, int m, int size, Census *census, int threads, int randomGraphs,
+			  int attempts, unsigned long seed) {
+	register int j, a, b;
+	int i, k, c, d, r = 0;
+	long long t, round;
+	Census real, run;
+	generator gen(mixSeed(seed));
+	map<unsigned long, vector<double> > samples;
+	vector<vertex> source, target;
+
+	if (GetLookupTable(size) == NULL)
+		return -1;
+	IncrementalCensus chain(n, size);
+	chain.Start(edges, m, threads);
+	chain.Snapshot(&real);
+
+	for (a = 0; a < n; a++)
+		for (b = 0; b < n; b++)
+			if (chain.isConnected(a, b))
+				source.push_back(a);
+	round = numOFexchange * (long long)source.size();
+	if (round == 0)
+		round = 1;
+	if (attempts <= 0)
+		attempts = round;
+
+	for (t = 0; r < randomGraphs; t++) {
+		if (t % round == 0) {
+			//the edges in the order genRandGraph_Edge collects them: by source, targets descending
+			source.clear();
+			target.clear();
+			for (a = 0; a < n; a++) {
+				for (b = n - 1; b >= 0; b--) {
+					if (chain.isConnected(a, b)) {
+						source.push_back(a);
+						target.push_back(b);
+					}
+				}
+			}
+		}
+		if (source.size() >= 2) {
+			gen.Pick(source.size(), i, k);
+			a = source[i];
+			c = target[i];
+			b = source[k];
+			d = target[k];
+			if (a != b && c != d && a != d && b != c && !chain.isConnected(a, d) && !chain.isConnected(b, c)) {
+				chain.RemoveEdge(a, c);
+				chain.RemoveEdge(b, d);
+				chain.AddEdge(a, d);
+				chain.AddEdge(b, c);
+				target[i] = d;
+				target[k] = c;
+			}
+		}
+		if (t + 1 >= round && (t + 1 - round) % attempts == 0) {
+			chain.Snapshot(&run);
+			for (j = 0; j < (int)run.ids.size(); j++)
+				samples[run.ids[j]].push_back(run.counts[j]);
+			r++;
+		}
+	}
+	nullStatistics(real, samples, randomGraphs, census);
+	return 0;
+}
+
+/****************************************************************
+ * C interface for the Python wrapper. Runs a full census of the *
+ * graph given by a 0-based edge array and keeps the result.     *
+****************************************************************/
+
+static Graph *edgeGraph(int n, const int *edges, int m) {
+	register int i;
+	Graph *graph = new Graph(n);
+
+	for(i = 0; i < m; i++) {
+		if(edges[2*i] == edges[2*i+1]) continue;
+		graph->addEdge(edges[2*i] + 1, edges[2*i+1] + 1);
+	}
+	graph->Finalize();
+	return graph;
+}
+
+Census *kavosh_census(int n, const int *edges, int m, int size, int threads) {
+	Graph *graph = edgeGraph(n, edges, m);
+	Census *census = new Census;
+
+	Enumerate(graph, size, census, threads);
+	delete graph;
+	return census;
+}
+
+void kavosh_census_sizes(int n, const int *edges, int m, int nsizes, const int *sizes, int threads,
+						 Census **censuses) {
+	register int i;
+	Graph *graph = edgeGraph(n, edges, m);
+	Census *results = new Census[nsizes];
+
+	EnumerateSizes(graph, nsizes, sizes, results, threads);
+	for(i = 0; i < nsizes; i++)
+		censuses[i] = new Census(results[i]);
+	delete [] results;
+	delete graph;
+}
+
+/****************************************************************
+ * Censuses of growing prefixes of the edge array: censuses[i]  *
+ * counts the graph of its first snapshots[i] edges. The first  *
+ * is a full census, the others are updated edge by edge.       *
+ * Returns -1 if the size has no lookup table or the snapshots  *
+ * are not increasing prefixes of the edges.                    *
+****************************************************************/
+
+int kavosh_sweep(int n, const int *edges, int m, int size, int threads, int nsnapshots, const int *snapshots,
+				 Census **censuses) {
+	register int i, e;
+
+	if(GetLookupTable(size) == NULL || nsnapshots < 1)
+		return -1;
+	for(i = 0; i < nsnapshots; i++)
+		if(snapshots[i] < 0 || snapshots[i] > m || (i > 0 && snapshots[i] < snapshots[i-1]))
+			return -1;
+
+	IncrementalCensus sweep(n, size);
+	sweep.Start(edges, snapshots[0], threads);
+	e = snapshots[0];
+	for(i = 0; i < nsnapshots; i++) {
+		for(; e < snapshots[i]; e++)
+			sweep.AddEdge(edges[2*e], edges[2*e+1]);
+		censuses[i] = new Census;
+		sweep.Snapshot(censuses[i]);
+	}
+	return 0;
+}
+
+void kavosh_table_directory(const char *path) {
+	SetTableDirectory(path);
+}
+
+Census *kavosh_sample(int n, const int *edges, int m, int size, int threads, const double *prob,
+					  unsigned long seed, double accuracy, double seconds, int replicates) {
+	Graph *graph = edgeGraph(n, edges, m);
+	Census *census = new Census;
+
+	Sample(graph, size, prob, census, threads, seed, accuracy, seconds, replicates);
+	delete graph;
+	return census;
+}
+
+Census *kavosh_null_model(int n, const int *edges, int m, int size, int threads, int randomGraphs,
+						  unsigned long seed) {
+	Graph *graph = edgeGraph(n, edges, m);
+	Census *census = new Census;
+
+	NullModel(graph, size, census, threads, randomGraphs, seed);
+	delete graph;
+	return census;
+}
+
+Census *kavosh_null_chain(int n, const int *edges, int m, int size, int threads, int randomGraphs, int attempts,
+						  unsigned long seed) {
+	Census *census = new Census;
+
+	if (NullChain(n, edges, m, size, census, threads, randomGraphs, attempts, seed) != 0) {
+		delete census;
+		return NULL;
+	}
+	return census;
+}
+
+unsigned long long kavosh_subgraphs(const Census *census) {
+	return census->subgraphs;
+}
+
+int kavosh_classes(const Census *census) {
+	return census->ids.size();
+}
+
+void kavosh_results(const Census *census, unsigned long *ids, unsigned long long *counts) {
+	for(unsigned int i = 0; i < census->ids.size(); i++) {
+		ids[i] = census->ids[i];
+		counts[i] = census->counts[i];
+	}
+}
+
+int kavosh_replicates(const Census *census) {
+	return census->replicates;
+}
+
+void kavosh_estimates(const Census *census, double *frequencies, double *errors) {
+	for(unsigned int i = 0; i < census->frequencies.size(); i++) {
+		frequencies[i] = census->frequencies[i];
+		errors[i] = census->errors[i];
+	}
+}
+
+int kavosh_random_graphs(const Census *census) {
+	return census->randomGraphs;
+}
+
+void kavosh_null_statistics(const Census *census, double *means, double *deviations, double *zscores) {
+	for(unsigned int i = 0; i < census->means.size(); i++) {
+		means[i] = census->means[i];
+		deviations[i] = census->deviations[i];
+		zscores[i] = census->zscores[i];
+	}
+}
+
+void kavosh_free(Census *census) {
+	delete census;
+}
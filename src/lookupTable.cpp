@@ -0,0 +1,201 @@
+#include <stdio.h>
+#include <string.h>
+#include <pthread.h>
+#include <unistd.h>
+#include <string>
+#include "graph.h"
+#include "lookupTable.h"
+
+#define TABLE_MAGIC "KAVOSHT1"
+
+static string tableDirectory;
+static LookupTable *tables[MAX_TABLE_SIZE + 1];
+static pthread_mutex_t tablesLock = PTHREAD_MUTEX_INITIALIZER;
+
+/****************************************************************
+****************************************************************/
+
+LookupTable::LookupTable(int k) {
+	size = k;
+	bits = k * (k - 1);
+}
+
+/****************************************************************
+ * Runs nauty once for every adjacency pattern and numbers the  *
+ * distinct canonical patterns (the motif IDs) in sorted order. *
+****************************************************************/
+
+void LookupTable::Build() {
+	register int i, j, pos;
+	unsigned long p, id, patterns = 1UL << bits;
+	int M = (size + WORDSIZE - 1) / WORDSIZE;
+	graph *nauty_g = new graph[size * MAXM];
+	graph *canon = new graph[size * MAXM];
+	int *lab = new int[size];
+	int *ptn = new int[size];
+	int *orbits = new int[size];
+	setword workspace[160*MAXM];
+	statsblk stats;
+	set *gv;
+	DEFAULTOPTIONS(options);
+	vector<unsigned int> canonical(patterns);
+	vector<int> index(patterns, -1);
+
+	options.writeautoms = FALSE;
+	options.getcanon = TRUE;
+	options.defaultptn = TRUE;
+	options.digraph = TRUE;
+	nauty_check(WORDSIZE, M, size, NAUTYVERSIONID);
+
+	for (p = 0; p < patterns; p++) {
+		pos = bits;
+		for (i = 0; i < size; i++) {
+			gv = GRAPHROW(nauty_g, i, M);
+			EMPTYSET(gv, M);
+			for (j = 0; j < size; j++) {
+				if (i == j)
+					continue;
+				if ((p >> --pos) & 1)
+					ADDELEMENT(gv, j);
+			}
+		}
+
+		nauty(nauty_g, lab, ptn, NULL, orbits, &options, &stats,
+			  workspace, 160*MAXM, M, size, canon);
+
+		id = 0;
+		for (i = 0; i < size; i++) {
+			for (j = 0; j < size; j++) {
+				if (i == j)
+					continue;
+				id = (id << 1) | (ISELEMENT(GRAPHROW(nauty_g, lab[i], M), lab[j]) ? 1 : 0);
+			}
+		}
+		canonical[p] = id;
+		index[id] = 0;
+	}
+
+	ids.clear();
+	for (p = 0; p < patterns; p++) {
+		if (index[p] == 0) {
+			index[p] = ids.size();
+			ids.push_back(p);
+		}
+	}
+	classOf.resize(patterns);
+	for (p = 0; p < patterns; p++)
+		classOf[p] = index[canonical[p]];
+
+	delete [] nauty_g;
+	delete [] canon;
+	delete [] lab;
+	delete [] ptn;
+	delete [] orbits;
+}
+
+/****************************************************************
+ * Class index of a motif ID, -1 if no pattern has that ID.     *
+****************************************************************/
+
+int LookupTable::IndexOf(unsigned long id) const {
+	vector<unsigned long>::const_iterator it = lower_bound(ids.begin(), ids.end(), id);
+
+	if (it == ids.end() || *it != id)
+		return -1;
+	return it - ids.begin();
+}
+
+/****************************************************************
+ * File layout: magic, size, number of classes, the class IDs  *
+ * and the class index of every pattern.                        *
+****************************************************************/
+
+bool LookupTable::Load(const char *path) {
+	char magic[8];
+	int k, classes;
+	unsigned long patterns = 1UL << bits;
+	FILE *in = fopen(path, "rb");
+
+	if (in == NULL)
+		return false;
+	bool ok = fread(magic, 1, 8, in) == 8 && memcmp(magic, TABLE_MAGIC, 8) == 0
+		&& fread(&k, sizeof(int), 1, in) == 1 && k == size
+		&& fread(&classes, sizeof(int), 1, in) == 1 && classes > 0 && classes <= 65536;
+	if (ok) {
+		ids.resize(classes);
+		classOf.resize(patterns);
+		ok = fread(&ids[0], sizeof(unsigned long), classes, in) == (size_t)classes
+			&& fread(&classOf[0], sizeof(unsigned short), patterns, in) == patterns
+			&& fgetc(in) == EOF;
+	}
+	fclose(in);
+	if (!ok) {
+		ids.clear();
+		classOf.clear();
+	}
+	return ok;
+}
+
+/****************************************************************
+ * Writes a temporary file named after the process first, so    *
+ * other processes never see or share a half-written table.     *
+****************************************************************/
+
+bool LookupTable::Save(const char *path) {
+	int classes = ids.size();
+	char pid[32];
+	snprintf(pid, sizeof(pid), ".%ld.tmp", (long)getpid());
+	string temp = string(path) + pid;
+	FILE *out = fopen(temp.c_str(), "wb");
+
+	if (out == NULL)
+		return false;
+	bool ok = fwrite(TABLE_MAGIC, 1, 8, out) == 8
+		&& fwrite(&size, sizeof(int), 1, out) == 1
+		&& fwrite(&classes, sizeof(int), 1, out) == 1
+		&& fwrite(&ids[0], sizeof(unsigned long), classes, out) == (size_t)classes
+		&& fwrite(&classOf[0], sizeof(unsigned short), classOf.size(), out) == classOf.size();
+	ok = (fclose(out) == 0) && ok;
+	if (ok)
+		ok = rename(temp.c_str(), path) == 0;
+	if (!ok)
+		remove(temp.c_str());
+	return ok;
+}
+
+/****************************************************************
+****************************************************************/
+
+void SetTableDirectory(const char *path) {
+	pthread_mutex_lock(&tablesLock);
+	tableDirectory = path;
+	pthread_mutex_unlock(&tablesLock);
+}
+
+/****************************************************************
+ * The table of size k: loaded from the table directory, built  *
+ * and saved there if it is missing. NULL if k is too large.   *
+****************************************************************/
+
+const LookupTable *GetLookupTable(int k) {
+	char file[32];
+	string path;
+
+	if (k < 2 || k > MAX_TABLE_SIZE)
+		return NULL;
+
+	pthread_mutex_lock(&tablesLock);
+	if (tables[k] == NULL) {
+		LookupTable *table = new LookupTable(k);
+		sprintf(file, "kavosh_table%d.dat", k);
+		path = tableDirectory.empty() ? string() : tableDirectory + "/" + file;
+		if (path.empty() || !table->Load(path.c_str())) {
+			table->Build();
+			if (!path.empty())
+				table->Save(path.c_str());
+		}
+		tables[k] = table;
+	}
+	pthread_mutex_unlock(&tablesLock);
+	return tables[k];
+}
@@ -1,35 +1,36 @@
 #include <stdio.h>
 #include <stdlib.h>
 #include <map>
+#include <algorithm>
 #include <math.h>
 #include <graph.h>
+#include <kavosh.h>
 #include <getopt.h>
+#include <unistd.h>
+#include <string.h>
 #include <randomGenerator.h>
 #include <iostream>
 
 #define EPOC 10
-//#define Debug
+#define MAX_SIZES 16
 
 using namespace std;
 
-void GEN ( int n, int k, int root, int level, int reminder, int m);
-void NEG ( int n, int k, int root, int level, int reminder, int m);
-
-//1st dimension is the layer, while the 2nd is the list of selected nodes in each layer. subgraph[k][0] is the number of nodes in layer k.
-//vertex subgraph[subgraphSize][subgraphSize+1];
-vertex **subgraph;
 int subgraphSize = -1; //num_random_graphs = 0;
+int threads = 1;
 
-bool *Visited;
-
-// This array collects the valid children at each layer.
-unsigned int **childSet;
+//Motif sizes counted in one enumeration (-s 3,4,5), subgraphSize is the largest.
+int numSizes = 0;
+int sizes[MAX_SIZES];
 
-// This array maps the childSet to the subgraph[level]
-unsigned int **Index;  
+//Sampling (approximate census) settings, prob[d-1] is the probability for the d-th node.
+double *prob = NULL;
+unsigned long seed = 0;
+double accuracy = 0, seconds = 0;
+int replicates = 0;
 
-//total number of enumerated subgraphs.
-unsigned long long subgraphCounter; 
+//Null model (-z): number of edge swapped random graphs, seeded by -S.
+int randomGraphs = 0;
 
 //g stores the input graph
 Graph *g;
@@ -45,10 +46,19 @@ void print_usage (FILE * stream, int exit_code)
 	fprintf (stream, "Usage: Kavosh options[inputfile...] \n ");
     fprintf (stream,
 		 "\t-h	--help\t\t\tDisplay this usage information. \n"
-		 "\t-i	--input filename\tInput filename.\n"
-		 "\t-o	--output path\t\tOutput directory.\n"
-		 "\t-r 	--random number \tNumber of random graphs (default = 0).\n"
-		 "\t-s 	--size motifsize \tMotif size.\n" );
+		 "\t-i	--input filename\tInput filename (default = result/OUTPUT.txt).\n"
+		 "\t-o	--output path\t\tOutput directory (default = result).\n"
+		 "\t-b	--batch\t\t\tInput holds several graphs, each headed by \"nodes edges\".\n"
+		 "\t-l	--list\t\t\tInput lists one edge list file per line.\n"
+		 "\t-s 	--size motifsize \tMotif size, or a list of sizes (e.g. 3,4,5) counted in one pass.\n"
+		 "\t-t	--threads number\tNumber of enumeration threads (default = 1).\n"
+		 "\t-p	--prob p1,...,pk\tSample the subgraphs, following the d-th node with probability pd.\n"
+		 "\t-e	--error accuracy\tWith -p, stop once every frequency has this standard error.\n"
+		 "\t-m	--time seconds\t\tWith -p, stop sampling after this many seconds.\n"
+		 "\t-r	--replicates number\tWith -p, maximum number of replicates (default = 10).\n"
+		 "\t-S	--seed number\t\tWith -p or -z, seed of the sampler or randomization (default = 0).\n"
+		 "\t-z	--random number\t\tCompare with this many edge swapped random graphs (z-scores).\n"
+		 "\n\"Kavosh <size>\" is short for \"Kavosh -s <size>\".\n" );
 	     
     exit (exit_code);
 }
@@ -56,8 +66,30 @@ void print_usage (FILE * stream, int exit_code)
 /****************************************************************
 ****************************************************************/
 
-bool ReadData(const char *path) {
+Graph *ReadGraph(FILE *inFile, int graphSize, int edges) {
 	register int i, j;
+	Graph *graph = new Graph(graphSize);
+	
+	// edges < 0 reads up to the end of the file
+	while (edges != 0 && !feof(inFile)) {
+		if (fscanf(inFile, "%d %d\n", &i, &j) != 2)
+			break;
+		edges--;
+		if(i == j) continue;
+		graph->addEdge(i, j);
+	}
+	
+	graph->Finalize();
+	
+	//graph->Print();
+	
+	return graph;
+}
+
+/****************************************************************
+****************************************************************/
+
+bool ReadData(const char *path) {
 	int graphSize;
 	FILE * inFile = fopen(path, "r");
 	
@@ -69,205 +101,231 @@ bool ReadData(const char *path) {
 	if (!feof(inFile))
 		fscanf(inFile, "%d\n", &graphSize);	
 	
-	Visited = new bool[graphSize+1];
-	for(i = 1; i <= graphSize; i++)
-		Visited[i] = false;
-	
-	
-	g = new Graph(graphSize, subgraphSize);
-	while (!feof(inFile)) {
-		fscanf(inFile, "%d %d\n", &i, &j);
-		if(i == j) continue;
-		g->addEdge(i, j);
-	}
-	
-	g->Finalize();
-	
-	//g->Print();
+	g = ReadGraph(inFile, graphSize, -1);
 	
 	fclose(inFile);
 
-	childSet = new unsigned int*[subgraphSize];
-	Index    = new unsigned int*[subgraphSize];
-	
-	for(i = 0; i < subgraphSize; i++) {
-		childSet[i] = new unsigned int[g->MaxDegree() * subgraphSize + 1];
-		Index[i] = new unsigned int[g->MaxDegree() * subgraphSize + 1];
-	}
-
 	return true;
 }
 
-/***************************************************************
- * This function finds the valid children in each given level. *
-***************************************************************/
+/****************************************************************
+ * Parses the comma separated motif sizes of -s.                *
+****************************************************************/
 
-void initChildSet(int root, int level) {
-	register int *N;
-	register int i, j;
-	const int *parents = subgraph[level-1];
-		
-	childSet[level][0] = 0;
-	for(i = 1; i <= parents[0]; i++) {
-		N = g->getNeighbours(parents[i]);
-		for(j = 1; j <= N[0] && root <= N[j]; j++) {
-			if(!Visited[N[j]]) {
-				Visited[N[j]] = true;
-				childSet[level][0]++;
-				childSet[level][childSet[level][0]] = N[j];				
-			}
-		}		
+void ReadSizes(char *list) {
+	char *token = strtok(list, ",");
+
+	numSizes = 0;
+	subgraphSize = -1;
+	while (token != NULL) {
+		if (numSizes == MAX_SIZES || atoi(token) < 2) {
+			fprintf(stderr, "Input Argument Error: -s needs at most %d motif sizes of 2 or more.\n", MAX_SIZES);
+			exit(-1);
+		}
+		sizes[numSizes] = atoi(token);
+		subgraphSize = max(subgraphSize, sizes[numSizes]);
+		numSizes++;
+		token = strtok(NULL, ",");
 	}
 }
 
-/****************************************************************************************
- * This function Explores the root vertex and generates subgraphs containing that node. *
-****************************************************************************************/
+/****************************************************************
+ * Name of an output file: <output>/<name>.txt for a single      *
+ * motif size, <output>/<name><size>.txt when several are given. *
+****************************************************************/
 
-void Explore(vertex root, int level, int reminder) {
-	register int i, j, k; // k is the number of selected nodes in the current level.
+void outputFile(char *file, const char *output_directory, const char *name, int size) {
+	if (numSizes > 1)
+		sprintf(file, "%s/%s%d.txt", output_directory, name, size);
+	else
+		sprintf(file, "%s/%s.txt", output_directory, name);
+}
 
-#ifdef Debug
-	printf("************************************\n");
-	printf("*****   Exploring level %3d  *******\n", level);
-	printf("************************************\n");
-#endif
+/****************************************************************
+ * Writes <output>/MotifCount.txt: the number of subgraphs, then *
+ * one "ID count" line per class.                                *
+****************************************************************/
 
-	if (reminder == 0) { //reminder == 0 assures level <= subgraphSize
-		subgraphCounter++;
-		
-#ifdef Debug
-		printf("--> Subgraph Number %d: \n", subgraphCounter);
-		for(i = 0; i < level; i++) {
-			printf("Level %d: ", i);
-			for(k = 1; k <= subgraph[i][0]; k++) {
-				printf("%d ", subgraph[i][k]);
-			}
-			printf("\n");
-		}
-		printf("\n");
-		printf("------------------------------------\n");
-#endif
+void outputMotifResults(Census &census, const char *output_directory, int size) {
+	FILE * cm;
+	char file[256];
+	outputFile(file, output_directory, "MotifCount", size);
+	cm = fopen(file, "w+");
+	fprintf(cm, "%llu\n", census.subgraphs);
+	for(unsigned int i = 0; i < census.ids.size(); i++)
+		fprintf(cm, "%lu %llu\n", census.ids[i], census.counts[i]);
+	fclose(cm);
+}
 
-		g->Classify(subgraph, level);
-		
-		return;
-	}
-	
-	
-	initChildSet(root, level); 
-	
-#ifdef Debug
-	printf("Valid Children in level %d:\nN = { ", level);
-	for(k = 1; k <= childSet[level][0]; k++) {
-		printf("%d ", childSet[level][k]);
-	}		
-	printf("}\n");
-#endif
-
-	for(k = 1; k <= reminder; k++) {
-		if( childSet[level][0] < k ) { //There is not enough child to choose m from.
-			for(i = 1; i <= childSet[level][0]; i++) {
-				Visited[childSet[level][i]] = false;
-			}
-			return;
-		}
+/****************************************************************
+ * Writes a sampled census. The header is "subgraphs replicates" *
+ * (prefixed by the index of the graph in a batch run), then     *
+ * one "ID count frequency error" line per class.                *
+****************************************************************/
 
-#ifdef Debug
-		printf("Selecting %d node(s) from level %d\n", k, level);
-		printf("Initial Selection = { ");
-		for(i = 1; i <= k; i++) {
-			printf("%d ", childSet[level][i]);
-		}
-		printf("}\n");
-#endif
-		subgraph[level][0] = k;
-		for(i = 1; i <= k; i++) {
-			subgraph[level][i] = childSet[level][i];
-			Index[level][i] = i;
-		}	
-		
-		Explore(root, level + 1, reminder - k);
-	    GEN( childSet[level][0], k, root, level, reminder, k);
-
-#ifdef Debug
-		printf("************************************\n");
-		printf("*****    Back to level %3d   *******\n", level);
-		printf("************************************\n");
-#endif
+void outputSampleResults(FILE *out, int index, Census &census) {
+	if (index >= 0)
+		fprintf(out, "%d %llu %d %d\n", index, census.subgraphs, (int)census.ids.size(), census.replicates);
+	else
+		fprintf(out, "%llu %d\n", census.subgraphs, census.replicates);
+	for(unsigned int i = 0; i < census.ids.size(); i++)
+		fprintf(out, "%lu %llu %.10g %.10g\n", census.ids[i], census.counts[i], census.frequencies[i], census.errors[i]);
+}
+
+/****************************************************************
+ * Writes a census against the null model. The header is         *
+ * "subgraphs randomGraphs" (prefixed by the index of the graph  *
+ * in a batch run), then one "ID count mean deviation zscore"    *
+ * line per class, where mean and deviation are those of the     *
+ * count in the random graphs.                                   *
+****************************************************************/
+
+void outputNullResults(FILE *out, int index, Census &census) {
+	if (index >= 0)
+		fprintf(out, "%d %llu %d %d\n", index, census.subgraphs, (int)census.ids.size(), census.randomGraphs);
+	else
+		fprintf(out, "%llu %d\n", census.subgraphs, census.randomGraphs);
+	for(unsigned int i = 0; i < census.ids.size(); i++)
+		fprintf(out, "%lu %llu %.10g %.10g %.10g\n", census.ids[i], census.counts[i], census.means[i],
+				census.deviations[i], census.zscores[i]);
+}
+
+/****************************************************************
+ * Runs the census of g for every size, sampled if -p was given, *
+ * against random graphs if -z was given.                        *
+****************************************************************/
+
+void RunCensus(Census *censuses) {
+	if (randomGraphs > 0)
+		NullModel(g, subgraphSize, &censuses[0], threads, randomGraphs, seed);
+	else if (prob == NULL)
+		EnumerateSizes(g, numSizes, sizes, censuses, threads);
+	else
+		Sample(g, subgraphSize, prob, &censuses[0], threads, seed, accuracy, seconds, replicates);
+}
+
+/****************************************************************
+ * Parses the comma separated sampling probabilities of -p.     *
+****************************************************************/
+
+double *ReadProbabilities(char *list) {
+	int d = 0;
+	double *p = new double[subgraphSize];
+	char *token = strtok(list, ",");
+
+	while (token != NULL && d < subgraphSize) {
+		p[d] = atof(token);
+		if (p[d] <= 0 || p[d] > 1)
+			break;
+		d++;
+		token = strtok(NULL, ",");
 	}
-	
-	for(i = 1; i <= childSet[level][0]; i++) {
-		Visited[childSet[level][i]] = false;
+	if (d != subgraphSize || token != NULL) {
+		fprintf(stderr, "Input Argument Error: -p needs %d probabilities in (0,1].\n", subgraphSize);
+		exit(-1);
 	}
-	subgraph[level][0] = 0;
-	return;
+	return p;
 }
 
-/***************************************************************************************************
- * The following three functions generate all C(n, k) in Gray Code order, Adopted from Rusky code. *
-***************************************************************************************************/
-
-void swap( int i, int j, int root, int level, int reminder, int m) {
-#ifdef Debug
-	printf("Switch %d with %d in level %d\n", childSet[level][j], childSet[level][i], level);
-#endif
+/****************************************************************
+ * Writes one census of a batch run. Each graph is a header line *
+ * "index subgraphs classes" followed by its "ID count" lines.   *
+****************************************************************/
 
-	Index[level][i] = Index[level][j];
-	subgraph[level][Index[level][i]] = childSet[level][i];	
-	Explore(root, level + 1, reminder - m);
+void outputBatchResults(FILE *out, int index, Census &census) {
+	fprintf(out, "%d %llu %d\n", index, census.subgraphs, (int)census.ids.size());
+	for(unsigned int i = 0; i < census.ids.size(); i++)
+		fprintf(out, "%lu %llu\n", census.ids[i], census.counts[i]);
 }
 
 /****************************************************************
+ * Writes one census of a batch run or of a single graph (index  *
+ * -1) in the format of the mode given on the command line.      *
 ****************************************************************/
 
-void GEN( int n, int k, int root, int level, int reminder, int m) {	
-	if (k > 0 && k < n) {
-    	GEN( n-1, k, root, level, reminder, m);
-		if (k == 1) 
-			swap( n, n-1, root, level, reminder, m);  
-		else 
-			swap( n, k-1, root, level, reminder, m);
-    
-		NEG( n-1, k-1, root, level, reminder, m);
-    }
+void outputResults(FILE *out, int index, Census &census) {
+	if (randomGraphs > 0)
+		outputNullResults(out, index, census);
+	else if (prob == NULL)
+		outputBatchResults(out, index, census);
+	else
+		outputSampleResults(out, index, census);
 }
 
 /****************************************************************
+ * Runs the census of every graph in the input and writes them   *
+ * all to <output>/BatchCount.txt (one BatchCount<size>.txt per   *
+ * size with several sizes). With list set, the input names one   *
+ * single-graph edge list file per line (e.g. input/...).         *
 ****************************************************************/
 
-void NEG( int n, int k, int root, int level, int reminder, int m) {	
-	if (k > 0 && k < n) {
-    	GEN( n-1, k-1, root, level, reminder, m);
-    	
-		if (k == 1) 
-			swap( n-1, n, root, level, reminder, m);  
-		else 
-			swap( k-1, n, root, level, reminder, m);
-    
-		NEG( n-1, k, root, level, reminder, m);
+int RunBatch(const char *input_filename, const char *output_directory, bool list) {
+	int i, index = 0, graphSize, edges;
+	char path[1024];
+	Census censuses[MAX_SIZES];
+	FILE *out[MAX_SIZES], *inFile = fopen(input_filename, "r");
+
+	if (inFile == NULL) {
+		printf("Error opening %s file.\n", input_filename);
+		return 1;
 	}
-	
+
+	for (i = 0; i < numSizes; i++) {
+		outputFile(path, output_directory, randomGraphs > 0 ? "BatchNullModel" : prob == NULL ? "BatchCount" : "BatchSample", sizes[i]);
+		out[i] = fopen(path, "w+");
+		if (out[i] == NULL) {
+			printf("Error opening %s file.\n", path);
+			while (i-- > 0)
+				fclose(out[i]);
+			fclose(inFile);
+			return 1;
+		}
+	}
+
+	while (true) {
+		if (list) {
+			if (fscanf(inFile, " %1023[^\n]", path) != 1 || !ReadData(path))
+				break;
+		}
+		else {
+			if (fscanf(inFile, "%d %d\n", &graphSize, &edges) != 2)
+				break;
+			g = ReadGraph(inFile, graphSize, edges);
+		}
+		RunCensus(censuses);
+		for (i = 0; i < numSizes; i++)
+			outputResults(out[i], index, censuses[i]);
+		index++;
+		delete g;
+	}
+
+	for (i = 0; i < numSizes; i++)
+		fclose(out[i]);
+	fclose(inFile);
+	return 0;
 }
 
-/***********************************************************************************
- * This function enumerates the subgraphs related to each vertex of inpur network. *
-***********************************************************************************/
-void Enumerate() {
-	register int v;
-
-	for (v = 1; v <= g->Size(); v++)
-	{
-#ifdef Debug
-		printf("+ Exploring Node %d ...\n", v);
-#endif Debug
-		subgraph[0][0] = 1;
-		subgraph[0][1] = v;
-		
-		Visited[v] = true;
-		Explore(v, 1, subgraphSize - 1);
-		Visited[v] = false;
-	}	
+/****************************************************************
+ * The lookup tables of canonical labels are kept next to the  *
+ * Kavosh executable.                                           *
+****************************************************************/
+
+void SetExecutableTableDirectory(const char *argv0) {
+	char path[4096];
+	ssize_t len = readlink("/proc/self/exe", path, sizeof(path) - 1);
+
+	if (len > 0)
+		path[len] = '\0';
+	else {
+		strncpy(path, argv0, sizeof(path) - 1);
+		path[sizeof(path) - 1] = '\0';
+	}
+	char *slash = strrchr(path, '/');
+	if (slash == NULL)
+		strcpy(path, ".");
+	else
+		*slash = '\0';
+	SetTableDirectory(path);
 }
 
 /****************************************************************
@@ -280,24 +338,33 @@ int main(int argc, char *argv[]) {
 	clock_t start_random_time, end_random_time;
 	long long subgraphCounterMain;
 	generator gen;
+	*/
 	int next_option;
-	const char *const short_options = "hi:o:r:s:";
+	const char *const short_options = "hi:o:s:t:p:e:m:r:S:z:bl";
  	const struct option long_options[] = {
 		{"help",   0, NULL, 'h'},
 		{"input",  1, NULL, 'i'},
 		{"output", 1, NULL, 'o'},
-		{"random", 1, NULL, 'r'},
 		{"size",   1, NULL, 's'},		
+		{"threads", 1, NULL, 't'},
+		{"prob",   1, NULL, 'p'},
+		{"error",  1, NULL, 'e'},
+		{"time",   1, NULL, 'm'},
+		{"replicates", 1, NULL, 'r'},
+		{"seed",   1, NULL, 'S'},
+		{"random", 1, NULL, 'z'},
+		{"batch",  0, NULL, 'b'},
+		{"list",   0, NULL, 'l'},
 		{NULL,     0, NULL,  0 }		
 	};
 	
-	char *program_name;
-    char input_filename[256], output_directory[256];
+    char input_filename[256], output_directory[256], prob_list[256] = "", size_list[256] = "";
+    bool batch = false, list = false;
 
-    int verbose = 0;
+    SetExecutableTableDirectory(argv[0]);
+    strcpy(input_filename, "result/OUTPUT.txt");
     strcpy(output_directory, "result");
 
-    program_name = argv[0];
     do {
 		next_option = getopt_long (argc, argv, short_options, long_options, NULL);
 	
@@ -313,12 +380,44 @@ int main(int argc, char *argv[]) {
 				strcpy(output_directory, optarg);
 	    		break;
 			
+			case 's':
+				strncpy(size_list, optarg, sizeof(size_list) - 1);
+	    		break;
+			
+			case 't':
+				threads = atoi(optarg);
+	    		break;
+			
+			case 'p':
+				strncpy(prob_list, optarg, sizeof(prob_list) - 1);
+	    		break;
+			
+			case 'e':
+				accuracy = atof(optarg);
+	    		break;
+			
+			case 'm':
+				seconds = atof(optarg);
+	    		break;
+			
 			case 'r':
-				 num_random_graphs = atoi(optarg);
+				replicates = atoi(optarg);
 	    		break;
-
-			case 's':
-				subgraphSize = atoi(optarg);
+			
+			case 'S':
+				seed = strtoul(optarg, NULL, 10);
+	    		break;
+			
+			case 'z':
+				randomGraphs = atoi(optarg);
+	    		break;
+			
+			case 'b':
+				batch = true;
+	    		break;
+			
+			case 'l':
+				list = true;
 	    		break;
 			
 			case '?':
@@ -332,30 +431,31 @@ int main(int argc, char *argv[]) {
 		}
     } while (next_option != -1);
 
-
-	if (input_filename == NULL) {
-		fprintf(stderr, "Input Argument Error: Please specify an input filename using \"-i <FILE NAME>\".\n");
-        print_usage (stderr, -1);
-	}
+	//Old hardcoded form: ./Kavosh <size>
+	if (!size_list[0] && optind < argc)
+		strncpy(size_list, argv[optind], sizeof(size_list) - 1);
+	if (size_list[0])
+		ReadSizes(size_list);
 	
 	if (subgraphSize == -1) {
 		fprintf(stderr, "Input Argument Error: Please specify a motif size using \"-s <MOTIF SIZE>\".\n");
         print_usage (stderr, -1);
 	}
-	*/
 	
-	//Hardcoded inputs so it runs faster
-	subgraphSize = atoi(argv[1]);
-	//char filename[256];
-	//sprintf(filename,"input/%s", argv[2]);
-	char* input_filename = "result/OUTPUT.txt";
-	char* output_directory = "result";
-	//char* output_directory = "output";
-	//char* input_filename = filename;
+	if (randomGraphs > 0 && (numSizes > 1 || prob_list[0])) {
+		fprintf(stderr, "Input Argument Error: -z needs a single motif size and no -p.\n");
+		exit(-1);
+	}
+	if (prob_list[0]) {
+		if (numSizes > 1) {
+			fprintf(stderr, "Input Argument Error: -p samples a single motif size.\n");
+			exit(-1);
+		}
+		prob = ReadProbabilities(prob_list);
+	}
 	
-	subgraph = new int*[subgraphSize];
-	for (int i = 0; i < subgraphSize; i++)
-		subgraph[i] = new int[subgraphSize+1];
+	if (batch || list)
+		return RunBatch(input_filename, output_directory, list);
 	
 	//num = 0;	
 	//printf("Motif Size: %d\n", subgraphSize);
@@ -368,58 +468,26 @@ int main(int argc, char *argv[]) {
 
 	//clock_t startTime = clock();
 	//for main graph
-	subgraphCounter = 0;
-	Enumerate();
-	g->AllocateCounter();
-	//printf("Total Number of Subgraphs: %d\n", subgraphCounter);	
-	g->Extract();
+	Census censuses[MAX_SIZES];
+	RunCensus(censuses);
+	//printf("Total Number of Subgraphs: %d\n", census.subgraphs);	
 	
 	//clock_t end_main_time = clock();
 	//main_time = difftime(end_main_time, startTime)/(double)CLOCKS_PER_SEC;
 	//printf("Time Used for main graph: %f\n", main_time);
 	
 	//This function was added because we aren't using random graphs
-	g->outputMotifResults(subgraphCounter,output_directory);
-	
-	/*
-	subgraphCounterMain = subgraphCounter;
-	//for random graphs
-    srand(time(NULL));
-	isRand = true;
-    long long boz = 0;
-	for (i = 1; i <= num_random_graphs; i++) {
-		clog <<"\r"<<"Random Graphs Completed: "<< i << "/"<<num_random_graphs <<flush;
-		//start_random_time = clock();
-		gen.genRandGraph_Edge(g);
-		subgraphCounter = 0;
-		Enumerate();
-		g->Extract();
-		//printf("Total Number of Subgraphs in Random graph %d: %d\n", i, subgraphCounter);	
-		//boz  += subgraphCounter;
-		//end_random_time = clock();
-		//random_time = difftime(end_random_time, start_random_time)/(double)CLOCKS_PER_SEC;
-		//printf("Time Used for random %d : %f\n", i, random_time);
-		//total_random_time += random_time;
+	if (prob == NULL && randomGraphs == 0)
+		for (int i = 0; i < numSizes; i++)
+			outputMotifResults(censuses[i], output_directory, sizes[i]);
+	else {
+		char file[256];
+		sprintf(file, randomGraphs > 0 ? "%s/NullModel.txt" : "%s/MotifSample.txt", output_directory);
+		FILE *out = fopen(file, "w+");
+		outputResults(out, -1, censuses[0]);
+		fclose(out);
 	}
-	printf("\n");
-	
-	//printf("Avg. RAndom = %lld\n", (long long)((float)boz/num_random_graphs));
-	if (0 < num_random_graphs)
-		g->calculateZSCORE(num_random_graphs, subgraphCounterMain, output_directory);
-	*/
 		
-	for(int i = 0; i < subgraphSize; i++) {
-		delete [] Index[i];
-		delete [] childSet[i];
-	}
-	
-	for (int i = 0; i < subgraphSize; i++)
-		delete [] subgraph[i];
-
-    delete [] subgraph;
-	delete [] Index;
-	delete [] childSet;
-    delete [] Visited;
 	delete g;
 	
 	//clock_t endTime = clock();
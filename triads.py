@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+triads.py
+
+Size 3 motif census from adjacency matrix algebra. Each connected directed
+triad class is a trace of a product of the mutual, asymmetric and null
+dyad matrices, so a whole group of graphs is counted with a few batched
+matrix products instead of enumerating subgraphs. Classes are reported
+with the motif IDs Kavosh gives them.
+"""
+
+import numpy as np
+import networkx as nx
+
+#Kavosh motif ID of each connected triad class, in the order census counts them
+TRIADS = ['021D', '021U', '021C', '111D', '111U', '030T', '030C',
+	  '201', '120D', '120U', '120C', '210', '300']
+IDS = np.array([3, 10, 9, 42, 7, 11, 38, 23, 43, 15, 39, 47, 63], dtype=np.int64)
+
+def adjacency(graph):
+  """0/1 float adjacency matrix without self loops.
+
+  graph is a networkx DiGraph (nodes in sorted order, as kavosh.edgeArray)
+  or a square matrix where any nonzero entry is an edge."""
+  if isinstance(graph, nx.Graph):
+    graph = nx.to_numpy_matrix(graph, nodelist=sorted(graph.nodes()))
+  A = (np.asarray(graph) != 0).astype(np.float64)
+  A[...,np.arange(A.shape[-1]),np.arange(A.shape[-1])] = 0
+  return A
+
+def _trace(XY, Z):
+  "trace(X Y Z) of every graph in the stack, given the product X Y"
+  return np.einsum('pij,pji->p', XY, Z)
+
+def census(graphs):
+  """Triad census of a (graphs, n, n) stack of adjacency matrices.
+
+  Returns (subgraphs, counts): the number of connected 3 node subgraphs of
+  each graph and a (graphs, 13) array of class counts ordered as IDS."""
+  A = adjacency(graphs)
+  if A.ndim == 2:
+    A = A[np.newaxis]
+  At = A.transpose(0,2,1)
+  M = A*At
+  As = A-M
+  Ast = As.transpose(0,2,1)
+  N = 1-np.maximum(A,At)
+  N[:,np.arange(N.shape[1]),np.arange(N.shape[1])] = 0
+
+  MM = np.matmul(M,M)
+  MA = np.matmul(M,As)
+  MAt = np.matmul(M,Ast)
+  AA = np.matmul(As,As)
+  AAt = np.matmul(As,Ast)
+  AtA = np.matmul(Ast,As)
+  #Every trace counts ordered vertex triples, divide by the orderings of a triad
+  counts = np.array([
+	_trace(AtA,N)/2,	#021D out-star
+	_trace(AAt,N)/2,	#021U in-star
+	_trace(AA,N),		#021C path
+	_trace(MAt,N),		#111D asymmetric edge into the mutual dyad
+	_trace(MA,N),		#111U asymmetric edge out of the mutual dyad
+	_trace(AA,Ast),	#030T
+	_trace(AA,As)/3,	#030C
+	_trace(MM,N)/2,		#201
+	_trace(MAt,As)/2,	#120D
+	_trace(MA,Ast)/2,	#120U
+	_trace(MAt,Ast),	#120C
+	_trace(MM,As),		#210
+	_trace(MM,M)/6,		#300
+	]).T
+  counts = np.rint(counts).astype(np.int64)
+  return counts.sum(axis=1), counts
+
+def censusBatch(graphs):
+  """Triad census of a list of graphs in the format of kavosh.censusBatch.
+
+  Graphs with the same number of nodes are counted as one stack. Only the
+  classes that occur are listed, sorted by motif ID like Kavosh does."""
+  graphs = [adjacency(graph) for graph in graphs]
+  order = np.argsort(IDS)
+  results = [None]*len(graphs)
+  for size in set(len(A) for A in graphs):
+    index = [i for i,A in enumerate(graphs) if len(A) == size]
+    subgraphs, counts = census(np.array([graphs[i] for i in index]))
+    for i,total,row in zip(index, subgraphs, counts[:,order]):
+      found = row > 0
+      results[i] = (int(total), IDS[order][found], row[found])
+  return results